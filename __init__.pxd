@@ -1,2 +1,14 @@
-from mapping cimport xyz, to3d_c, to1d_c, vmap_buffer_c, vfb_rgb_c, vfb_rgba_c, vfb_c
-__all__ = ['xyz', "to3d_c", 'to1d_c', 'vmap_buffer_c', 'vfb_rgb_c', 'vfb_rgba_c', 'vfb_c']
\ No newline at end of file
+from mapping cimport pixel_t, index_t, xyz, xyz64, affine_t, parallel_t, to3d_c, to1d_c, vmap_buffer_c, vfb_rgb_c, vfb_rgba_c, vfb_c, \
+    to3d_array_c, to1d_array_c, vmap_buffer_array_c, tile_size_c, transpose_tiled_c, \
+    transpose_square_inplace_c, transpose_cycle_inplace_c, transpose_inplace_c, copy_pixels_c, vfb_generic_c, \
+    parallel_threads_c, split_channels_c, merge_channels_c, transpose_gray_c, \
+    gather_pixels_c, affine_remap_c, affine_remap_strided_c, compose_affine_c, transpose_tile_row_c, transpose_batch_c, \
+    to3d64_c, to1d64_c, vmap_buffer64_c, convert_half_c, affine_half_c, team_c, stats_begin_c, stats_end_c
+__all__ = ['pixel_t', 'index_t', 'xyz', 'xyz64', 'affine_t', 'parallel_t', "to3d_c", 'to1d_c', 'vmap_buffer_c', 'vfb_rgb_c', 'vfb_rgba_c', 'vfb_c',
+           'to3d_array_c', 'to1d_array_c', 'vmap_buffer_array_c', 'tile_size_c', 'transpose_tiled_c',
+           'transpose_square_inplace_c', 'transpose_cycle_inplace_c', 'transpose_inplace_c',
+           'copy_pixels_c', 'vfb_generic_c', 'parallel_threads_c',
+           'split_channels_c', 'merge_channels_c', 'transpose_gray_c', 'gather_pixels_c',
+           'affine_remap_c', 'affine_remap_strided_c', 'compose_affine_c', 'transpose_tile_row_c', 'transpose_batch_c',
+           'to3d64_c', 'to1d64_c', 'vmap_buffer64_c', 'convert_half_c', 'affine_half_c',
+           'team_c', 'stats_begin_c', 'stats_end_c']
\ No newline at end of file
@@ -1,2 +1,20 @@
-from IndexMapping.mapping import to3d, to1d, vmap_buffer, vfb_rgb, vfb_rgba, vfb
-__all__ = ['to3d', 'to1d', 'vmap_buffer', 'vfb_rgb', 'vfb_rgba', 'vfb']
+from IndexMapping.mapping import to3d, to1d, vmap_buffer, vfb_rgb, vfb_rgba, vfb, \
+    to3d_array, to1d_array, vmap_buffer_array, set_tile_size, get_tile_size, tune_tile_size, \
+    vfb_rgb_inplace, vfb_rgba_inplace, vfb_inplace, vfb_generic, set_simd_level, get_simd_level, \
+    set_num_threads, get_num_threads, set_schedule, get_schedule, set_serial_threshold, \
+    get_serial_threshold, parallel_settings, build_info, split_rgb, split_rgba, merge_rgb, merge_rgba, \
+    vfb_gray, RemapPlan, get_plan, set_plan_cache_size, clear_plan_cache, plan_cache_info, remap, \
+    transform, Pipeline, vfb_stream, vfb_batch, pixels_view, transform_view, to3d64, to1d64, vmap_buffer64, \
+    half_to_float, float_to_half, half_to_uint8, uint8_to_half, transform_half, set_backend, get_backend, \
+    enable_stats, get_stats, reset_stats
+__all__ = ['to3d', 'to1d', 'vmap_buffer', 'vfb_rgb', 'vfb_rgba', 'vfb',
+           'to3d_array', 'to1d_array', 'vmap_buffer_array', 'set_tile_size', 'get_tile_size', 'tune_tile_size',
+           'vfb_rgb_inplace', 'vfb_rgba_inplace', 'vfb_inplace', 'vfb_generic',
+           'set_simd_level', 'get_simd_level', 'set_num_threads', 'get_num_threads',
+           'set_schedule', 'get_schedule', 'set_serial_threshold', 'get_serial_threshold',
+           'parallel_settings', 'build_info', 'split_rgb', 'split_rgba', 'merge_rgb', 'merge_rgba',
+           'vfb_gray', 'RemapPlan', 'get_plan', 'set_plan_cache_size', 'clear_plan_cache', 'plan_cache_info',
+           'remap', 'transform', 'Pipeline', 'vfb_stream',
+           'vfb_batch', 'pixels_view', 'transform_view', 'to3d64', 'to1d64', 'vmap_buffer64',
+           'half_to_float', 'float_to_half', 'half_to_uint8', 'uint8_to_half', 'transform_half',
+           'set_backend', 'get_backend', 'enable_stats', 'get_stats', 'reset_stats']
@@ -0,0 +1,182 @@
+"""
+MIT License
+
+Copyright (c) 2019 Yoann Berenguer
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+"""
+"""
+Awaitable versions of the buffer transforms of IndexMapping.mapping
+
+The transforms run in a shared thread pool, the kernels release the GIL so the event
+loop keeps serving while the buffers are processed (several transforms in parallel).
+
+e.g
+from IndexMapping import aio
+
+async def render(source, target, w, h):
+    await aio.vfb_rgba(source, target, w, h)
+
+Back-pressure: at most max_pending transforms are queued or running, the following
+calls wait (without blocking the event loop) until a slot is free.
+Cancellation: a transform waiting for a slot or a thread is dropped, a transform
+already running cannot be interrupted, it keeps its slot and the cancelled call returns
+(CancelledError) once the transform is done writing the buffers.
+The OpenMP team of every transform is cpu_count // max_workers threads by default,
+the workers share the cores instead of oversubscribing them (num_threads argument).
+"""
+
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial, wraps
+
+from IndexMapping import mapping
+
+
+class BoundedExecutor(object):
+    """
+    Thread pool running the transforms with a bounded number of pending jobs
+
+    :param max_workers: integer; number of threads, None for min(4, cpu_count)
+    :param max_pending: integer; transforms queued or running at the same time,
+    None for 2 * max_workers
+    :param num_threads: integer; OpenMP threads of a transform, None for
+    cpu_count // max_workers (at least 1)
+    """
+
+    def __init__(self, max_workers=None, max_pending=None, num_threads=None):
+        cpu_count = os.cpu_count() or 1
+        self.max_workers = max_workers or min(4, cpu_count)
+        self.max_pending = max_pending or 2 * self.max_workers
+        self.num_threads = num_threads or max(1, cpu_count // self.max_workers)
+        assert self.max_workers > 0, 'Argument max_workers cannot be <= 0'
+        assert self.max_pending > 0, 'Argument max_pending cannot be <= 0'
+        self._pool = ThreadPoolExecutor(self.max_workers, thread_name_prefix='IndexMapping')
+        self._semaphore = None
+        self._loop = None
+
+    def _slots(self):
+        # asyncio.Semaphore is bound to the event loop using it
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_pending)
+            self._loop = loop
+        return self._semaphore
+
+    async def run(self, func, *args, **kwargs):
+        """
+        Run func(*args, **kwargs) in the pool and return its result
+
+        Waits for a free slot when max_pending transforms are already queued or running.
+        """
+        semaphore, loop = self._slots(), asyncio.get_running_loop()
+        await semaphore.acquire()
+        try:
+            future = self._pool.submit(partial(func, *args, **kwargs))
+        except BaseException:
+            semaphore.release()
+            raise
+        # The slot is freed when the job is done or removed from the queue, not when
+        # the caller stops waiting (a cancelled job may still be running)
+        future.add_done_callback(partial(_release, loop, semaphore))
+        try:
+            return await asyncio.wrap_future(future)
+        except asyncio.CancelledError:
+            # Not started yet: removed from the queue, running: wait until it stops
+            # writing the caller's buffers, its result is discarded
+            if not future.cancel():
+                while not future.done():
+                    try:
+                        await asyncio.wait([asyncio.wrap_future(future)])
+                    except asyncio.CancelledError:
+                        pass
+            raise
+
+    def shutdown(self, wait=True):
+        """ Stop the threads once the pending transforms are done """
+        self._pool.shutdown(wait=wait)
+
+
+def _release(loop, semaphore, future):
+    # Done callback of the pool jobs (worker thread), the semaphore belongs to the loop
+    if not loop.is_closed():
+        try:
+            loop.call_soon_threadsafe(semaphore.release)
+        except RuntimeError:
+            pass
+
+
+_EXECUTOR = None
+
+
+def get_executor():
+    """
+    Return the shared executor (created on first use)
+
+    :return: BoundedExecutor
+    """
+    global _EXECUTOR
+    if _EXECUTOR is None:
+        _EXECUTOR = BoundedExecutor()
+    return _EXECUTOR
+
+
+def set_executor(max_workers=None, max_pending=None, num_threads=None):
+    """
+    Replace the shared executor, the previous one completes its pending transforms
+
+    :param max_workers: integer; number of threads, None for min(4, cpu_count)
+    :param max_pending: integer; transforms queued or running at the same time, None for 2 * max_workers
+    :param num_threads: integer; OpenMP threads of a transform, None for cpu_count // max_workers
+    :return           : BoundedExecutor
+    """
+    global _EXECUTOR
+    previous, _EXECUTOR = _EXECUTOR, BoundedExecutor(max_workers, max_pending, num_threads)
+    if previous is not None:
+        previous.shutdown(wait=False)
+    return _EXECUTOR
+
+
+def _awaitable(func, thread_arg):
+    # Coroutine running func in the shared executor, the functions taking num_threads
+    # (thread_arg) get the executor num_threads unless given by the caller
+    @wraps(func)
+    async def wrapper(*args, **kwargs):
+        executor = get_executor()
+        if thread_arg:
+            kwargs.setdefault('num_threads', executor.num_threads)
+        return await executor.run(func, *args, **kwargs)
+    wrapper.__doc__ = "Awaitable version of IndexMapping.mapping.%s\n%s" % (func.__name__, func.__doc__ or '')
+    return wrapper
+
+
+# Functions taking num_threads, and functions without the argument (the index arrays run
+# prange loops with the module settings of IndexMapping.mapping, e.g set_num_threads)
+_THREAD_ARG = ('vfb_rgb', 'vfb_rgba', 'vfb', 'vfb_generic', 'vfb_gray', 'split_rgb', 'split_rgba',
+               'merge_rgb', 'merge_rgba', 'remap', 'transform', 'transform_view', 'vfb_stream', 'vfb_batch',
+               'half_to_float', 'float_to_half', 'half_to_uint8', 'uint8_to_half', 'transform_half')
+_NO_THREAD_ARG = ('to3d_array', 'to1d_array', 'vmap_buffer_array', 'vfb_rgb_inplace', 'vfb_rgba_inplace',
+                  'vfb_inplace')
+
+globals().update({_name: _awaitable(getattr(mapping, _name), _name in _THREAD_ARG)
+                  for _name in _THREAD_ARG + _NO_THREAD_ARG})
+
+__all__ = ['BoundedExecutor', 'get_executor', 'set_executor'] + list(_THREAD_ARG + _NO_THREAD_ARG)
@@ -30,10 +30,25 @@ DEF M_HALF  = 8
 DEF M_FLOAT = 9
 DEF M_DOUBLE= 10
 
+from contextlib import contextmanager
+from cpython.buffer cimport PyBUF_FORMAT
+from IndexMapping.mapping cimport stats_begin_c, stats_end_c, STATS_FLIP_BUFFER, STATS_SPLIT_BUFFER, \
+    STATS_GRAY_BUFFER, STATS_TESTING_PURE_C, STATS_TEST_C_INPLACE, STATS_RGB_INPLACE
+
+# Instrumentation (see IndexMapping.mapping.enable_stats), the calls are compiled
+# out unless the extensions are built with INDEXMAPPING_STATS=1
+cdef extern from *:
+    """
+    #ifndef M_STATS
+    #define M_STATS 0
+    #endif
+    """
+    const int M_STATS
+
 cdef extern from 'mapc.c' nogil:
     struct m_image:
        void *data;
-       int size;
+       Py_ssize_t size;
        int width;
        int height;
        int comp;
@@ -41,9 +56,20 @@ cdef extern from 'mapc.c' nogil:
 
     void m_image_create(m_image *image, char type_, int width, int height, int comp)
     void m_image_destroy(m_image *image);
+    int m_image_acquire(m_image *image, char type_, int width, int height, int comp)
+    void m_image_release(m_image *image)
+    void m_pool_clear()
+    void m_pool_stats(Py_ssize_t *hits, Py_ssize_t *misses, Py_ssize_t *blocks, Py_ssize_t *nbytes)
     void m_flip_buffer(m_image *src, m_image *dest);
     void test_array_inplace(m_image *src)nogil;
     void test_rgb_inplace(m_image *src, m_image *red, m_image *green, m_image *blue)
+    void m_transpose_buffer(const unsigned char *src, unsigned char *dst, int width, int height,
+                            int depth, int tile, int num_threads)
+    void m_split_buffer(const unsigned char *src, unsigned char *red, unsigned char *green,
+                        unsigned char *blue, unsigned char *alpha, Py_ssize_t n, int depth, int num_threads)
+    void m_gray_buffer(const unsigned char *src, unsigned char *dst, int width, int height, int depth,
+                       int out_depth, int wr, int wg, int wb, int tile, int num_threads)
+    int m_team(int num_threads)
 
 
 @cython.boundscheck(False)
@@ -58,18 +84,19 @@ cpdef testing_pure_c(unsigned char [:] buffer_, int width, int height):
         int b_length, r;
 
     b_length = len(buffer_)
+    check_buffer_c(buffer_, width, height)
 
-    # Create two buffers
-    m_image_create(&foo1, M_UINT, width, height, 3)
-    m_image_create(&foo2, M_UINT, width, height, 3)
-
-    foo1.data = &buffer_[0]
-    foo2.data = &buffer_[0]
+    # Both images describe the caller's buffer (no allocation, see rgb_inplace)
+    m_image_wrap(&foo1, &buffer_[0], width, height, 3)
+    m_image_wrap(&foo2, &buffer_[0], width, height, 3)
 
+    cdef double start = stats_begin_c() if M_STATS else 0.0
     m_flip_buffer(&foo1, &foo2)
+    if M_STATS:
+        stats_end_c(STATS_TESTING_PURE_C, b_length * 2, 1, start)
 
-    image = <unsigned char *>foo1.data
-    return image
+    # The kernel works in place, view of the caller's buffer (no copy)
+    return numpy.asarray(buffer_)
 
 
 @cython.boundscheck(False)
@@ -83,17 +110,17 @@ cpdef test_c_inplace(unsigned char [:] buffer_, int width, int height):
         int b_length, r;
 
     b_length = len(buffer_)
+    check_buffer_c(buffer_, width, height)
 
-    # Create two buffers
-    m_image_create(&foo1, M_UINT, width, height, 3)
-
-    foo1.data = &buffer_[0]
-
+    m_image_wrap(&foo1, &buffer_[0], width, height, 3)
 
+    cdef double start = stats_begin_c() if M_STATS else 0.0
     test_array_inplace(&foo1)
+    if M_STATS:
+        stats_end_c(STATS_TEST_C_INPLACE, b_length * 2, 1, start)
 
-    image = <unsigned char *>foo1.data
-    return image
+    # View of the caller's buffer (no copy)
+    return numpy.asarray(buffer_)
 
 
 
@@ -102,37 +129,269 @@ cpdef test_c_inplace(unsigned char [:] buffer_, int width, int height):
 @cython.nonecheck(False)
 @cython.cdivision(True)
 cpdef rgb_inplace(unsigned char [:] buffer_, int width, int height):
+    """
+    Deprecated, use IndexMapping.mapping.split_rgb (planar channels written into
+    the caller's buffers, no allocation, OpenMP)
 
+    :return: tuple of numpy.ndarray (red, green, blue), width * height * 3 uint8 values each.
+    The arrays own pooled blocks (see PooledBuffer), returned to the pool when released
+    """
     cdef:
         m_image rgb_array;
         m_image red_chanel;
         m_image green_channel;
         m_image blue_channel;
 
-    # Create two buffers
-    m_image_create(&rgb_array, M_UINT, width, height, 3)
-    m_image_create(&red_chanel, M_UINT, width, height, 3)
-    m_image_create(&green_channel, M_UINT, width, height, 3)
-    m_image_create(&blue_channel, M_UINT, width, height, 3)
-
-    cdef unsigned char [:] red_   = numpy.zeros(width * height * 3, numpy.uint8)
-    cdef unsigned char [:] green_ = numpy.zeros(width * height * 3, numpy.uint8)
-    cdef unsigned char [:] blue_  = numpy.zeros(width * height * 3, numpy.uint8)
+    check_buffer_c(buffer_, width, height)
+    # The source describes the caller's buffer, the three channels are pooled
+    # blocks (every byte is written by test_rgb_inplace) owned by the arrays returned
+    cdef:
+        PooledBuffer red_   = PooledBuffer(width, height, 3)
+        PooledBuffer green_ = PooledBuffer(width, height, 3)
+        PooledBuffer blue_  = PooledBuffer(width, height, 3)
 
-    rgb_array.data      = &buffer_[0]
-    red_chanel.data     = &red_[0]
-    green_channel.data  = &green_[0]
-    blue_channel.data   = &blue_[0]
+    m_image_wrap(&rgb_array, &buffer_[0], width, height, 3)
+    red_chanel, green_channel, blue_channel = red_.image, green_.image, blue_.image
 
+    cdef double start = stats_begin_c() if M_STATS else 0.0
     test_rgb_inplace(&rgb_array, &red_chanel, &green_channel, &blue_channel)
+    if M_STATS:
+        stats_end_c(STATS_RGB_INPLACE, buffer_.shape[0] * 2, 1, start)
 
-    r_surf = <unsigned char *> red_chanel.data
-    g_surf = <unsigned char *> green_channel.data
-    b_surf = <unsigned char *> blue_channel.data
-
-    # m_image_destroy(&rgb_array)
-    # m_image_destroy(&red_chanel)
-    # m_image_destroy(&green_channel)
-    # m_image_destroy(&blue_channel)
-
-    return r_surf, g_surf, b_surf
\ No newline at end of file
+    return numpy.asarray(red_), numpy.asarray(green_), numpy.asarray(blue_)
+
+
+# M_IMAGE POOL (mapc.c), BLOCKS REUSED FROM ONE CALL (OR ONE FRAME) TO THE NEXT
+cdef class PooledBuffer:
+    """
+    Pooled block of width * height * comp unsigned char values (buffer protocol)
+
+    The arrays built on it (numpy.asarray(block)) keep the block alive, it goes back to
+    the pool when the block and all its arrays are released. rgb_inplace returns arrays
+    built on pooled blocks, e.g red.base.obj is a PooledBuffer.
+    The content is not cleared.
+    """
+    cdef m_image image
+    cdef Py_ssize_t stride
+
+    def __cinit__(self, int width, int height, int comp=3):
+        acquire_c(&self.image, width, height, comp)
+        self.stride = 1
+
+    def __dealloc__(self):
+        m_image_release(&self.image)
+
+    def __getbuffer__(self, Py_buffer * buffer, int flags):
+        buffer.buf = self.image.data
+        buffer.obj = self
+        buffer.len = self.image.size
+        buffer.readonly = 0
+        buffer.itemsize = 1
+        buffer.format = <char *>'B' if flags & PyBUF_FORMAT else NULL
+        buffer.ndim = 1
+        buffer.shape = &self.image.size
+        buffer.strides = &self.stride
+        buffer.suboffsets = NULL
+        buffer.internal = NULL
+
+    def __releasebuffer__(self, Py_buffer * buffer):
+        pass
+
+    def __len__(self):
+        return self.image.size
+
+    @property
+    def shape(self):
+        return self.image.width, self.image.height, self.image.comp
+
+
+@contextmanager
+def pooled_image(int width, int height, int comp=3):
+    """
+    Context manager lending a pooled buffer of width * height * comp unsigned char values
+
+    The block is taken from the m_image pool (allocated on a miss), the array is built on
+    a PooledBuffer and the block goes back to the pool when the array and all its views
+    are released, a loop processing frames of the same size allocates at most twice.
+    The content is not cleared.
+
+    e.g
+    with pooled_image(w, h, 3) as scratch:
+        vfb_rgb(source, scratch, w, h)
+
+    :param width : integer; image width
+    :param height: integer; image height
+    :param comp  : integer; number of components (bytes per pixel)
+    :return      : numpy.ndarray; 1d uint8 array of width * height * comp values
+    """
+    # No reference kept here, a view kept after the with block holds the block
+    yield numpy.asarray(PooledBuffer(width, height, comp))
+
+
+cpdef dict image_pool_info():
+    """
+    Return the state of the m_image pool
+
+    :return: dictionary; hits (blocks reused), misses (blocks allocated), blocks (blocks 
+    held by the pool) and nbytes (size of the blocks held by the pool)
+    """
+    cdef Py_ssize_t hits, misses, blocks, nbytes
+    m_pool_stats(&hits, &misses, &blocks, &nbytes)
+    return {'hits': hits, 'misses': misses, 'blocks': blocks, 'nbytes': nbytes}
+
+
+cpdef void clear_image_pool():
+    """
+    Free the blocks held by the m_image pool and reset its counters
+
+    :return: void
+    """
+    m_pool_clear()
+
+
+# C BACKEND, OPENMP KERNELS OF mapc.c (IndexMapping.mapping.set_backend('c'))
+cpdef flip_buffer(const unsigned char [::1] source, unsigned char [::1] target,
+                  int width, int height, int depth, int tile=32, int num_threads=0):
+    """
+    Vertically flipped buffer (model (width, height, depth) --> (height, width, depth))
+
+    OpenMP kernel of mapc.c (omp parallel for), same result as IndexMapping.mapping.vfb_rgb,
+    vfb_rgba and vfb. The rows of tiles are shared between the threads.
+
+    :param source     : 1d contiguous buffer, length width * height * depth
+    :param target     : 1d contiguous buffer, same length
+    :param width      : integer; source width
+    :param height     : integer; source height
+    :param depth      : integer; bytes per pixel (1, 3, 4 ...)
+    :param tile       : integer; tile size in pixels
+    :param num_threads: integer; number of threads, 0 = OpenMP default
+    :return           : numpy.ndarray; the target buffer
+    """
+    if width <= 0 or height <= 0 or depth <= 0:
+        raise ValueError('Arguments width, height and depth cannot be <=0')
+    if tile <= 0:
+        raise ValueError('Argument tile cannot be <=0')
+    if source.shape[0] != <Py_ssize_t>width * height * depth:
+        raise ValueError('Argument source must have length width * height * depth')
+    if target.shape[0] != source.shape[0]:
+        raise ValueError('Arguments source and target must have the same length')
+    cdef double start = stats_begin_c() if M_STATS else 0.0
+    with nogil:
+        m_transpose_buffer(&source[0], &target[0], width, height, depth, tile, num_threads)
+    if M_STATS:
+        stats_end_c(STATS_FLIP_BUFFER, source.shape[0] * 2, m_team(num_threads), start)
+    return numpy.asarray(target)
+
+
+cpdef tuple split_buffer(const unsigned char [::1] source, unsigned char [::1] red,
+                         unsigned char [::1] green, unsigned char [::1] blue,
+                         unsigned char [::1] alpha=None, int num_threads=0):
+    """
+    Split a buffer of RGB (or RGBA when alpha is given) pixels into planar channels
+
+    OpenMP kernel of mapc.c (omp parallel for), same result as IndexMapping.mapping.split_rgb
+    and split_rgba.
+
+    :param source     : 1d contiguous buffer, length n * 3 (n * 4 with alpha)
+    :param red        : 1d contiguous buffer, length n (number of pixels)
+    :param green      : 1d contiguous buffer, length n
+    :param blue       : 1d contiguous buffer, length n
+    :param alpha      : 1d contiguous buffer, length n or None for RGB pixels
+    :param num_threads: integer; number of threads, 0 = OpenMP default
+    :return           : tuple of numpy.ndarray (red, green, blue[, alpha])
+    """
+    cdef:
+        Py_ssize_t n = red.shape[0]
+        int depth = 3 if alpha is None else 4
+        unsigned char * a = NULL
+    if source.shape[0] != n * depth:
+        raise ValueError('Argument source must have length len(red) * %s' % depth)
+    if green.shape[0] != n or blue.shape[0] != n or (alpha is not None and alpha.shape[0] != n):
+        raise ValueError('Arguments red, green, blue (and alpha) must have the same length')
+    if n == 0:
+        return (numpy.asarray(red), numpy.asarray(green), numpy.asarray(blue)) + \
+            (() if alpha is None else (numpy.asarray(alpha),))
+    if alpha is not None:
+        a = &alpha[0]
+    cdef double start = stats_begin_c() if M_STATS else 0.0
+    with nogil:
+        m_split_buffer(&source[0], &red[0], &green[0], &blue[0], a, n, depth, num_threads)
+    if M_STATS:
+        stats_end_c(STATS_SPLIT_BUFFER, n * depth * 2, m_team(num_threads), start)
+    if alpha is None:
+        return numpy.asarray(red), numpy.asarray(green), numpy.asarray(blue)
+    return numpy.asarray(red), numpy.asarray(green), numpy.asarray(blue), numpy.asarray(alpha)
+
+
+cpdef gray_buffer(const unsigned char [::1] source, unsigned char [::1] target,
+                  int width, int height, int depth=3, int out_depth=1,
+                  int wr=21845, int wg=21846, int wb=21845, int tile=32, int num_threads=0):
+    """
+    Vertically flipped buffer converted to 8-bit grayscale (luma) in a single pass
+
+    OpenMP kernel of mapc.c (omp parallel for), same result as IndexMapping.mapping.vfb_gray.
+    The weights are 16.16 fixed point values (wr + wg + wb = 65536).
+
+    :param source     : 1d contiguous buffer of RGB or RGBA pixels, length width * height * depth
+    :param target     : 1d contiguous buffer, length width * height * out_depth
+    :param width      : integer; source width
+    :param height     : integer; source height
+    :param depth      : integer; 3 (RGB) or 4 (RGBA)
+    :param out_depth  : integer; 1 (gray plane) or depth (gray in R, G, B, alpha copied)
+    :param wr         : integer; red weight
+    :param wg         : integer; green weight
+    :param wb         : integer; blue weight
+    :param tile       : integer; tile size in pixels
+    :param num_threads: integer; number of threads, 0 = OpenMP default
+    :return           : numpy.ndarray; the target buffer
+    """
+    if width <= 0 or height <= 0:
+        raise ValueError('Arguments width and height cannot be <=0')
+    if depth != 3 and depth != 4:
+        raise ValueError('Argument depth must be 3 or 4')
+    if out_depth != 1 and out_depth != depth:
+        raise ValueError('Argument out_depth must be 1 or depth')
+    if wr + wg + wb != 65536:
+        raise ValueError('Arguments wr + wg + wb must be 65536')
+    if tile <= 0:
+        raise ValueError('Argument tile cannot be <=0')
+    if source.shape[0] != <Py_ssize_t>width * height * depth:
+        raise ValueError('Argument source must have length width * height * depth')
+    if target.shape[0] != <Py_ssize_t>width * height * out_depth:
+        raise ValueError('Argument target must have length width * height * out_depth')
+    cdef double start = stats_begin_c() if M_STATS else 0.0
+    with nogil:
+        m_gray_buffer(&source[0], &target[0], width, height, depth, out_depth, wr, wg, wb, tile, num_threads)
+    if M_STATS:
+        stats_end_c(STATS_GRAY_BUFFER, source.shape[0] + target.shape[0], m_team(num_threads), start)
+    return numpy.asarray(target)
+
+
+cdef int check_buffer_c(unsigned char [:] buffer_, int width, int height) except -1:
+    # The m_image kernels read and write width * height * 3 contiguous values
+    if width <= 0 or height <= 0:
+        raise ValueError('Arguments width and height cannot be <=0')
+    if buffer_.strides[0] != 1:
+        raise ValueError('Argument buffer_ must be a contiguous buffer')
+    if buffer_.shape[0] != <Py_ssize_t>width * height * 3:
+        raise ValueError('Argument buffer_ must have length width * height * 3')
+    return 0
+
+
+cdef int acquire_c(m_image * image, int width, int height, int comp) except -1:
+    # Pooled m_image of unsigned char values, MemoryError when the allocation failed
+    if width <= 0 or height <= 0 or comp <= 0:
+        raise ValueError('Arguments width, height and comp cannot be <=0')
+    if m_image_acquire(image, M_UBYTE, width, height, comp) == -1:
+        raise MemoryError('Cannot allocate %s bytes' % (<Py_ssize_t>width * height * comp))
+    return 0
+
+
+cdef inline void m_image_wrap(m_image * image, void * data, int width, int height, int comp)noexcept nogil:
+    # Describe an existing buffer of unsigned char values (no allocation, nothing to free)
+    image.data = data
+    image.width = width
+    image.height = height
+    image.comp = comp
+    image.size = <Py_ssize_t>width * height * comp
+    image.type = M_UBYTE
\ No newline at end of file
@@ -29,26 +29,187 @@ SOFTWARE.
 ```
 """
 
+from libc.stdint cimport uint32_t, uint64_t
+
+# Data types supported by the generic kernels (vfb_generic)
+ctypedef fused pixel_t:
+    unsigned char
+    unsigned short
+    unsigned int
+    float
+    double
+
 # C-structure to store 3d array index values
 cdef struct xyz:
     int x;
     int y;
     int z;
 
-cdef xyz to3d_c(unsigned int index, unsigned int width, unsigned short int depth)nogil
+# Index values of the vectorized index mapping functions, uint32_t is the fast path
+# of buffers below 4GB, uint64_t the path of larger buffers (to3d_array, to1d_array, ...)
+ctypedef fused index_t:
+    uint32_t
+    uint64_t
+
+# C-structure to store 3d array index values of buffers larger than 4GB
+cdef struct xyz64:
+    uint64_t x;
+    uint64_t y;
+    uint64_t z;
+
+# Index transform of a geometric operation (see affine_remap_c)
+# target pixel (u, v) <-- source pixel (x0 + xu * u + xv * v, y0 + yu * u + yv * v)
+cdef struct affine_t:
+    int x0;
+    int xu;
+    int xv;
+    int y0;
+    int yu;
+    int yv;
+
+# OpenMP settings of a single call (see parallel_threads_c)
+cdef struct parallel_t:
+    int num_threads;
+    int schedule;
+    int chunksize;
+
+# Functions recorded by the instrumentation (see enable_stats), same order as STATS_NAMES
+cdef enum:
+    STATS_VFB_RGB
+    STATS_VFB_RGBA
+    STATS_VFB
+    STATS_VFB_GENERIC
+    STATS_VFB_RGB_INPLACE
+    STATS_VFB_RGBA_INPLACE
+    STATS_VFB_INPLACE
+    STATS_SPLIT_RGB
+    STATS_SPLIT_RGBA
+    STATS_MERGE_RGB
+    STATS_MERGE_RGBA
+    STATS_VFB_GRAY
+    STATS_REMAP
+    STATS_TRANSFORM
+    STATS_TRANSFORM_VIEW
+    STATS_PIPELINE
+    STATS_VFB_STREAM
+    STATS_VFB_BATCH
+    STATS_HALF_TO_FLOAT
+    STATS_FLOAT_TO_HALF
+    STATS_HALF_TO_UINT8
+    STATS_UINT8_TO_HALF
+    STATS_TRANSFORM_HALF
+    STATS_FLIP_BUFFER
+    STATS_SPLIT_BUFFER
+    STATS_GRAY_BUFFER
+    STATS_TESTING_PURE_C
+    STATS_TEST_C_INPLACE
+    STATS_RGB_INPLACE
+    STATS_COUNT
+
+cdef xyz to3d_c(unsigned int index, unsigned int width, unsigned short int depth)noexcept nogil
 
 cdef unsigned int to1d_c(unsigned int x, unsigned int y,
-                         unsigned int z, unsigned int width, unsigned short int depth)nogil
+                         unsigned int z, unsigned int width, unsigned short int depth)noexcept nogil
 
 cdef unsigned int vmap_buffer_c(unsigned int index,
-                                unsigned int width, unsigned int height, unsigned short int depth)nogil
+                                unsigned int width, unsigned int height, unsigned short int depth)noexcept nogil
+
+cdef xyz64 to3d64_c(uint64_t index, uint64_t width, unsigned short int depth)noexcept nogil
+
+cdef uint64_t to1d64_c(uint64_t x, uint64_t y, uint64_t z, uint64_t width, unsigned short int depth)noexcept nogil
+
+cdef uint64_t vmap_buffer64_c(uint64_t index, uint64_t width, uint64_t height, unsigned short int depth)noexcept nogil
+
+cdef int tile_size_c(int depth)noexcept nogil
+
+cdef int parallel_threads_c(const parallel_t * par, Py_ssize_t nbytes)noexcept nogil
+
+cdef int team_c(const parallel_t * par, Py_ssize_t nbytes)noexcept nogil
+
+cdef double stats_begin_c()noexcept nogil
+
+cdef int stats_end_c(int function, Py_ssize_t nbytes, int threads, double start) except -1
+
+cdef int copy_pixels_c(unsigned char * target, const unsigned char * source,
+                       int n, Py_ssize_t step, int pixel_size)noexcept nogil
+
+cdef void transpose_tiled_c(const unsigned char * source, unsigned char * target,
+                            int width, int height, int depth, int tile,
+                            const parallel_t * par=*, Py_ssize_t src_pitch=*, Py_ssize_t dst_pitch=*)noexcept nogil
+
+cdef void transpose_tile_row_c(const unsigned char * source, unsigned char * target,
+                               int width, int height, int depth, int tile, int by,
+                               Py_ssize_t src_pitch, Py_ssize_t dst_pitch)noexcept nogil
+
+cdef void transpose_batch_c(const unsigned char * source, unsigned char * target, Py_ssize_t n,
+                            int width, int height, int depth, int tile,
+                            const parallel_t * par=*, Py_ssize_t src_pitch=*, Py_ssize_t dst_pitch=*,
+                            Py_ssize_t src_frame=*, Py_ssize_t dst_frame=*)noexcept nogil
 
 cdef unsigned char [:] vfb_rgb_c(
-        unsigned char [:] source, unsigned char [:] target, int width, int height)nogil
+        unsigned char [:] source, unsigned char [:] target, int width, int height,
+        const parallel_t * par=*, Py_ssize_t src_pitch=*, Py_ssize_t dst_pitch=*)noexcept nogil
 
 cdef unsigned char [:] vfb_rgba_c(
-        unsigned char [:] source, unsigned char [:] target, int width, int height)nogil
+        unsigned char [:] source, unsigned char [:] target, int width, int height,
+        const parallel_t * par=*, Py_ssize_t src_pitch=*, Py_ssize_t dst_pitch=*)noexcept nogil
 
 cdef unsigned char [::1] vfb_c(unsigned char [:] source, unsigned char [::1] target,
-                               int width, int height)nogil
+                               int width, int height, const parallel_t * par=*,
+                               Py_ssize_t src_pitch=*, Py_ssize_t dst_pitch=*)noexcept nogil
+
+cdef pixel_t [::1] vfb_generic_c(pixel_t [::1] source, pixel_t [::1] target,
+                                 int width, int height, int depth, const parallel_t * par=*,
+                                 Py_ssize_t src_pitch=*, Py_ssize_t dst_pitch=*)noexcept nogil
+
+cdef index_t [:, ::1] to3d_array_c(index_t [:] index, index_t [:, ::1] out,
+                                   uint64_t width, unsigned short int depth)noexcept nogil
+
+cdef index_t [:] to1d_array_c(index_t [:] x, index_t [:] y, index_t [:] z,
+                              index_t [:] out, uint64_t width, unsigned short int depth)noexcept nogil
+
+cdef index_t [:] vmap_buffer_array_c(index_t [:] index, index_t [:] out,
+                                     uint64_t width, uint64_t height, unsigned short int depth)noexcept nogil
+
+cdef void transpose_square_inplace_c(unsigned char * buffer, int n, int depth, int tile)noexcept nogil
+
+cdef int transpose_cycle_inplace_c(unsigned char * buffer, int width, int height, int depth)noexcept nogil
+
+cdef int transpose_inplace_c(unsigned char * buffer, int width, int height, int depth)noexcept nogil
+
+cdef void split_channels_c(const unsigned char * source, Py_ssize_t step,
+                           unsigned char * red, unsigned char * green, unsigned char * blue,
+                           unsigned char * alpha, Py_ssize_t n, const parallel_t * par=*)noexcept nogil
+
+cdef void merge_channels_c(unsigned char * target, Py_ssize_t step,
+                           const unsigned char * red, const unsigned char * green,
+                           const unsigned char * blue, const unsigned char * alpha,
+                           Py_ssize_t n, const parallel_t * par=*)noexcept nogil
+
+cdef void transpose_gray_c(const unsigned char * source, unsigned char * target,
+                           int width, int height, int depth, int out_depth,
+                           int wr, int wg, int wb, int tile, Py_ssize_t src_pitch,
+                           Py_ssize_t dst_pitch, const parallel_t * par=*)noexcept nogil
+
+cdef void gather_pixels_c(const unsigned char * source, unsigned char * target,
+                          const unsigned int * index, int width, int height, int pixel_size,
+                          int tile, const parallel_t * par=*, int src_height=*,
+                          Py_ssize_t src_pitch=*, Py_ssize_t dst_pitch=*)noexcept nogil
+
+cdef void affine_remap_c(const unsigned char * source, unsigned char * target,
+                         Py_ssize_t src_pitch, Py_ssize_t dst_pitch, int depth, int width_t,
+                         int height_t, const affine_t * t, int tile, const parallel_t * par=*)noexcept nogil
+
+cdef void affine_remap_strided_c(const unsigned char * source, unsigned char * target,
+                                 const Py_ssize_t * s_strides, const Py_ssize_t * t_strides,
+                                 int depth, int width_t, int height_t,
+                                 const affine_t * t, int tile, const parallel_t * par=*)noexcept nogil
+
+cdef void compose_affine_c(affine_t * t, const affine_t * o)noexcept nogil
+
+cdef void convert_half_c(const unsigned char * source, unsigned char * target, Py_ssize_t n,
+                         int kind, const parallel_t * par=*)noexcept nogil
 
+cdef void affine_half_c(const unsigned char * source, unsigned char * target,
+                        Py_ssize_t src_pitch, Py_ssize_t dst_pitch, int depth, int kind, int width_t,
+                        int height_t, const affine_t * t, int tile, const parallel_t * par=*)noexcept nogil
@@ -44,8 +44,132 @@ except ImportError:
     raise ImportError("\n<cython> library is missing on your system."
           "\nTry: \n   C:\\pip install cython on a window command prompt.")
 
-from libc.stdio cimport printf
+from libc.string cimport memcpy, memset
+from libc.stdlib cimport malloc, calloc, free
+from libc.stdint cimport uint32_t, uint64_t, UINT32_MAX
 cimport numpy as np
+from time import perf_counter
+from contextlib import contextmanager
+from collections import OrderedDict
+from functools import partial
+
+
+cdef extern from 'mapsimd.c' nogil:
+    int M_SIMD_SCALAR
+    int M_SIMD_SSE2
+    int M_SIMD_AVX2
+    int m_simd_level()
+    void m_transpose32_tile(const uint32_t * src, uint32_t * dst, Py_ssize_t src_step,
+                            Py_ssize_t dst_step, int nx, int ny, int level)
+
+
+# Half-float (float16) conversions, table driven (see maphalf.c)
+cdef extern from 'maphalf.c' nogil:
+    int M_HALF_TO_FLOAT
+    int M_FLOAT_TO_HALF
+    int M_HALF_TO_UBYTE
+    int M_UBYTE_TO_HALF
+    void m_half_init()
+    void m_half_convert(const unsigned char * src, unsigned char * dst, int n, int depth,
+                        Py_ssize_t src_step, int kind)
+
+
+# OpenMP runtime, the prange loops use schedule(runtime) and the schedule is set
+# with omp_set_schedule (OpenMP 3.0) before each parallel region. Without OpenMP
+# (or with the OpenMP 2.0 runtime of Visual Studio) the kernels run on a single
+# thread and the schedule is left to the runtime (OMP_SCHEDULE).
+cdef extern from *:
+    """
+    #define M_OMP_STATIC  1
+    #define M_OMP_DYNAMIC 2
+    #define M_OMP_GUIDED  3
+    #if defined(_OPENMP)
+    #include <omp.h>
+    static int m_omp_max_threads(void) { return omp_get_max_threads(); }
+    #if _OPENMP >= 200805
+    static void m_omp_set_schedule(int kind, int chunksize)
+    { omp_set_schedule((omp_sched_t)kind, chunksize); }
+    #else
+    static void m_omp_set_schedule(int kind, int chunksize) { (void)kind; (void)chunksize; }
+    #endif
+    #else
+    static int m_omp_max_threads(void) { return 1; }
+    static void m_omp_set_schedule(int kind, int chunksize) { (void)kind; (void)chunksize; }
+    #endif
+    """
+    int M_OMP_STATIC
+    int M_OMP_DYNAMIC
+    int M_OMP_GUIDED
+    int m_omp_max_threads()nogil
+    void m_omp_set_schedule(int kind, int chunksize)nogil
+
+
+# Build options seen by the C compiler (see build_info)
+cdef extern from *:
+    """
+    #if defined(_OPENMP)
+    #define M_OPENMP_VERSION _OPENMP
+    #else
+    #define M_OPENMP_VERSION 0
+    #endif
+    #if defined(__clang__)
+    #define M_COMPILER "clang " __clang_version__
+    #elif defined(__GNUC__)
+    #define M_COMPILER "gcc " __VERSION__
+    #elif defined(_MSC_VER)
+    #define M_STR2(x) #x
+    #define M_STR(x) M_STR2(x)
+    #define M_COMPILER "msvc " M_STR(_MSC_FULL_VER)
+    #else
+    #define M_COMPILER "unknown"
+    #endif
+    #if defined(__OPTIMIZE__) || (defined(_MSC_VER) && !defined(_DEBUG))
+    #define M_OPTIMIZED 1
+    #else
+    #define M_OPTIMIZED 0
+    #endif
+    #if defined(__AVX2__)
+    #define M_NATIVE_AVX2 1
+    #else
+    #define M_NATIVE_AVX2 0
+    #endif
+    """
+    int M_OPENMP_VERSION
+    const char * M_COMPILER
+    int M_OPTIMIZED
+    int M_NATIVE_AVX2
+
+
+# Instrumentation (see enable_stats), compiled in with INDEXMAPPING_STATS=1 (-DM_STATS=1).
+# With M_STATS = 0 the recording branches are constant false and removed by the C compiler.
+cdef extern from *:
+    """
+    #ifndef M_STATS
+    #define M_STATS 0
+    #endif
+    #if defined(_WIN32)
+    #define WIN32_LEAN_AND_MEAN
+    #define NOMINMAX
+    #include <windows.h>
+    static double m_clock(void)
+    {
+        LARGE_INTEGER f, c;
+        QueryPerformanceFrequency(&f);
+        QueryPerformanceCounter(&c);
+        return (double)c.QuadPart / (double)f.QuadPart;
+    }
+    #else
+    #include <time.h>
+    static double m_clock(void)
+    {
+        struct timespec t;
+        clock_gettime(CLOCK_MONOTONIC, &t);
+        return (double)t.tv_sec + (double)t.tv_nsec * 1e-9;
+    }
+    #endif
+    """
+    int M_STATS
+    double m_clock()nogil
 
 
 __version__ = "1.0.2"
@@ -78,6 +202,450 @@ __version__ = 1.0.1 to 1.0.2
 """
 
 
+# TRANSPOSE ENGINE TILE SIZE (PIXELS), 0 = AUTO (SEE tile_size_c)
+cdef int TILE_SIZE = 0
+# Auto tile size, a source tile and a target tile must fit in TILE_BUDGET bytes
+# (a quarter of a 32KB L1 data cache, the rest is left for the TLB-heavy column walk)
+cdef int TILE_BUDGET = 8192
+cdef int MIN_TILE_SIZE = 8
+cdef int MAX_TILE_SIZE = 128
+
+
+cpdef void set_tile_size(int tile=0):
+    """
+    Set the tile size (in pixels) used by the transpose engine (vfb_rgb, vfb_rgba, vfb)
+
+    The buffers are transposed by blocks of tile x tile pixels in order to keep the 
+    source and target rows in cache. 
+    
+    :param tile: integer; tile size in pixels (e.g 8, 16, 32, 64), 0 = auto. 
+    In auto mode the tile size is chosen so that a source tile and a target tile fit in L1 cache
+    :return    : void
+    """
+    global TILE_SIZE
+    assert tile >= 0, 'Argument tile cannot be < 0'
+    TILE_SIZE = tile
+
+
+cpdef int get_tile_size(int depth=3):
+    """
+    Return the tile size (in pixels) used by the transpose engine for a given depth
+    
+    :param depth: integer; buffer depth, 1 (alpha), 3 (RGB) or 4 (RGBA) 
+    :return     : integer; tile size in pixels
+    """
+    assert depth > 0, 'Argument depth cannot be <=0'
+    return tile_size_c(depth)
+
+
+cpdef int tune_tile_size(int width=1024, int height=1024, int depth=4,
+                         tuple candidates=(8, 16, 32, 64, 128), int repeat=5):
+    """
+    Auto-tune the tile size of the transpose engine for this machine
+    
+    Time the transpose of a (width, height, depth) buffer for every candidate tile 
+    size, keep the fastest one and set it with set_tile_size.
+    
+    :param width     : integer; width of the buffer used for the timing 
+    :param height    : integer; height of the buffer used for the timing 
+    :param depth     : integer; depth of the buffer, 1, 3 or 4
+    :param candidates: tuple; tile sizes to try 
+    :param repeat    : integer; number of transposes timed for each candidate (best time is kept)
+    :return          : integer; the tile size selected 
+    """
+    assert width > 0, 'Argument width cannot be <=0'
+    assert height > 0, 'Argument height cannot be <=0'
+    assert depth > 0, 'Argument depth cannot be <=0'
+    assert repeat > 0, 'Argument repeat cannot be <=0'
+
+    cdef:
+        unsigned char [::1] source = numpy.zeros(width * height * depth, numpy.uint8)
+        unsigned char [::1] target = numpy.empty(width * height * depth, numpy.uint8)
+        int tile, best_tile = 0, r
+        double best = 0.0, t, t0
+
+    for tile in candidates:
+        assert tile > 0, 'Candidate tile size cannot be <=0'
+        for r in range(repeat):
+            t0 = perf_counter()
+            with nogil:
+                transpose_tiled_c(&source[0], &target[0], width, height, depth, tile)
+            t = perf_counter() - t0
+            if best_tile == 0 or t < best:
+                best, best_tile = t, tile
+
+    set_tile_size(best_tile)
+    return best_tile
+
+
+# INSTRUCTION SET USED BY THE TRANSPOSE ENGINE FOR 32-BIT PIXELS
+# M_SIMD_SCALAR (0), M_SIMD_SSE2 (1) OR M_SIMD_AVX2 (2), DETECTED AT IMPORT.
+# AVX2 is opt-in, the 8x8 blocks (eight strided 32 bytes row loads) were measured
+# slower than the SSE2 4x4 blocks as soon as the buffers do not fit in L1
+cdef int SIMD_LEVEL = min(m_simd_level(), M_SIMD_SSE2)
+
+# uint8 --> half table
+m_half_init()
+
+
+cpdef int set_simd_level(int level=-1):
+    """
+    Select the instruction set used by the transpose engine for 32-bit pixels 
+    (vfb_rgba, vfb_generic with 4 bytes per pixel)
+    
+    The level is capped to the best instruction set supported by the CPU.
+    0 = scalar (portable fallback), 1 = SSE2 (4x4 pixel blocks), 2 = AVX2 (8x8 pixel blocks)
+    The default (-1) is SSE2 when available, AVX2 is only faster for buffers fitting in L1
+    
+    :param level: integer; 0, 1, 2 or -1 for the default instruction set
+    :return     : integer; the level in use
+    """
+    global SIMD_LEVEL
+    cdef int best = m_simd_level()
+    assert level >= -1, 'Argument level cannot be < -1'
+    if level == -1:
+        level = M_SIMD_SSE2
+    SIMD_LEVEL = best if level > best else level
+    return SIMD_LEVEL
+
+
+cpdef int get_simd_level():
+    """
+    Return the instruction set used by the transpose engine for 32-bit pixels
+    
+    :return: integer; 0 = scalar, 1 = SSE2, 2 = AVX2
+    """
+    return SIMD_LEVEL
+
+
+# OPENMP TEAM AND SCHEDULE USED BY THE PRANGE KERNELS (PROCESS WIDE)
+# NUM_THREADS = 0 leaves the team size to OpenMP (OMP_NUM_THREADS or all the cores)
+cdef int NUM_THREADS = 0
+cdef int SCHEDULE = M_OMP_STATIC
+# Chunk size (loop iterations), 0 = OpenMP default for the schedule
+cdef int CHUNKSIZE = 0
+# Buffers smaller than SERIAL_THRESHOLD bytes are processed by the calling thread,
+# waking up the team costs more than the copy itself
+cdef Py_ssize_t SERIAL_THRESHOLD = 65536
+cdef dict SCHEDULES = {'static': M_OMP_STATIC, 'dynamic': M_OMP_DYNAMIC, 'guided': M_OMP_GUIDED}
+
+
+cpdef void set_num_threads(int num_threads=0):
+    """
+    Set the number of OpenMP threads used by the kernels (vfb_rgb, vfb_rgba, vfb, vfb_generic,
+    to3d_array, to1d_array, vmap_buffer_array, inplace transposes)
+
+    Several worker processes running the kernels at the same time should share the cores
+    e.g set_num_threads(os.cpu_count() // workers). The setting is process wide,
+    see parallel_settings for a temporary change.
+
+    :param num_threads: integer; number of threads, 0 = OpenMP default (OMP_NUM_THREADS or all the cores)
+    :return           : void
+    """
+    global NUM_THREADS
+    assert num_threads >= 0, 'Argument num_threads cannot be < 0'
+    NUM_THREADS = num_threads
+
+
+cpdef int get_num_threads():
+    """
+    Return the number of OpenMP threads used by the kernels for large buffers
+
+    :return: integer; number of threads (1 when the library is compiled without OpenMP)
+    """
+    return NUM_THREADS if NUM_THREADS > 0 else m_omp_max_threads()
+
+
+cpdef void set_schedule(str schedule='static', int chunksize=0):
+    """
+    Set the OpenMP schedule of the kernels loops
+
+    'static' splits the rows evenly between the threads (default, best for a dedicated machine),
+    'dynamic' and 'guided' hand out chunks of rows to the idle threads (better when the
+    cores are shared with other processes). The schedule is ignored by OpenMP 2.0 runtimes
+    (Visual Studio), use the OMP_SCHEDULE environment variable instead.
+
+    :param schedule : string; 'static', 'dynamic' or 'guided'
+    :param chunksize: integer; number of loop iterations (rows of tiles) per chunk, 0 = OpenMP default
+    :return         : void
+    """
+    global SCHEDULE, CHUNKSIZE
+    assert schedule in SCHEDULES, "Argument schedule must be 'static', 'dynamic' or 'guided'"
+    assert chunksize >= 0, 'Argument chunksize cannot be < 0'
+    SCHEDULE = SCHEDULES[schedule]
+    CHUNKSIZE = chunksize
+
+
+cpdef tuple get_schedule():
+    """
+    Return the OpenMP schedule of the kernels loops
+
+    :return: tuple; schedule name ('static', 'dynamic' or 'guided') and chunk size (0 = default)
+    """
+    for name, kind in SCHEDULES.items():
+        if kind == SCHEDULE:
+            return name, CHUNKSIZE
+
+
+cpdef void set_serial_threshold(Py_ssize_t nbytes=65536):
+    """
+    Set the size (in bytes) below which a buffer is processed by the calling thread only
+
+    For small buffers the time taken to wake up the OpenMP team is longer than the copy.
+
+    :param nbytes: integer; buffer size in bytes, 0 = always use the OpenMP team
+    :return      : void
+    """
+    global SERIAL_THRESHOLD
+    assert nbytes >= 0, 'Argument nbytes cannot be < 0'
+    SERIAL_THRESHOLD = nbytes
+
+
+cpdef Py_ssize_t get_serial_threshold():
+    """
+    Return the size (in bytes) below which a buffer is processed by the calling thread only
+
+    :return: integer; buffer size in bytes
+    """
+    return SERIAL_THRESHOLD
+
+
+# KERNELS OF THE FLIP, SPLIT AND GRAYSCALE FUNCTIONS, None = prange kernels of this module,
+# otherwise the mapcfunctions module (OpenMP kernels of mapc.c)
+cdef object C_BACKEND = None
+
+
+cpdef str set_backend(str backend='cython'):
+    """
+    Select the kernels of vfb_rgb, vfb_rgba, vfb, split_rgb, split_rgba and vfb_gray
+
+    'cython' : prange kernels of this module (default)
+    'c'      : OpenMP kernels of mapc.c (IndexMapping.mapcfunctions)
+    Both backends return the same buffers and follow the thread and schedule settings
+    (set_num_threads, set_schedule, set_serial_threshold). The C backend only handles
+    contiguous buffers without src_pitch / dst_pitch, the other calls use the prange kernels.
+
+    :param backend: string; 'cython' or 'c'
+    :return       : string; the backend in use
+    """
+    global C_BACKEND
+    assert backend in ('cython', 'c'), "Argument backend must be 'cython' or 'c'"
+    if backend == 'c':
+        from IndexMapping import mapcfunctions
+        C_BACKEND = mapcfunctions
+    else:
+        C_BACKEND = None
+    return backend
+
+
+cpdef str get_backend():
+    """
+    Return the backend of the flip, split and grayscale functions (see set_backend)
+
+    :return: string; 'cython' or 'c'
+    """
+    return 'cython' if C_BACKEND is None else 'c'
+
+
+# INSTRUMENTATION OF THE BUFFER TRANSFORMS (OPT-IN), ONE ENTRY PER FUNCTION (mapping.pxd)
+# Histogram bucket k counts the calls of [2^k, 2^(k+1)) microseconds (bucket 0 below 2us)
+cdef enum:
+    STATS_BUCKETS = 24
+
+cdef struct stats_t:
+    Py_ssize_t calls
+    Py_ssize_t nbytes
+    double seconds
+    int threads
+    Py_ssize_t histogram[STATS_BUCKETS]
+
+cdef tuple STATS_NAMES = (
+    'vfb_rgb', 'vfb_rgba', 'vfb', 'vfb_generic', 'vfb_rgb_inplace', 'vfb_rgba_inplace', 'vfb_inplace',
+    'split_rgb', 'split_rgba', 'merge_rgb', 'merge_rgba', 'vfb_gray', 'RemapPlan.apply', 'transform',
+    'transform_view', 'Pipeline.apply', 'vfb_stream', 'vfb_batch', 'half_to_float', 'float_to_half',
+    'half_to_uint8', 'uint8_to_half', 'transform_half', 'mapcfunctions.flip_buffer',
+    'mapcfunctions.split_buffer', 'mapcfunctions.gray_buffer', 'mapcfunctions.testing_pure_c',
+    'mapcfunctions.test_c_inplace', 'mapcfunctions.rgb_inplace')
+cdef stats_t STATS[STATS_COUNT]
+cdef bint STATS_ENABLED = False
+cdef object STATS_CALLBACK = None
+memset(STATS, 0, sizeof(STATS))
+
+
+cpdef bint enable_stats(bint enabled=True, callback=None):
+    """
+    Record the calls of the buffer transforms (vfb_rgb, vfb_rgba, vfb, split / merge, 
+    transform, half-float conversions, mapcfunctions kernels ...)
+
+    For each function: number of calls, bytes processed (read + written), wall time,
+    histogram of the call durations and largest OpenMP team. The counters are compiled in
+    with INDEXMAPPING_STATS=1 only (build_info()['stats']), otherwise this function
+    returns False and the transforms carry no instrumentation at all. When compiled in
+    and disabled, the cost is a test per call.
+
+    e.g
+    enable_stats(True, lambda name, nbytes, seconds, threads: metrics.observe(name, seconds))
+
+    :param enabled : bool; True to record the calls
+    :param callback: callable or None; called after each recorded call with
+    (name, nbytes, seconds, threads), from the calling thread (the GIL is held)
+    :return        : bool; True when the calls are recorded
+    """
+    global STATS_ENABLED, STATS_CALLBACK
+    assert callback is None or callable(callback), 'Argument callback must be callable or None'
+    STATS_ENABLED = enabled and M_STATS == 1
+    STATS_CALLBACK = callback if STATS_ENABLED else None
+    return STATS_ENABLED
+
+
+cpdef dict get_stats(bint reset=False):
+    """
+    Return a snapshot of the instrumentation counters (see enable_stats)
+
+    e.g
+    >>> get_stats()['vfb_rgb']
+    {'calls': 120, 'nbytes': 754974720, 'seconds': 0.41, 'threads': 8, 'histogram': [0, ..., 118, 2, ...]}
+
+    :param reset: bool; True to clear the counters after the snapshot
+    :return     : dictionary; function name --> calls, nbytes (read + written), seconds (wall
+    time), threads (largest team) and histogram (list of STATS_BUCKETS counts, bucket k holds
+    the calls of [2^k, 2^(k+1)) microseconds). Only the functions called are listed.
+    """
+    cdef int i
+    cdef dict snapshot = {}
+    for i in range(STATS_COUNT):
+        if STATS[i].calls:
+            snapshot[STATS_NAMES[i]] = {
+                'calls': STATS[i].calls, 'nbytes': STATS[i].nbytes, 'seconds': STATS[i].seconds,
+                'threads': STATS[i].threads,
+                'histogram': [STATS[i].histogram[k] for k in range(STATS_BUCKETS)]}
+    if reset:
+        reset_stats()
+    return snapshot
+
+
+cpdef void reset_stats():
+    """
+    Clear the instrumentation counters
+
+    :return: void
+    """
+    memset(STATS, 0, sizeof(STATS))
+
+
+@contextmanager
+def parallel_settings(int num_threads=0, schedule=None, int chunksize=-1):
+    """
+    Context manager changing the OpenMP settings of the kernels temporarily
+
+    e.g
+    with parallel_settings(num_threads=2, schedule='dynamic'):
+        vfb_rgb(source, target, w, h)
+
+    The previous settings are restored when leaving the block. The settings are process
+    wide, use the num_threads, schedule and chunksize arguments of the functions for
+    calls made from several Python threads.
+
+    :param num_threads: integer; number of threads, 0 = keep the current setting
+    :param schedule   : string; 'static', 'dynamic', 'guided' or None to keep the current schedule
+    :param chunksize  : integer; chunk size, 0 = OpenMP default, -1 = keep the current setting
+    """
+    global NUM_THREADS, SCHEDULE, CHUNKSIZE
+    saved = (NUM_THREADS, SCHEDULE, CHUNKSIZE)
+    cdef parallel_t par
+    parallel_c(&par, num_threads, schedule, chunksize)
+    NUM_THREADS, SCHEDULE, CHUNKSIZE = par.num_threads, par.schedule, par.chunksize
+    try:
+        yield
+    finally:
+        NUM_THREADS, SCHEDULE, CHUNKSIZE = saved
+
+
+cdef int parallel_c(parallel_t * par, int num_threads, schedule, int chunksize) except -1:
+    # Fill par with the OpenMP settings of a single call, the module settings are used
+    # for num_threads = 0, schedule = None and chunksize = -1
+    assert num_threads >= 0, 'Argument num_threads cannot be < 0'
+    assert schedule is None or schedule in SCHEDULES, \
+        "Argument schedule must be 'static', 'dynamic', 'guided' or None"
+    assert chunksize >= -1, 'Argument chunksize cannot be < -1'
+    par.num_threads = num_threads if num_threads > 0 else NUM_THREADS
+    par.schedule = SCHEDULE if schedule is None else SCHEDULES[schedule]
+    par.chunksize = CHUNKSIZE if chunksize == -1 else chunksize
+    return 0
+
+
+cdef Py_ssize_t pitch_c(Py_ssize_t pitch, Py_ssize_t row_bytes, Py_ssize_t rows, Py_ssize_t nbytes,
+                        bint target) except -1:
+    # Bytes between two rows of a buffer holding rows rows of row_bytes bytes, pitch = 0 for
+    # packed rows. The buffer (nbytes) must hold the last row, the padding after it is optional.
+    if pitch == 0:
+        pitch = row_bytes
+    if pitch < row_bytes:
+        raise ValueError('Argument %s cannot be < %s (bytes of a row)' % (
+            'dst_pitch' if target else 'src_pitch', row_bytes))
+    if nbytes < (rows - 1) * pitch + row_bytes:
+        raise ValueError('Argument %s is too short for %s rows of %s bytes %s bytes apart' % (
+            'target' if target else 'source', rows, row_bytes, pitch))
+    return pitch
+
+
+cdef int check_size_c(int width, int height, int depth, Py_ssize_t source, Py_ssize_t target,
+                      bint padded=False) except -1:
+    # Single upfront check of the buffer transforms (kept under python -O), the nogil kernels
+    # read and write width * height * depth values without bounds checks. source and target
+    # are the buffer lengths, the padded buffers are checked by pitch_c
+    if width <= 0:
+        raise ValueError('Argument width cannot be <=0')
+    if height <= 0:
+        raise ValueError('Argument height cannot be <=0')
+    if depth <= 0:
+        raise ValueError('Argument depth cannot be <=0')
+    if padded:
+        return 0
+    if source != <Py_ssize_t>width * height * depth:
+        raise ValueError('Argument source must have length width * height * %s' % depth)
+    if target != source:
+        raise ValueError('Arguments source and target must have the same length')
+    return 0
+
+
+cpdef dict build_info():
+    """
+    Return the build options of the library
+
+    Use this function to confirm that the library was compiled with OpenMP, without it
+    the prange loops run on a single thread (e.g setup.py of versions <= 1.0.2 on Linux).
+
+    e.g
+    >>> build_info()['openmp']
+    True
+
+    :return: dictionary; 
+        openmp         : bool, OpenMP enabled at compile time
+        openmp_version : integer, OpenMP version (_OPENMP macro, e.g 201511), 0 without OpenMP
+        max_threads    : integer, number of threads used by the kernels (see set_num_threads)
+        compiler       : string, compiler name and version
+        optimized      : bool, compiled with optimizations (-O2 / -O3 / /O2)
+        avx2           : bool, compiled for a CPU with AVX2 (e.g -march=native)
+        simd_cpu       : integer, best instruction set of this CPU (0 scalar, 1 SSE2, 2 AVX2)
+        simd_level     : integer, instruction set used by the transpose engine (see set_simd_level)
+        stats          : bool, instrumentation compiled in (INDEXMAPPING_STATS=1, see enable_stats)
+        version        : string, library version
+    """
+    return {
+        'openmp'        : M_OPENMP_VERSION > 0,
+        'openmp_version': M_OPENMP_VERSION,
+        'max_threads'   : get_num_threads(),
+        'compiler'      : M_COMPILER.decode('ascii', 'replace'),
+        'optimized'     : M_OPTIMIZED == 1,
+        'avx2'          : M_NATIVE_AVX2 == 1,
+        'simd_cpu'      : m_simd_level(),
+        'simd_level'    : SIMD_LEVEL,
+        'stats'         : M_STATS == 1,
+        'version'       : __version__
+    }
+
+
 # MAP BUFFER INDEX VALUE INTO 3D INDEXING
 cpdef tuple to3d(unsigned int index, unsigned int width, unsigned short int depth):
     """
@@ -98,6 +666,7 @@ cpdef tuple to3d(unsigned int index, unsigned int width, unsigned short int dept
     :param depth: python int; depth (RGB = 3) | (RGBA = 4) value in range [0...65535]
     :return     : Return a python tuple containing x, y, z index values 
     """
+    check_index_c(width, depth)
     cdef xyz v = to3d_c(index, width, depth)
     return v.x, v.y, v.z
 
@@ -129,9 +698,15 @@ cpdef unsigned int to1d(unsigned int x, unsigned int y,
     If the 3d array is build from a pygame.Surface, then width is also the image width
     :param depth : python int; depth, either RGB (depth = 3) or RGBA (depth = 4)
     :return      : python int; return the index value (1d array) corresponding to a 3d array with index position 
-    (x, y, z) The index value is cap to [0 ... 4294967295]
+    (x, y, z). OverflowError when the index value exceeds 4294967295 (see to1d64)
     """
-    return to1d_c(x, y, z, width, depth)
+    # Computed in 64-bit, y * width first so the product cannot wrap
+    if depth and <uint64_t>y * width > UINT32_MAX:
+        raise OverflowError('Index value of (%s, %s, %s) exceeds 4294967295, use to1d64' % (x, y, z))
+    cdef uint64_t index = to1d64_c(x, y, z, width, depth)
+    if index > UINT32_MAX:
+        raise OverflowError('Index value of (%s, %s, %s) exceeds 4294967295, use to1d64' % (x, y, z))
+    return <unsigned int>index
 
 # VERTICALLY FLIP A SINGLE BUFFER VALUE
 cpdef vmap_buffer(unsigned int index, unsigned int width, unsigned int height, unsigned short int depth):
@@ -165,12 +740,73 @@ cpdef vmap_buffer(unsigned int index, unsigned int width, unsigned int height, u
     :param depth  : integer; Original image depth=3 for RGB or 4 for RGBA . Must be in range [0, 65535]
     :return       : integer value pointing to the pixel in the buffer (traversed vertically). 
     """
+    check_index_c(width, depth)
     return vmap_buffer_c(index, width, height, depth)
 
-# Todo this could be done inplace
+
+cdef inline int check_index_c(unsigned long long width, unsigned short int depth) except -1:
+    # Single upfront check of the index mapping functions, the C kernels are branch free
+    if width == 0:
+        raise ValueError('Argument width cannot be null!')
+    if depth == 0:
+        raise ValueError('Argument depth cannot be null!')
+    return 0
+
+
+# 64-BIT INDEX MAPPING (BUFFERS LARGER THAN 4GB)
+cpdef tuple to3d64(unsigned long long index, unsigned long long width, unsigned short int depth):
+    """
+    Index mapping (buffer indexing --> 3d array) for buffers larger than 4GB
+
+    Same as to3d with 64-bit index values, to3d is capped to 32-bit values.
+
+    :param index: python int; buffer index value in range [0...18446744073709551615]
+    :param width: python int; width (3d array columns number) value in range [1...18446744073709551615]
+    :param depth: python int; depth (RGB = 3) | (RGBA = 4) value in range [1...65535]
+    :return     : Return a python tuple containing x, y, z index values
+    """
+    check_index_c(width, depth)
+    cdef xyz64 v = to3d64_c(index, width, depth)
+    return v.x, v.y, v.z
+
+
+cpdef unsigned long long to1d64(unsigned long long x, unsigned long long y, unsigned long long z,
+                                unsigned long long width, unsigned short int depth):
+    """
+    Index mapping (3d array indexing --> buffer) for buffers larger than 4GB
+
+    Same as to1d with 64-bit index values, to1d is capped to 32-bit values.
+
+    :param x     : python int; index x of the array such as array[x, y, z]
+    :param y     : python int; index y of the array such as array[x, y, z]
+    :param z     : python int; index z of the array such as array[x, y, z]
+    :param width : python int; width of the 3d array (number of columns)
+    :param depth : python int; depth, either RGB (depth = 3) or RGBA (depth = 4)
+    :return      : python int; index value (1d array) of the position (x, y, z)
+    """
+    return to1d64_c(x, y, z, width, depth)
+
+
+cpdef unsigned long long vmap_buffer64(unsigned long long index, unsigned long long width,
+                                       unsigned long long height, unsigned short int depth):
+    """
+    Vertically flipped a single buffer value for buffers larger than 4GB
+
+    Same as vmap_buffer with 64-bit index values, vmap_buffer is capped to 32-bit values.
+
+    :param index  : integer; index value to convert
+    :param width  : integer; Original image width, must be > 0
+    :param height : integer; Original image height
+    :param depth  : integer; Original image depth=3 for RGB or 4 for RGBA, must be > 0
+    :return       : integer value pointing to the pixel in the buffer (traversed vertically).
+    """
+    check_index_c(width, depth)
+    return vmap_buffer64_c(index, width, height, depth)
+
 # FLIP VERTICALLY A BUFFER (TYPE RGB)
 cpdef np.ndarray[np.uint8_t, ndim=1] vfb_rgb(
-        unsigned char [:] source, unsigned char [:] target, int width, int height):
+        unsigned char [:] source, unsigned char [:] target, int width, int height,
+        int num_threads=0, schedule=None, int chunksize=-1, Py_ssize_t src_pitch=0, Py_ssize_t dst_pitch=0):
     """
     Vertically flipped buffer containing any format of RGB colors
     
@@ -204,24 +840,46 @@ cpdef np.ndarray[np.uint8_t, ndim=1] vfb_rgb(
     :param target   : Target buffer must have same length than source buffer)
     :param width    : integer; Source array's width (or width of the original image). 
     :param height   : integer; source array's height (or height of the original image). 
+    :param num_threads: integer; number of OpenMP threads for this call, 0 = module setting (set_num_threads)
+    :param schedule   : string; 'static', 'dynamic', 'guided' or None for the module setting (set_schedule)
+    :param chunksize  : integer; chunk size for this call, 0 = OpenMP default, -1 = module setting
+    :param src_pitch  : integer; bytes between two rows of a padded source (a row holds the
+    height pixels of a column x), 0 for packed rows (height * depth bytes)
+    :param dst_pitch  : integer; bytes between two rows of a padded target (a row holds the
+    width pixels of a line y), 0 for packed rows (width * depth bytes)
     :return         : Return a vertically flipped 1D RGB buffer (swapped rows and columns of the 2d model) 
     
     """
-    assert width  > 0, 'Argument width cannot be <=0'
-    assert height > 0, 'Argument height cannot be <=0'
-    return numpy.asarray(vfb_rgb_c(source, target, width, height))
+    check_size_c(width, height, 3, source.shape[0], target.shape[0], src_pitch or dst_pitch)
+    cdef parallel_t par
+    if src_pitch or dst_pitch:
+        if source.strides[0] != 1 or target.strides[0] != 1:
+            raise ValueError('Arguments source and target must be contiguous buffers with src_pitch / dst_pitch')
+        src_pitch = pitch_c(src_pitch, <Py_ssize_t>height * 3, width, source.shape[0], False)
+        dst_pitch = pitch_c(dst_pitch, <Py_ssize_t>width * 3, height, target.shape[0], True)
+    parallel_c(&par, num_threads, schedule, chunksize)
+    cdef double start = stats_begin_c()
+    if C_BACKEND is not None and src_pitch == 0 and dst_pitch == 0 \
+            and source.strides[0] == 1 and target.strides[0] == 1:
+        C_BACKEND.flip_buffer(source, target, width, height, 3, tile_size_c(3),
+                              parallel_threads_c(&par, <Py_ssize_t>width * height * 3))
+    else:
+        with nogil:
+            vfb_rgb_c(source, target, width, height, &par, src_pitch, dst_pitch)
+    stats_end_c(STATS_VFB_RGB, <Py_ssize_t>width * height * 6, team_c(&par, <Py_ssize_t>width * height * 3), start)
+    return numpy.asarray(target)
 
-# TODO this could be done inplace
 # FLIP VERTICALLY A BUFFER (TYPE RGBA)
 cpdef np.ndarray[np.uint8_t, ndim=1] vfb_rgba(
-        unsigned char [:] source, unsigned char [:] target, int width, int height):
+        unsigned char [:] source, unsigned char [:] target, int width, int height,
+        int num_threads=0, schedule=None, int chunksize=-1, Py_ssize_t src_pitch=0, Py_ssize_t dst_pitch=0):
     """
     Vertically flipped buffer containing any format of RGBA colors
     
     Flip a C-buffer vertically filled with RGBA values
     Re-sample a buffer in order to swap rows and columns of its equivalent 3d model
     For a 3d numpy.array this function would be equivalent to a transpose (1, 0, 2)
-    Buffer length must be equivalent to width x height x RGBA otherwise a valuerror
+    Buffer length must be equivalent to width x height x RGBA otherwise a ValueError
     will be raised.
     SOURCE AND TARGET ARRAY MUST BE SAME SIZE.
     This method is using Multiprocessing OPENMP
@@ -247,16 +905,39 @@ cpdef np.ndarray[np.uint8_t, ndim=1] vfb_rgba(
     :param target   : Target buffer must have same length than source buffer)
     :param width    : integer; Source array's width (or width of the original image). 
     :param height   : integer; source array's height (or height of the original image). 
+    :param num_threads: integer; number of OpenMP threads for this call, 0 = module setting (set_num_threads)
+    :param schedule   : string; 'static', 'dynamic', 'guided' or None for the module setting (set_schedule)
+    :param chunksize  : integer; chunk size for this call, 0 = OpenMP default, -1 = module setting
+    :param src_pitch  : integer; bytes between two rows of a padded source (a row holds the
+    height pixels of a column x), 0 for packed rows (height * depth bytes)
+    :param dst_pitch  : integer; bytes between two rows of a padded target (a row holds the
+    width pixels of a line y), 0 for packed rows (width * depth bytes)
     :return         : Return a vertically flipped 1D RGBA buffer (swapped rows and columns of the 2d model) 
     """
-    assert width > 0, 'Argument width cannot be <=0'
-    assert height > 0, 'Argument height cannot be <=0'
-    return numpy.asarray(vfb_rgba_c(source, target, width, height))
+    check_size_c(width, height, 4, source.shape[0], target.shape[0], src_pitch or dst_pitch)
+    cdef parallel_t par
+    if src_pitch or dst_pitch:
+        if source.strides[0] != 1 or target.strides[0] != 1:
+            raise ValueError('Arguments source and target must be contiguous buffers with src_pitch / dst_pitch')
+        src_pitch = pitch_c(src_pitch, <Py_ssize_t>height * 4, width, source.shape[0], False)
+        dst_pitch = pitch_c(dst_pitch, <Py_ssize_t>width * 4, height, target.shape[0], True)
+    parallel_c(&par, num_threads, schedule, chunksize)
+    cdef double start = stats_begin_c()
+    if C_BACKEND is not None and src_pitch == 0 and dst_pitch == 0 \
+            and source.strides[0] == 1 and target.strides[0] == 1:
+        C_BACKEND.flip_buffer(source, target, width, height, 4, tile_size_c(4),
+                              parallel_threads_c(&par, <Py_ssize_t>width * height * 4))
+    else:
+        with nogil:
+            vfb_rgba_c(source, target, width, height, &par, src_pitch, dst_pitch)
+    stats_end_c(STATS_VFB_RGBA, <Py_ssize_t>width * height * 8, team_c(&par, <Py_ssize_t>width * height * 4), start)
+    return numpy.asarray(target)
 
-# TODO this could be done inplace
 # FLIP VERTICALLY A BUFFER (TYPE ALPHA, (WIDTH, HEIGHT))
 cpdef unsigned char [::1] vfb(unsigned char [:] source,
-                              unsigned char [::1] target, int width, int height):
+                              unsigned char [::1] target, int width, int height,
+                              int num_threads=0, schedule=None, int chunksize=-1,
+                              Py_ssize_t src_pitch=0, Py_ssize_t dst_pitch=0):
     """
     Flip vertically the content (e.g alpha values) of an 1d buffer structure.
     buffer representing an array type (w, h) 
@@ -266,127 +947,2477 @@ cpdef unsigned char [::1] vfb(unsigned char [:] source,
     of the source array but flipped vertically 
     :param width: source width. 
     :param height: source height. 
+    :param num_threads: number of OpenMP threads for this call, 0 = module setting (set_num_threads)
+    :param schedule: 'static', 'dynamic', 'guided' or None for the module setting (set_schedule)
+    :param chunksize: chunk size for this call, 0 = OpenMP default, -1 = module setting
+    :param src_pitch: bytes between two rows (height values) of a padded source, 0 for packed rows
+    :param dst_pitch: bytes between two rows (width values) of a padded target, 0 for packed rows
     :return: return 1d buffer (source array flipped)
     """
-    assert width > 0, 'Argument width cannot be <=0'
-    assert height > 0, 'Argument height cannot be <=0'
-    return vfb_c(source, target, width, height)
-
-@cython.boundscheck(False)
-@cython.wraparound(False)
-@cython.nonecheck(False)
-@cython.cdivision(False)
-cdef inline xyz to3d_c(unsigned int index, unsigned int width, unsigned short int depth)nogil:
-
-    if width == 0:
-        with gil:
-            printf("\nArgument width cannot be null!")
-            raise ValueError
+    check_size_c(width, height, 1, source.shape[0], target.shape[0], src_pitch or dst_pitch)
+    cdef parallel_t par
+    if src_pitch or dst_pitch:
+        if source.strides[0] != 1 or target.strides[0] != 1:
+            raise ValueError('Arguments source and target must be contiguous buffers with src_pitch / dst_pitch')
+        src_pitch = pitch_c(src_pitch, <Py_ssize_t>height * 1, width, source.shape[0], False)
+        dst_pitch = pitch_c(dst_pitch, <Py_ssize_t>width * 1, height, target.shape[0], True)
+    parallel_c(&par, num_threads, schedule, chunksize)
+    cdef double start = stats_begin_c()
+    if C_BACKEND is not None and src_pitch == 0 and dst_pitch == 0 and source.strides[0] == 1:
+        C_BACKEND.flip_buffer(source, target, width, height, 1, tile_size_c(1),
+                              parallel_threads_c(&par, <Py_ssize_t>width * height))
+    else:
+        with nogil:
+            vfb_c(source, target, width, height, &par, src_pitch, dst_pitch)
+    stats_end_c(STATS_VFB, <Py_ssize_t>width * height * 2, team_c(&par, <Py_ssize_t>width * height), start)
+    return target
 
-    if depth == 0:
-        with gil:
-            printf("\nArgument depth cannot be null!")
-            raise ValueError
 
+# FLIP VERTICALLY A BUFFER (ANY DATA TYPE, ANY DEPTH)
+cpdef vfb_generic(pixel_t [::1] source, pixel_t [::1] target, int width, int height, int depth,
+                  int num_threads=0, schedule=None, int chunksize=-1,
+                  Py_ssize_t src_pitch=0, Py_ssize_t dst_pitch=0):
+    """
+    Vertically flipped buffer of any data type and any depth
+    
+    Generic version of vfb_rgb (depth 3), vfb_rgba (depth 4) and vfb (depth 1) for 
+    buffers of type numpy.uint8, numpy.uint16, numpy.uint32, numpy.float32 or numpy.float64
+    (e.g 16-bit depth maps, float32 HDR frames, 2-channel buffers).
+    A float16 buffer can be flipped with its numpy.uint16 view, e.g buffer.view(numpy.uint16)
+    
+    The function is specialized at compile time for each data type and moves a whole 
+    pixel (depth values) per iteration. For a 3d numpy.array this function would be 
+    equivalent to a transpose (1, 0, 2).
+    SOURCE AND TARGET ARRAY MUST BE SAME SIZE AND SAME DATA TYPE.
+    This method is using Multiprocessing OPENMP if enabled during the compilation
+    
+    e.g
+    source = numpy.zeros(w * h * 2, dtype=numpy.float32)
+    target = numpy.empty(w * h * 2, dtype=numpy.float32)
+    vfb_generic(source, target, w, h, 2)
+    
+    :param source : 1d contiguous buffer to flip vertically, length width * height * depth 
+    :param target : 1d contiguous buffer, same length and data type than the source buffer
+    :param width  : integer; Source array's width (or width of the original image).
+    :param height : integer; source array's height (or height of the original image).
+    :param depth  : integer; number of values per pixel (e.g 1, 2, 3, 4) 
+    :param num_threads: integer; number of OpenMP threads for this call, 0 = module setting
+    :param schedule   : string; 'static', 'dynamic', 'guided' or None for the module setting
+    :param chunksize  : integer; chunk size for this call, 0 = OpenMP default, -1 = module setting
+    :param src_pitch  : integer; bytes between two rows (height pixels) of a padded source, 0 for
+    packed rows (height * depth values)
+    :param dst_pitch  : integer; bytes between two rows (width pixels) of a padded target, 0 for
+    packed rows (width * depth values)
+    :return       : Return the target buffer (numpy.ndarray) vertically flipped  
+    """
+    check_size_c(width, height, depth, source.shape[0], target.shape[0], src_pitch or dst_pitch)
     cdef:
-        xyz v
-        unsigned int ix = index // depth
+        parallel_t par
+        Py_ssize_t pixel_size = depth * <Py_ssize_t>sizeof(pixel_t)
+    if src_pitch or dst_pitch:
+        src_pitch = pitch_c(src_pitch, height * pixel_size, width, source.shape[0] * sizeof(pixel_t), False)
+        dst_pitch = pitch_c(dst_pitch, width * pixel_size, height, target.shape[0] * sizeof(pixel_t), True)
+    parallel_c(&par, num_threads, schedule, chunksize)
+    cdef double start = stats_begin_c()
+    with nogil:
+        vfb_generic_c(source, target, width, height, depth, &par, src_pitch, dst_pitch)
+    stats_end_c(STATS_VFB_GENERIC, <Py_ssize_t>width * height * pixel_size * 2,
+                team_c(&par, <Py_ssize_t>width * height * pixel_size), start)
+    return numpy.asarray(target)
 
-    v.y = <int>(ix / width)
-    v.x = <int>(ix % width)
-    v.z = <int>(index % depth)
-    return v
 
-@cython.boundscheck(False)
-@cython.wraparound(False)
-@cython.nonecheck(False)
-@cython.cdivision(True)
-cdef inline unsigned int to1d_c(unsigned int x, unsigned int y,
-                       unsigned int z,  unsigned int width, unsigned short int depth)nogil:
+# MAP AN ARRAY OF BUFFER INDEX VALUES INTO 3D INDEXING
+cpdef np.ndarray to3d_array(index, unsigned long long width, unsigned short int depth, out=None):
+    """
+    Index mapping for a whole array of buffer indexes (buffer indexing --> 3d array)
 
-    return <unsigned int>(y * width * depth + x * depth + z)
+    Vectorized version of to3d. Every index value of the array is converted into its 
+    equivalent position (x, y, z) in a 3d array in a single call (nogil, prange).  
+    
+    e.g :
+    index = numpy.arange(w * h * 3, dtype=numpy.uint32)
+    xyz_ = to3d_array(index, w, 3)
+    rgb_array[xyz_[:, 0], xyz_[:, 1], xyz_[:, 2]] = c_buffer
+    
+    numpy.uint32 index values use the 32-bit kernel, numpy.uint64 index values (or a width
+    above 4294967295) use the 64-bit kernel and return numpy.uint64 values.
 
+    :param index: 1d numpy.ndarray (numpy.uint32 or numpy.uint64); buffer index values
+    :param width: python int; width (3d array columns number) value in range [1...18446744073709551615] 
+    :param depth: python int; depth (RGB = 3) | (RGBA = 4) value in range [1...65535]
+    :param out  : Optional 2d numpy.ndarray shape (len(index), 3) same type as the result to store 
+    the result (no allocation when provided)
+    :return     : Return a numpy.ndarray shape (len(index), 3) containing the x, y, z index values 
+    """
+    if width <= 0:
+        raise ValueError('Argument width cannot be <=0')
+    if depth <= 0:
+        raise ValueError('Argument depth cannot be <=0')
+    cdef:
+        unsigned int [:] index32
+        unsigned int [:, ::1] out32
+        uint64_t [:] index64
+        uint64_t [:, ::1] out64
+    if not index64_c(index, width):
+        index32 = index
+        out32 = numpy.empty((index32.shape[0], 3), dtype=numpy.uint32) if out is None else out
+        if not (out32.shape[0] == index32.shape[0] and out32.shape[1] == 3):
+            raise ValueError('Argument out must be shape (%s, 3)' % index32.shape[0])
+        with nogil:
+            to3d_array_c(index32, out32, width, depth)
+        return numpy.asarray(out32)
+    index64 = as_index64(index)
+    out64 = numpy.empty((index64.shape[0], 3), dtype=numpy.uint64) if out is None else out
+    if not (out64.shape[0] == index64.shape[0] and out64.shape[1] == 3):
+        raise ValueError('Argument out must be shape (%s, 3)' % index64.shape[0])
+    with nogil:
+        to3d_array_c(index64, out64, width, depth)
+    return numpy.asarray(out64)
 
-@cython.boundscheck(False)
-@cython.wraparound(False)
-@cython.nonecheck(False)
-@cython.cdivision(False)
-cdef inline unsigned int vmap_buffer_c(unsigned int index,
-                              unsigned int width, unsigned int height, unsigned short int depth)nogil:
-    if width == 0:
-        with gil:
-            printf("\nArgument width cannot be null!")
-            raise ValueError
 
-    if depth == 0:
-        with gil:
-            printf("\nArgument depth cannot be null!")
-            raise ValueError
+# MAP ARRAYS OF 3D INDEX VALUES INTO BUFFER INDEXING
+cpdef np.ndarray to1d_array(x, y, z, unsigned long long width, unsigned short int depth, out=None):
+    """
+    Index mapping for whole arrays of 3d indexes (3d array indexing --> buffer)
+
+    Vectorized version of to1d. The arrays x, y and z hold the index values 
+    of the 3d array (x[i], y[i], z[i]) and are converted into buffer index values 
+    in a single call (nogil, prange).
+    
+    e.g :
+    index = to1d_array(xs, ys, zs, w, 3)
+    c_buffer[index] = rgb_array[xs, ys, zs]
+    
+    * x, y, z (and out) must have the same length
+    * numpy.uint64 arrays (or a width above 4294967295) use the 64-bit kernel
+    
+    :param x     : 1d numpy.ndarray (numpy.uint32 or numpy.uint64); x index values such as array[x, y, z]
+    :param y     : 1d numpy.ndarray (same type as x); y index values such as array[x, y, z]
+    :param z     : 1d numpy.ndarray (same type as x); z index values such as array[x, y, z]
+    :param width : python int; width of the 3d array (number of columns)
+    :param depth : python int; depth, either RGB (depth = 3) or RGBA (depth = 4)
+    :param out   : Optional 1d numpy.ndarray (same type as the result) to store the result 
+    (no allocation when provided)
+    :return      : 1d numpy.ndarray of buffer index values. numpy.uint32 arrays whose index
+    values exceed 4294967295 are promoted (numpy.uint64 result)
+    """
     cdef:
-        unsigned int ix
-        unsigned int x, y, z
+        unsigned int [:] x32, y32, z32, out32
+        uint64_t [:] x64, y64, z64, out64
+        Py_ssize_t overflow
+    if not index64_c(x, width):
+        x32, y32, z32 = x, y, z
+        if not (x32.shape[0] == y32.shape[0] == z32.shape[0]):
+            raise ValueError('Arguments x, y, z must have the same length')
+        out32 = numpy.empty(x32.shape[0], dtype=numpy.uint32) if out is None else out
+        if out32.shape[0] != x32.shape[0]:
+            raise ValueError('Argument out must have length %s' % x32.shape[0])
+        with nogil:
+            overflow = to1d_array32_c(x32, y32, z32, out32, width, depth)
+        if overflow == 0:
+            return numpy.asarray(out32)
+        if out is not None:
+            raise OverflowError('Index values exceed 4294967295, argument out must be a numpy.uint64 array')
+    x64, y64, z64 = as_index64(x), as_index64(y), as_index64(z)
+    if not (x64.shape[0] == y64.shape[0] == z64.shape[0]):
+        raise ValueError('Arguments x, y, z must have the same length')
+    out64 = numpy.empty(x64.shape[0], dtype=numpy.uint64) if out is None else out
+    if out64.shape[0] != x64.shape[0]:
+        raise ValueError('Argument out must have length %s' % x64.shape[0])
+    with nogil:
+        to1d_array_c(x64, y64, z64, out64, width, depth)
+    return numpy.asarray(out64)
 
-    ix = index // depth
-    y = <unsigned int>(ix / width)
-    x = ix % width
-    z = index % depth
-    return <unsigned int>(x * height * depth) + (depth * y) + z
 
+# VERTICALLY FLIP AN ARRAY OF BUFFER VALUES
+cpdef np.ndarray vmap_buffer_array(
+        index, unsigned long long width, unsigned long long height, unsigned short int depth, out=None):
+    """
+    Vertically flipped an array of buffer index values.
+    
+    Vectorized version of vmap_buffer. Every index value is re-mapped in a single 
+    call (nogil, prange). The returned array can be used directly to flip a buffer 
+    e.g :
+    index = vmap_buffer_array(numpy.arange(w * h * 3, dtype=numpy.uint32), w, h, 3)
+    flipped = c_buffer[index]
 
-@cython.boundscheck(False)
-@cython.wraparound(False)
-@cython.nonecheck(False)
-@cython.cdivision(True)
-cdef inline unsigned char [:] vfb_rgb_c(unsigned char [:] source, unsigned char [:] target,
-                                   int width, int height)nogil:
+    Buffers larger than 4GB (width * height * depth > 4294967295) or numpy.uint64 index
+    values use the 64-bit kernel and return numpy.uint64 values.
+
+    :param index  : 1d numpy.ndarray (numpy.uint32 or numpy.uint64); index values to convert
+    :param width  : integer; Original image width, must be > 0
+    :param height : integer; Original image height
+    :param depth  : integer; Original image depth=3 for RGB or 4 for RGBA . Must be in range [1, 65535]
+    :param out    : Optional 1d numpy.ndarray (same type as the result) to store the result 
+    (no allocation when provided)
+    :return       : 1d numpy.ndarray of index values pointing to the pixels 
+    in the buffer (traversed vertically). 
+    """
+    if width <= 0:
+        raise ValueError('Argument width cannot be <=0')
+    if depth <= 0:
+        raise ValueError('Argument depth cannot be <=0')
     cdef:
-        int i, j, k, index
-        unsigned char [:] flipped_array = target
+        unsigned int [:] index32, out32
+        uint64_t [:] index64, out64
+    if not index64_c(index, width * height * depth):
+        index32 = index
+        out32 = numpy.empty(index32.shape[0], dtype=numpy.uint32) if out is None else out
+        if out32.shape[0] != index32.shape[0]:
+            raise ValueError('Argument out must have length %s' % index32.shape[0])
+        with nogil:
+            vmap_buffer_array_c(index32, out32, width, height, depth)
+        return numpy.asarray(out32)
+    index64 = as_index64(index)
+    out64 = numpy.empty(index64.shape[0], dtype=numpy.uint64) if out is None else out
+    if out64.shape[0] != index64.shape[0]:
+        raise ValueError('Argument out must have length %s' % index64.shape[0])
+    with nogil:
+        vmap_buffer_array_c(index64, out64, width, height, depth)
+    return numpy.asarray(out64)
 
-    for i in prange(0, height * 3, 3):
-        for j in range(0, width):
-            index = i + (height * 3 * j)
-            for k in range(3):
-                flipped_array[(j * 3) + (i * width) + k] =  <unsigned char>source[index + k]
 
-    return flipped_array
+cdef inline bint index64_c(object index, uint64_t limit):
+    # 64-bit kernels for numpy.uint64 index values or values that do not fit in 32-bit
+    return limit > 0xFFFFFFFF or getattr(index, 'dtype', None) == numpy.uint64
 
 
 @cython.boundscheck(False)
 @cython.wraparound(False)
 @cython.nonecheck(False)
 @cython.cdivision(True)
-cdef inline unsigned char [:] vfb_rgba_c(unsigned char [:] source, unsigned char [:] target,
-                                   int width, int height)nogil:
+cdef inline Py_ssize_t to1d_array32_c(const unsigned int [:] x, const unsigned int [:] y,
+                                      const unsigned int [:] z, unsigned int [:] out,
+                                      uint64_t width, unsigned short int depth)noexcept nogil:
+    # 32-bit kernel of to1d_array (width <= 4294967295), the index values are computed in 64-bit
+    # (y * width + x cannot wrap). Returns the number of values above 4294967295, these
+    # are truncated in out and the caller runs the 64-bit kernel instead
+    cdef:
+        Py_ssize_t i
+        Py_ssize_t count = 0
+        Py_ssize_t n = out.shape[0]
+        uint64_t row, index
+        int threads = parallel_threads_c(NULL, n * 4 * sizeof(unsigned int))
 
+    for i in prange(n, schedule='runtime', num_threads=threads):
+        row = <uint64_t>y[i] * width + x[i]
+        index = row * depth + z[i]
+        out[i] = <unsigned int>index
+        count += (row > UINT32_MAX) | (index > UINT32_MAX)
+    return count
 
-    cdef:
-        int i, j, k, index, v
-        unsigned char [:] flipped_array = target
 
-    for i in prange(0, height * 4, 4):
-        for j in range(0, width):
-            index = i + (height * 4 * j)
-            v = (j * 4) + (i * width)
-            for k in range(4):
-                flipped_array[v + k] =  <unsigned char>source[index + k]
+cdef inline object as_index64(object index):
+    # numpy.uint32 index values are promoted, any other type is left to the memoryview check
+    return index.astype(numpy.uint64) if getattr(index, 'dtype', None) == numpy.uint32 else index
 
-    return flipped_array
 
+# FLIP VERTICALLY A BUFFER INPLACE (TYPE RGB)
+cpdef np.ndarray[np.uint8_t, ndim=1] vfb_rgb_inplace(unsigned char [::1] source, int width, int height):
+    """
+    Vertically flipped buffer containing any format of RGB colors (inplace)
 
-@cython.boundscheck(False)
+    Same as vfb_rgb without the target buffer, the rows and columns of the equivalent
+    3d model are swapped inside the source buffer itself.
+    Square buffers (width == height) are processed with blockwise swaps (OPENMP).
+    Non-square buffers are processed with a cycle-following transpose; the only extra 
+    memory is a bitset of (width * height) bits marking the pixels already moved.
+    Buffer length must be equivalent to width x height x RGB.
+    
+    e.g
+    buffer = [RGB1, RGB2, RGB3, RGB4, RGB5, RGB6, RGB7, RGB8, RGB9]
+    After vfb_rgb_inplace(buffer, 3, 3):
+    buffer = [RGB1, RGB4, RGB7, RGB2, RGB5, RGB8, RGB3, RGB6, RGB9]
+    
+    :param source   : 1d contiguous buffer to flip vertically (unsigned char values).
+     The array length is known with (width * height * depth). The buffer represent 
+     image 's pixels RGB.
+    :param width    : integer; Source array's width (or width of the original image). 
+    :param height   : integer; source array's height (or height of the original image). 
+    :return         : Return the source buffer vertically flipped (swapped rows and columns of the 2d model) 
+    """
+    check_size_c(width, height, 3, source.shape[0], source.shape[0])
+    cdef int status
+    cdef double start = stats_begin_c()
+    with nogil:
+        status = transpose_inplace_c(&source[0], width, height, 3)
+    if status < 0:
+        raise MemoryError('Cannot allocate the bitset for the inplace transpose')
+    stats_end_c(STATS_VFB_RGB_INPLACE, source.shape[0] * 2,
+                team_c(NULL, source.shape[0]) if width == height else 1, start)
+    return numpy.asarray(source)
+
+
+# FLIP VERTICALLY A BUFFER INPLACE (TYPE RGBA)
+cpdef np.ndarray[np.uint8_t, ndim=1] vfb_rgba_inplace(unsigned char [::1] source, int width, int height):
+    """
+    Vertically flipped buffer containing any format of RGBA colors (inplace)
+    
+    Same as vfb_rgba without the target buffer (see vfb_rgb_inplace).
+    Buffer length must be equivalent to width x height x RGBA.
+    
+    :param source   : 1d contiguous buffer to flip vertically (unsigned char values).
+     The array length is known with (width * height * depth). The buffer represent 
+     image 's pixels RGBA.
+    :param width    : integer; Source array's width (or width of the original image). 
+    :param height   : integer; source array's height (or height of the original image). 
+    :return         : Return the source buffer vertically flipped (swapped rows and columns of the 2d model) 
+    """
+    check_size_c(width, height, 4, source.shape[0], source.shape[0])
+    cdef int status
+    cdef double start = stats_begin_c()
+    with nogil:
+        status = transpose_inplace_c(&source[0], width, height, 4)
+    if status < 0:
+        raise MemoryError('Cannot allocate the bitset for the inplace transpose')
+    stats_end_c(STATS_VFB_RGBA_INPLACE, source.shape[0] * 2,
+                team_c(NULL, source.shape[0]) if width == height else 1, start)
+    return numpy.asarray(source)
+
+
+# FLIP VERTICALLY A BUFFER INPLACE (TYPE ALPHA, (WIDTH, HEIGHT))
+cpdef unsigned char [::1] vfb_inplace(unsigned char [::1] source, int width, int height):
+    """
+    Flip vertically the content (e.g alpha values) of an 1d buffer structure (inplace)
+    buffer representing an array type (w, h)
+    
+    Same as vfb without the target buffer (see vfb_rgb_inplace).
+
+    :param source: 1d contiguous buffer created from array type(w, h) 
+    :param width : source width. 
+    :param height: source height. 
+    :return: return the source buffer flipped vertically
+    """
+    check_size_c(width, height, 1, source.shape[0], source.shape[0])
+    cdef int status
+    cdef double start = stats_begin_c()
+    with nogil:
+        status = transpose_inplace_c(&source[0], width, height, 1)
+    if status < 0:
+        raise MemoryError('Cannot allocate the bitset for the inplace transpose')
+    stats_end_c(STATS_VFB_INPLACE, source.shape[0] * 2,
+                team_c(NULL, source.shape[0]) if width == height else 1, start)
+    return source
+
+
+# SPLIT A BUFFER (TYPE RGB) INTO PLANAR CHANNELS
+cpdef tuple split_rgb(unsigned char [:] source, unsigned char [::1] red, unsigned char [::1] green,
+                      unsigned char [::1] blue, int num_threads=0, schedule=None, int chunksize=-1):
+    """
+    Split a buffer of RGB pixels into three planar buffers (R, G, B)
+
+    The channels are written into the caller's buffers, nothing is allocated per call
+    (replace mapcfunctions.rgb_inplace). The source buffer can be strided (e.g buffer[::2]).
+    This method is using Multiprocessing OPENMP if enabled during the compilation
+
+    e.g
+    buffer = [R1, G1, B1, R2, G2, B2, ...]
+    red    = [R1, R2, ...], green = [G1, G2, ...], blue = [B1, B2, ...]
+
+    :param source : 1d buffer of RGB pixels (unsigned char values), length n * 3
+    :param red    : 1d contiguous buffer, length n (number of pixels)
+    :param green  : 1d contiguous buffer, length n
+    :param blue   : 1d contiguous buffer, length n
+    :param num_threads: integer; number of OpenMP threads for this call, 0 = module setting
+    :param schedule   : string; 'static', 'dynamic', 'guided' or None for the module setting
+    :param chunksize  : integer; chunk size for this call, 0 = OpenMP default, -1 = module setting
+    :return       : tuple of numpy.ndarray (red, green, blue)
+    """
+    cdef Py_ssize_t n = red.shape[0]
+    if source.shape[0] != n * 3:
+        raise ValueError('Argument source must have length len(red) * 3')
+    if not (green.shape[0] == n and blue.shape[0] == n):
+        raise ValueError('Arguments red, green and blue must have the same length')
+    cdef parallel_t par
+    parallel_c(&par, num_threads, schedule, chunksize)
+    cdef double start = stats_begin_c()
+    if C_BACKEND is not None and source.strides[0] == 1:
+        C_BACKEND.split_buffer(source, red, green, blue, None, parallel_threads_c(&par, n * 3 * 2))
+    elif n > 0:
+        with nogil:
+            split_channels_c(&source[0], source.strides[0], &red[0], &green[0], &blue[0], NULL, n, &par)
+    stats_end_c(STATS_SPLIT_RGB, n * 3 * 2, team_c(&par, n * 3 * 2), start)
+    return numpy.asarray(red), numpy.asarray(green), numpy.asarray(blue)
+
+
+# SPLIT A BUFFER (TYPE RGBA) INTO PLANAR CHANNELS
+cpdef tuple split_rgba(unsigned char [:] source, unsigned char [::1] red, unsigned char [::1] green,
+                       unsigned char [::1] blue, unsigned char [::1] alpha,
+                       int num_threads=0, schedule=None, int chunksize=-1):
+    """
+    Split a buffer of RGBA pixels into four planar buffers (R, G, B, A)
+
+    Same as split_rgb with the alpha channel (see split_rgb).
+
+    :param source : 1d buffer of RGBA pixels (unsigned char values), length n * 4
+    :param red    : 1d contiguous buffer, length n (number of pixels)
+    :param green  : 1d contiguous buffer, length n
+    :param blue   : 1d contiguous buffer, length n
+    :param alpha  : 1d contiguous buffer, length n
+    :param num_threads: integer; number of OpenMP threads for this call, 0 = module setting
+    :param schedule   : string; 'static', 'dynamic', 'guided' or None for the module setting
+    :param chunksize  : integer; chunk size for this call, 0 = OpenMP default, -1 = module setting
+    :return       : tuple of numpy.ndarray (red, green, blue, alpha)
+    """
+    cdef Py_ssize_t n = red.shape[0]
+    if source.shape[0] != n * 4:
+        raise ValueError('Argument source must have length len(red) * 4')
+    if not (green.shape[0] == n and blue.shape[0] == n and alpha.shape[0] == n):
+        raise ValueError('Arguments red, green, blue and alpha must have the same length')
+    cdef parallel_t par
+    parallel_c(&par, num_threads, schedule, chunksize)
+    cdef double start = stats_begin_c()
+    if C_BACKEND is not None and source.strides[0] == 1:
+        C_BACKEND.split_buffer(source, red, green, blue, alpha, parallel_threads_c(&par, n * 4 * 2))
+    elif n > 0:
+        with nogil:
+            split_channels_c(&source[0], source.strides[0], &red[0], &green[0], &blue[0], &alpha[0], n, &par)
+    stats_end_c(STATS_SPLIT_RGBA, n * 4 * 2, team_c(&par, n * 4 * 2), start)
+    return numpy.asarray(red), numpy.asarray(green), numpy.asarray(blue), numpy.asarray(alpha)
+
+
+# MERGE PLANAR CHANNELS INTO A BUFFER (TYPE RGB)
+cpdef np.ndarray[np.uint8_t, ndim=1] merge_rgb(
+        unsigned char [::1] red, unsigned char [::1] green, unsigned char [::1] blue,
+        unsigned char [:] target, int num_threads=0, schedule=None, int chunksize=-1):
+    """
+    Merge three planar buffers (R, G, B) into a buffer of RGB pixels
+
+    Reverse of split_rgb, the pixels are written into the target buffer (can be strided).
+    This method is using Multiprocessing OPENMP if enabled during the compilation
+
+    :param red    : 1d contiguous buffer, length n (number of pixels)
+    :param green  : 1d contiguous buffer, length n
+    :param blue   : 1d contiguous buffer, length n
+    :param target : 1d buffer of RGB pixels (unsigned char values), length n * 3
+    :param num_threads: integer; number of OpenMP threads for this call, 0 = module setting
+    :param schedule   : string; 'static', 'dynamic', 'guided' or None for the module setting
+    :param chunksize  : integer; chunk size for this call, 0 = OpenMP default, -1 = module setting
+    :return       : numpy.ndarray; the target buffer
+    """
+    cdef Py_ssize_t n = red.shape[0]
+    if target.shape[0] != n * 3:
+        raise ValueError('Argument target must have length len(red) * 3')
+    if not (green.shape[0] == n and blue.shape[0] == n):
+        raise ValueError('Arguments red, green and blue must have the same length')
+    cdef parallel_t par
+    parallel_c(&par, num_threads, schedule, chunksize)
+    cdef double start = stats_begin_c()
+    if n > 0:
+        with nogil:
+            merge_channels_c(&target[0], target.strides[0], &red[0], &green[0], &blue[0], NULL, n, &par)
+    stats_end_c(STATS_MERGE_RGB, n * 3 * 2, team_c(&par, n * 3 * 2), start)
+    return numpy.asarray(target)
+
+
+# MERGE PLANAR CHANNELS INTO A BUFFER (TYPE RGBA)
+cpdef np.ndarray[np.uint8_t, ndim=1] merge_rgba(
+        unsigned char [::1] red, unsigned char [::1] green, unsigned char [::1] blue,
+        unsigned char [::1] alpha, unsigned char [:] target,
+        int num_threads=0, schedule=None, int chunksize=-1):
+    """
+    Merge four planar buffers (R, G, B, A) into a buffer of RGBA pixels
+
+    Reverse of split_rgba (see merge_rgb).
+
+    :param red    : 1d contiguous buffer, length n (number of pixels)
+    :param green  : 1d contiguous buffer, length n
+    :param blue   : 1d contiguous buffer, length n
+    :param alpha  : 1d contiguous buffer, length n
+    :param target : 1d buffer of RGBA pixels (unsigned char values), length n * 4
+    :param num_threads: integer; number of OpenMP threads for this call, 0 = module setting
+    :param schedule   : string; 'static', 'dynamic', 'guided' or None for the module setting
+    :param chunksize  : integer; chunk size for this call, 0 = OpenMP default, -1 = module setting
+    :return       : numpy.ndarray; the target buffer
+    """
+    cdef Py_ssize_t n = red.shape[0]
+    if target.shape[0] != n * 4:
+        raise ValueError('Argument target must have length len(red) * 4')
+    if not (green.shape[0] == n and blue.shape[0] == n and alpha.shape[0] == n):
+        raise ValueError('Arguments red, green, blue and alpha must have the same length')
+    cdef parallel_t par
+    parallel_c(&par, num_threads, schedule, chunksize)
+    cdef double start = stats_begin_c()
+    if n > 0:
+        with nogil:
+            merge_channels_c(&target[0], target.strides[0], &red[0], &green[0], &blue[0], &alpha[0], n, &par)
+    stats_end_c(STATS_MERGE_RGBA, n * 4 * 2, team_c(&par, n * 4 * 2), start)
+    return numpy.asarray(target)
+
+
+# LUMA WEIGHTS (R, G, B) IN FIXED POINT 16.16, EACH SET SUMS TO 65536
+cdef dict LUMA_WEIGHTS = {
+    'average': (21845, 21846, 21845),
+    'bt601'  : (19595, 38470, 7471),
+    'bt709'  : (13933, 46871, 4732)}
+
+
+# FLIP VERTICALLY A BUFFER (TYPE RGB OR RGBA) AND CONVERT IT TO GRAYSCALE
+cpdef np.ndarray[np.uint8_t, ndim=1] vfb_gray(
+        unsigned char [::1] source, unsigned char [::1] target, int width, int height, int depth=3,
+        str weights='average', bint interleaved=False,
+        int num_threads=0, schedule=None, int chunksize=-1, Py_ssize_t src_pitch=0, Py_ssize_t dst_pitch=0):
+    """
+    Vertically flipped buffer converted to 8-bit grayscale (luma) in a single pass
+
+    Same as vfb_rgb / vfb_rgba followed by a grayscale conversion, without the 
+    intermediate buffer (one memory pass instead of two). The luma is computed 
+    with integer fixed-point weights:
+    'average' (R + G + B) / 3
+    'bt601'   0.299 R + 0.587 G + 0.114 B
+    'bt709'   0.2126 R + 0.7152 G + 0.0722 B
+    This method is using Multiprocessing OPENMP if enabled during the compilation
+
+    e.g
+    plane = numpy.empty(w * h, numpy.uint8)
+    vfb_gray(rgb_buffer, plane, w, h, 3, 'bt601')
+    plane.reshape(h, w) is the luma of rgb_buffer.reshape(w, h, 3).transpose(1, 0, 2)
+
+    :param source     : 1d contiguous buffer of RGB or RGBA pixels, length width * height * depth
+    :param target     : 1d contiguous buffer, length width * height (compact plane) or 
+    width * height * depth when interleaved is True
+    :param width      : integer; Source array's width (or width of the original image).
+    :param height     : integer; source array's height (or height of the original image).
+    :param depth      : integer; 3 (RGB) or 4 (RGBA)
+    :param weights    : string; 'average', 'bt601' or 'bt709'
+    :param interleaved: bool; False, one gray value per pixel. True, the gray value is written 
+    in the R, G and B channels and the alpha channel is copied (same layout as the source)
+    :param num_threads: integer; number of OpenMP threads for this call, 0 = module setting
+    :param schedule   : string; 'static', 'dynamic', 'guided' or None for the module setting
+    :param chunksize  : integer; chunk size for this call, 0 = OpenMP default, -1 = module setting
+    :param src_pitch  : integer; bytes between two rows (height pixels) of a padded source, 0 for packed rows
+    :param dst_pitch  : integer; bytes between two rows (width pixels) of a padded target, 0 for packed rows
+    :return           : numpy.ndarray; the target buffer
+    """
+    if width <= 0:
+        raise ValueError('Argument width cannot be <=0')
+    if height <= 0:
+        raise ValueError('Argument height cannot be <=0')
+    if depth != 3 and depth != 4:
+        raise ValueError('Argument depth must be 3 or 4')
+    if weights not in LUMA_WEIGHTS:
+        raise ValueError("Argument weights must be 'average', 'bt601' or 'bt709'")
+    cdef int out_depth = depth if interleaved else 1
+    cdef bint packed = src_pitch == 0 and dst_pitch == 0
+    if not packed:
+        src_pitch = pitch_c(src_pitch, <Py_ssize_t>height * depth, width, source.shape[0], False)
+        dst_pitch = pitch_c(dst_pitch, <Py_ssize_t>width * out_depth, height, target.shape[0], True)
+    else:
+        if source.shape[0] != <Py_ssize_t>width * height * depth:
+            raise ValueError('Argument source must have length width * height * depth')
+        if target.shape[0] != <Py_ssize_t>width * height * out_depth:
+            raise ValueError(
+                'Argument target must have length width * height%s' % (' * depth' if interleaved else ''))
+        src_pitch, dst_pitch = <Py_ssize_t>height * depth, <Py_ssize_t>width * out_depth
+    cdef:
+        parallel_t par
+        int wr, wg, wb
+    wr, wg, wb = LUMA_WEIGHTS[weights]
+    parallel_c(&par, num_threads, schedule, chunksize)
+    cdef:
+        Py_ssize_t nbytes = <Py_ssize_t>width * height * (depth + out_depth)
+        double start = stats_begin_c()
+    if C_BACKEND is not None and packed:
+        C_BACKEND.gray_buffer(source, target, width, height, depth, out_depth, wr, wg, wb,
+                              tile_size_c(depth), parallel_threads_c(&par, nbytes))
+    else:
+        with nogil:
+            transpose_gray_c(&source[0], &target[0], width, height, depth, out_depth,
+                             wr, wg, wb, tile_size_c(depth), src_pitch, dst_pitch, &par)
+    stats_end_c(STATS_VFB_GRAY, nbytes, team_c(&par, nbytes), start)
+    return numpy.asarray(target)
+
+
+# REMAP PLANS (PRECOMPUTED SOURCE PIXEL OF EVERY TARGET PIXEL), LRU CACHE
+# Plans are dropped (least recently used first) when the tables exceed PLAN_CACHE_BUDGET bytes
+cdef Py_ssize_t PLAN_CACHE_BUDGET = 64 * 1024 * 1024
+cdef Py_ssize_t PLAN_CACHE_BYTES = 0
+cdef Py_ssize_t PLAN_CACHE_HITS = 0
+cdef Py_ssize_t PLAN_CACHE_MISSES = 0
+PLAN_CACHE = OrderedDict()
+
+
+def _plan_transform(str operation, int width, int height):
+    # Source pixel index of every target pixel for a geometric transform (see transform)
+    cdef:
+        affine_t t
+        int tw, th
+    affine_c(&t, operation, width, height, None, &tw, &th)
+    u = numpy.arange(tw, dtype=numpy.int64)[:, None]
+    v = numpy.arange(th, dtype=numpy.int64)[None, :]
+    return ((t.x0 + t.xu * u + t.xv * v) * height + (t.y0 + t.yu * u + t.yv * v)).astype(numpy.uint32)
+
+
+# Index table builders, operation name --> function (width, height) returning the source
+# pixel index of every target pixel, 2d array shape (target width, target height)
+PLAN_OPERATIONS = {}
+
+
+cdef class RemapPlan:
+    """
+    Precomputed remapping of a buffer geometry (width, height, depth) for an operation
+
+    The plan holds the source pixel index of every target pixel (lookup table, uint32),
+    apply() copies the pixels with a parallel gather, without any index arithmetic.
+    Use get_plan to share the plans of the frame sizes used repeatedly (LRU cache).
+
+    e.g
+    plan = get_plan(w, h, 3)
+    for frame in frames:
+        plan.apply(frame, target)
+
+    Buffers of other data types can be remapped with their numpy.uint8 view and
+    depth = values per pixel * itemsize, e.g float32 RGB --> depth 12
+
+    :param width    : integer; source width
+    :param height   : integer; source height
+    :param depth    : integer; bytes per pixel (3 RGB, 4 RGBA, 1 alpha)
+    :param operation: string; 'transpose' (same as vfb_rgb / vfb_rgba / vfb) or any
+    geometric transform of the function transform (e.g 'rot90', 'hmirror')
+    :param index    : optional 2d array (target width, target height) of source pixel
+    indices in [0, width * height), used instead of the operation
+    """
+    cdef readonly int width, height, depth
+    cdef readonly int target_width, target_height
+    cdef readonly str operation
+    cdef readonly object index
+    cdef unsigned int [::1] lut
+
+    def __init__(self, int width, int height, int depth, str operation='transpose', index=None):
+        if width <= 0:
+            raise ValueError('Argument width cannot be <=0')
+        if height <= 0:
+            raise ValueError('Argument height cannot be <=0')
+        if depth <= 0:
+            raise ValueError('Argument depth cannot be <=0')
+        if index is None:
+            if operation not in PLAN_OPERATIONS:
+                raise ValueError('Argument operation must be one of %s' % ', '.join(sorted(PLAN_OPERATIONS)))
+            index = PLAN_OPERATIONS[operation](width, height)
+        else:
+            # A user lookup table is checked before the uint32 cast, apply() trusts it
+            index = numpy.asarray(index)
+            if index.size:
+                if int(index.min()) < 0:
+                    raise ValueError('Argument index cannot contain negative values')
+                if int(index.max()) >= min(<unsigned long long>width * height, 2 ** 32):
+                    raise ValueError('Argument index values must be < width * height')
+        index = numpy.ascontiguousarray(index, dtype=numpy.uint32)
+        if index.ndim != 2:
+            raise ValueError('Argument index must be a 2d array (target width, target height)')
+        self.width, self.height, self.depth, self.operation = width, height, depth, operation
+        self.target_width, self.target_height = index.shape[0], index.shape[1]
+        self.index = index
+        self.lut = index.reshape(-1)
+
+    @property
+    def nbytes(self):
+        """ Size of the lookup table in bytes """
+        return self.lut.shape[0] * 4
+
+    def __repr__(self):
+        return 'RemapPlan(%s, %s, %s, %r)' % (self.width, self.height, self.depth, self.operation)
+
+    cpdef np.ndarray[np.uint8_t, ndim=1] apply(self, unsigned char [::1] source, unsigned char [::1] target,
+                                               int num_threads=0, schedule=None, int chunksize=-1,
+                                               Py_ssize_t src_pitch=0, Py_ssize_t dst_pitch=0):
+        """
+        Remap the source buffer into the target buffer (parallel gather)
+
+        :param source     : 1d contiguous buffer, length width * height * depth
+        :param target     : 1d contiguous buffer, length target_width * target_height * depth
+        :param num_threads: integer; number of OpenMP threads for this call, 0 = module setting
+        :param schedule   : string; 'static', 'dynamic', 'guided' or None for the module setting
+        :param chunksize  : integer; chunk size for this call, 0 = OpenMP default, -1 = module setting
+        :param src_pitch  : integer; bytes between two rows (height pixels) of a padded source, 
+        0 for packed rows
+        :param dst_pitch  : integer; bytes between two rows (target_height pixels) of a padded 
+        target, 0 for packed rows
+        :return           : numpy.ndarray; the target buffer
+        """
+        if src_pitch or dst_pitch:
+            src_pitch = pitch_c(src_pitch, <Py_ssize_t>self.height * self.depth, self.width,
+                                source.shape[0], False)
+            dst_pitch = pitch_c(dst_pitch, <Py_ssize_t>self.target_height * self.depth, self.target_width,
+                                target.shape[0], True)
+        else:
+            if source.shape[0] != <Py_ssize_t>self.width * self.height * self.depth:
+                raise ValueError('Argument source must have length width * height * depth')
+            if target.shape[0] != self.lut.shape[0] * self.depth:
+                raise ValueError('Argument target must have length target_width * target_height * depth')
+        cdef parallel_t par
+        parallel_c(&par, num_threads, schedule, chunksize)
+        cdef:
+            Py_ssize_t nbytes = (<Py_ssize_t>self.width * self.height + self.lut.shape[0]) * self.depth
+            double start = stats_begin_c()
+        with nogil:
+            gather_pixels_c(&source[0], &target[0], &self.lut[0], self.target_width, self.target_height,
+                            self.depth, tile_size_c(self.depth), &par, self.height, src_pitch, dst_pitch)
+        stats_end_c(STATS_REMAP, nbytes, team_c(&par, nbytes), start)
+        return numpy.asarray(target)
+
+
+cpdef RemapPlan get_plan(int width, int height, int depth, str operation='transpose'):
+    """
+    Return the remap plan of a geometry, from the LRU cache when available
+
+    :param width    : integer; source width
+    :param height   : integer; source height
+    :param depth    : integer; bytes per pixel
+    :param operation: string; operation name (see RemapPlan)
+    :return         : RemapPlan
+    """
+    global PLAN_CACHE_BYTES, PLAN_CACHE_HITS, PLAN_CACHE_MISSES
+    key = (width, height, depth, operation)
+    plan = PLAN_CACHE.get(key)
+    if plan is not None:
+        PLAN_CACHE_HITS += 1
+        PLAN_CACHE.move_to_end(key)
+        return plan
+    PLAN_CACHE_MISSES += 1
+    plan = RemapPlan(width, height, depth, operation)
+    if plan.nbytes <= PLAN_CACHE_BUDGET:
+        PLAN_CACHE[key] = plan
+        PLAN_CACHE_BYTES += plan.nbytes
+        while PLAN_CACHE_BYTES > PLAN_CACHE_BUDGET:
+            PLAN_CACHE_BYTES -= PLAN_CACHE.popitem(last=False)[1].nbytes
+    return plan
+
+
+cpdef void set_plan_cache_size(Py_ssize_t nbytes=64 * 1024 * 1024):
+    """
+    Set the memory budget (in bytes) of the remap plans cache
+
+    The least recently used plans are dropped until the cache fits in the budget.
+    A plan larger than the budget is built for each call and never cached.
+
+    :param nbytes: integer; budget in bytes, 0 disables the cache (default 64MB)
+    :return      : void
+    """
+    global PLAN_CACHE_BUDGET, PLAN_CACHE_BYTES
+    assert nbytes >= 0, 'Argument nbytes cannot be < 0'
+    PLAN_CACHE_BUDGET = nbytes
+    while PLAN_CACHE_BYTES > PLAN_CACHE_BUDGET:
+        PLAN_CACHE_BYTES -= PLAN_CACHE.popitem(last=False)[1].nbytes
+
+
+cpdef void clear_plan_cache():
+    """
+    Drop all the remap plans of the cache and reset its counters
+
+    :return: void
+    """
+    global PLAN_CACHE_BYTES, PLAN_CACHE_HITS, PLAN_CACHE_MISSES
+    PLAN_CACHE.clear()
+    PLAN_CACHE_BYTES = PLAN_CACHE_HITS = PLAN_CACHE_MISSES = 0
+
+
+cpdef dict plan_cache_info():
+    """
+    Return the state of the remap plans cache
+
+    :return: dictionary; plans (number of plans), nbytes (size of the tables), 
+    budget (bytes), hits and misses (get_plan calls)
+    """
+    return {'plans': len(PLAN_CACHE), 'nbytes': PLAN_CACHE_BYTES, 'budget': PLAN_CACHE_BUDGET,
+            'hits': PLAN_CACHE_HITS, 'misses': PLAN_CACHE_MISSES}
+
+
+# REMAP A BUFFER WITH A CACHED PLAN
+cpdef np.ndarray[np.uint8_t, ndim=1] remap(
+        unsigned char [::1] source, unsigned char [::1] target, int width, int height, int depth,
+        str operation='transpose', int num_threads=0, schedule=None, int chunksize=-1,
+        Py_ssize_t src_pitch=0, Py_ssize_t dst_pitch=0):
+    """
+    Remap a buffer with the cached plan of its geometry (see get_plan and RemapPlan)
+
+    e.g
+    remap(source, target, w, h, 4) gives the same result as vfb_rgba(source, target, w, h)
+
+    :param source     : 1d contiguous buffer, length width * height * depth
+    :param target     : 1d contiguous buffer, same length as the source
+    :param width      : integer; source width
+    :param height     : integer; source height
+    :param depth      : integer; bytes per pixel
+    :param operation  : string; operation name (see RemapPlan)
+    :param num_threads: integer; number of OpenMP threads for this call, 0 = module setting
+    :param schedule   : string; 'static', 'dynamic', 'guided' or None for the module setting
+    :param chunksize  : integer; chunk size for this call, 0 = OpenMP default, -1 = module setting
+    :param src_pitch  : integer; bytes between two rows of a padded source, 0 for packed rows
+    :param dst_pitch  : integer; bytes between two rows of a padded target, 0 for packed rows
+    :return           : numpy.ndarray; the target buffer
+    """
+    return get_plan(width, height, depth, operation).apply(
+        source, target, num_threads, schedule, chunksize, src_pitch, dst_pitch)
+
+
+# GEOMETRIC TRANSFORMS OF THE MODEL (WIDTH, HEIGHT), TARGET PIXEL (u, v) <-- SOURCE PIXEL (x, y)
+# x = x0 + xu * u + xv * v, y = y0 + yu * u + yv * v, coefficients (xu, xv, yu, yv)
+cdef dict TRANSFORMS = {
+    'identity'     : (1, 0, 0, 1),
+    'transpose'    : (0, 1, 1, 0),
+    'antitranspose': (0, -1, -1, 0),
+    'rot90'        : (0, 1, -1, 0),
+    'rot180'       : (-1, 0, 0, -1),
+    'rot270'       : (0, -1, 1, 0),
+    'hmirror'      : (-1, 0, 0, 1),
+    'vmirror'      : (1, 0, 0, -1)}
+
+PLAN_OPERATIONS.update({name: partial(_plan_transform, name) for name in TRANSFORMS})
+
+
+cdef int affine_c(affine_t * t, str operation, int width, int height, tuple rect,
+                  int * target_width, int * target_height) except -1:
+    # Fill t with the index transform of an operation applied to the rectangle
+    # rect = (x, y, w, h) of the source model (width, height), None for the whole model.
+    # target_width and target_height receive the size of the target model.
+    cdef int rx = 0, ry = 0, rw = width, rh = height
+    if operation not in TRANSFORMS:
+        raise ValueError('Argument operation must be one of %s' % ', '.join(sorted(TRANSFORMS)))
+    if rect is not None:
+        if len(rect) != 4:
+            raise ValueError('Argument rect must be a tuple (x, y, w, h)')
+        rx, ry, rw, rh = rect
+        if rw <= 0 or rh <= 0:
+            raise ValueError('Argument rect cannot be empty')
+        if not (0 <= rx and rx + rw <= width and 0 <= ry and ry + rh <= height):
+            raise ValueError('Argument rect must be inside the source model (%s, %s)' % (width, height))
+    t.xu, t.xv, t.yu, t.yv = TRANSFORMS[operation]
+    # A negative coefficient walks the source axis backward, from its last pixel
+    t.x0 = rx + (rw - 1 if t.xu + t.xv < 0 else 0)
+    t.y0 = ry + (rh - 1 if t.yu + t.yv < 0 else 0)
+    if t.xu != 0:
+        target_width[0], target_height[0] = rw, rh
+    else:
+        target_width[0], target_height[0] = rh, rw
+    return 0
+
+
+# ROTATE / MIRROR / TRANSPOSE (AND CROP) A BUFFER
+cpdef np.ndarray[np.uint8_t, ndim=1] transform(
+        unsigned char [::1] source, unsigned char [::1] target, int width, int height, int depth,
+        str operation='transpose', tuple rect=None, int num_threads=0, schedule=None, int chunksize=-1,
+        Py_ssize_t src_pitch=0, Py_ssize_t dst_pitch=0):
+    """
+    Rotate, mirror or transpose a buffer of any depth, optionally a sub-rectangle only
+
+    The source buffer is the model (width, height, depth) used by vfb_rgb / vfb_rgba / vfb,
+    the operations are equivalent to the numpy expressions of the array (width, height, depth)
+    'identity'      array (crop only)
+    'transpose'     array.transpose(1, 0, 2) (same as vfb_rgb, vfb_rgba and vfb)
+    'antitranspose' array[::-1, ::-1].transpose(1, 0, 2)
+    'rot90'         numpy.rot90(array, 1)
+    'rot180'        numpy.rot90(array, 2)
+    'rot270'        numpy.rot90(array, 3)
+    'hmirror'       array[::-1]
+    'vmirror'       array[:, ::-1]
+
+    With rect = (x, y, w, h) the operation is applied to array[x:x + w, y:y + h] in the same 
+    pass (fused crop), the target buffer holds w * h pixels.
+    The target is walked tile by tile, each pixel is read and written once (nogil).
+    This method is using Multiprocessing OPENMP if enabled during the compilation
+
+    e.g
+    target = numpy.empty(w * h * 4, numpy.uint8)
+    transform(rgba_buffer, target, w, h, 4, 'rot90')
+    target.reshape(h, w, 4) is numpy.rot90(rgba_buffer.reshape(w, h, 4))
+
+    :param source     : 1d contiguous buffer, length width * height * depth
+    :param target     : 1d contiguous buffer, length width * height * depth (w * h * depth with rect)
+    :param width      : integer; source width
+    :param height     : integer; source height
+    :param depth      : integer; bytes per pixel (any value, e.g 1, 3, 4, 12 for float32 RGB)
+    :param operation  : string; operation name (see above)
+    :param rect       : tuple (x, y, w, h); source rectangle or None for the whole buffer
+    :param num_threads: integer; number of OpenMP threads for this call, 0 = module setting
+    :param schedule   : string; 'static', 'dynamic', 'guided' or None for the module setting
+    :param chunksize  : integer; chunk size for this call, 0 = OpenMP default, -1 = module setting
+    :param src_pitch  : integer; bytes between two rows (height pixels) of a padded source, 0 for packed rows
+    :param dst_pitch  : integer; bytes between two rows of a padded target, 0 for packed rows
+    :return           : numpy.ndarray; the target buffer
+    """
+    if width <= 0:
+        raise ValueError('Argument width cannot be <=0')
+    if height <= 0:
+        raise ValueError('Argument height cannot be <=0')
+    if depth <= 0:
+        raise ValueError('Argument depth cannot be <=0')
+    cdef:
+        affine_t t
+        int tw, th
+        parallel_t par
+    affine_c(&t, operation, width, height, rect, &tw, &th)
+    if src_pitch or dst_pitch:
+        src_pitch = pitch_c(src_pitch, <Py_ssize_t>height * depth, width, source.shape[0], False)
+        dst_pitch = pitch_c(dst_pitch, <Py_ssize_t>th * depth, tw, target.shape[0], True)
+    else:
+        if source.shape[0] != <Py_ssize_t>width * height * depth:
+            raise ValueError('Argument source must have length width * height * depth')
+        if target.shape[0] != <Py_ssize_t>tw * th * depth:
+            raise ValueError('Argument target must have length %s' % (<Py_ssize_t>tw * th * depth))
+        src_pitch, dst_pitch = <Py_ssize_t>height * depth, <Py_ssize_t>th * depth
+    parallel_c(&par, num_threads, schedule, chunksize)
+    cdef:
+        Py_ssize_t nbytes = (<Py_ssize_t>width * height + <Py_ssize_t>tw * th) * depth
+        double start = stats_begin_c()
+    with nogil:
+        affine_remap_c(&source[0], &target[0], src_pitch, dst_pitch, depth, tw, th, &t,
+                       tile_size_c(depth), &par)
+    stats_end_c(STATS_TRANSFORM, nbytes, team_c(&par, nbytes), start)
+    return numpy.asarray(target)
+
+
+cpdef pixels_view(obj):
+    """
+    Return a writable uint8 view (width, height, pixel bytes) of a pixel container, no copy
+
+    obj can be a pygame.Surface (its pixel buffer, pitch included), a BufferProxy
+    (Surface.get_view('2') or get_view('3')), a numpy array or any buffer-protocol object
+    with 2 or 3 dimensions (width, height[, depth]) and any strides. The pixels of a 2d
+    object are its items (e.g uint32 for 32-bit surfaces, 3 bytes for 24-bit surfaces).
+    A Surface stays locked while the view is alive.
+
+    :param obj: pygame.Surface, BufferProxy or buffer-protocol object
+    :return   : numpy.ndarray; uint8 view of shape (width, height, bytes per pixel)
+    """
+    if hasattr(obj, 'get_view') and hasattr(obj, 'get_bytesize'):
+        # pygame.Surface, pygame stays an optional dependency (no import)
+        obj = obj.get_view('2')
+    cdef object array = numpy.asarray(obj)
+    if array.ndim not in (2, 3):
+        raise ValueError('Argument obj must have 2 or 3 dimensions (width, height[, depth])')
+    if array.ndim == 2:
+        array = array[..., None]
+    if array.dtype != numpy.uint8:
+        # Items of several bytes become bytes, the last axis must be contiguous
+        array = array.view(numpy.uint8)
+    return array
+
+
+# ROTATE / MIRROR / TRANSPOSE (AND CROP) A SURFACE OR A STRIDED BUFFER
+cpdef transform_view(source, target, str operation='transpose', tuple rect=None,
+                     int num_threads=0, schedule=None, int chunksize=-1):
+    """
+    transform() for pygame surfaces and strided buffers, no intermediate copy
+
+    source and target are pygame.Surface, BufferProxy (Surface.get_view), numpy arrays
+    or buffer-protocol objects (see pixels_view), the pixels are read and written in place
+    through the strides of the objects (surface pitch, padding, negative strides, slices).
+    The operations and rect are those of transform(), applied to the model
+    (width, height, depth) of the source view.
+
+    e.g
+    src = pygame.image.load('image.png').convert()          # w x h
+    dst = pygame.Surface(src.get_size()[::-1]).convert()      # h x w
+    transform_view(src, dst)                                 # no flatten / make_surface
+    transform_view(src, dst, 'rot90')
+
+    :param source     : pygame.Surface, BufferProxy or buffer (width, height[, depth])
+    :param target     : same type, size of the result (w, h swapped by transpose / rot90 / rot270)
+    :param operation  : string; see transform()
+    :param rect       : tuple (x, y, w, h); source rectangle or None for the whole source
+    :param num_threads: integer; number of OpenMP threads for this call, 0 = module setting
+    :param schedule   : string; 'static', 'dynamic', 'guided' or None for the module setting
+    :param chunksize  : integer; chunk size for this call, 0 = OpenMP default, -1 = module setting
+    :return           : target
+    """
+    cdef:
+        const unsigned char [:, :, :] src = pixels_view(source)
+        unsigned char [:, :, :] dst = pixels_view(target)
+        affine_t t
+        int tw, th
+        parallel_t par
+    if src.shape[0] == 0 or src.shape[1] == 0:
+        raise ValueError('Argument source cannot be empty')
+    if src.shape[2] != dst.shape[2]:
+        raise ValueError(
+            'Arguments source and target must have the same pixel size (%s, %s bytes)' % (src.shape[2], dst.shape[2]))
+    affine_c(&t, operation, src.shape[0], src.shape[1], rect, &tw, &th)
+    if not (dst.shape[0] == tw and dst.shape[1] == th):
+        raise ValueError('Argument target must have size (%s, %s)' % (tw, th))
+    parallel_c(&par, num_threads, schedule, chunksize)
+    cdef:
+        Py_ssize_t nbytes = (src.shape[0] * src.shape[1] + <Py_ssize_t>tw * th) * src.shape[2]
+        double start = stats_begin_c()
+    with nogil:
+        affine_remap_strided_c(&src[0, 0, 0], &dst[0, 0, 0], src.strides, dst.strides,
+                               src.shape[2], tw, th, &t, tile_size_c(src.shape[2]), &par)
+    stats_end_c(STATS_TRANSFORM_VIEW, nbytes, team_c(&par, nbytes), start)
+    return target
+
+
+cdef class Pipeline:
+    """
+    Chain of geometric transforms collapsed into a single pass
+
+    Every step (crop, transpose, rotation, mirror) is an index transform, the steps are
+    composed symbolically when the pipeline is built and apply() reads and writes each
+    pixel once, whatever the number of steps. A pipeline is immutable, each method
+    returns a new pipeline (a common prefix can be shared).
+
+    e.g
+    pipe = Pipeline(w, h, 4).transpose().crop(10, 10, 64, 64).hmirror()
+    target = numpy.empty(pipe.target_width * pipe.target_height * 4, numpy.uint8)
+    pipe.apply(rgba_buffer, target)
+
+    transpose() is the vmap_buffer / vfb_rgba step, so to3d --> vmap_buffer --> to1d
+    chains are written Pipeline(w, h, depth).transpose().
+
+    :param width : integer; source width
+    :param height: integer; source height
+    :param depth : integer; bytes per pixel
+    """
+    cdef affine_t t
+    cdef readonly int width, height, depth
+    cdef readonly int target_width, target_height
+    cdef readonly tuple steps
+
+    def __init__(self, int width, int height, int depth):
+        if width <= 0:
+            raise ValueError('Argument width cannot be <=0')
+        if height <= 0:
+            raise ValueError('Argument height cannot be <=0')
+        if depth <= 0:
+            raise ValueError('Argument depth cannot be <=0')
+        self.width, self.height, self.depth = width, height, depth
+        self.target_width, self.target_height = width, height
+        self.steps = ()
+        self.t.x0, self.t.xu, self.t.xv, self.t.y0, self.t.yu, self.t.yv = 0, 1, 0, 0, 0, 1
+
+    def __repr__(self):
+        return 'Pipeline(%s, %s, %s)%s' % (self.width, self.height, self.depth, ''.join(
+            '.then(%r%s)' % (name, '' if rect is None else ', %r' % (rect,)) for name, rect in self.steps))
+
+    cpdef Pipeline then(self, str operation, tuple rect=None):
+        """
+        Return a new pipeline with one more step
+
+        :param operation: string; operation name of the function transform (e.g 'rot90')
+        :param rect     : tuple (x, y, w, h); rectangle of the current target model the
+        operation is applied to, None for the whole model
+        :return         : Pipeline
+        """
+        cdef:
+            affine_t o
+            int tw, th
+            Pipeline p = Pipeline.__new__(Pipeline)
+        affine_c(&o, operation, self.target_width, self.target_height, rect, &tw, &th)
+        p.width, p.height, p.depth = self.width, self.height, self.depth
+        p.target_width, p.target_height = tw, th
+        p.steps = self.steps + ((operation, rect),)
+        p.t = self.t
+        compose_affine_c(&p.t, &o)
+        return p
+
+    def crop(self, int x, int y, int w, int h):
+        """ Keep the rectangle (x, y, w, h) of the current target model """
+        return self.then('identity', (x, y, w, h))
+
+    def transpose(self):
+        """ Swap rows and columns (vfb_rgb, vfb_rgba, vfb) """
+        return self.then('transpose')
+
+    def antitranspose(self):
+        """ Transpose along the anti-diagonal """
+        return self.then('antitranspose')
+
+    def rotate(self, int k=1):
+        """ Rotate by k * 90 degrees (numpy.rot90(array, k)) """
+        k = k & 3   # k modulo 4, negative values included (cdivision)
+        return self if k == 0 else self.then(('rot90', 'rot180', 'rot270')[k - 1])
+
+    def hmirror(self):
+        """ Reverse the first axis (array[::-1]) """
+        return self.then('hmirror')
+
+    def vmirror(self):
+        """ Reverse the second axis (array[:, ::-1]) """
+        return self.then('vmirror')
+
+    def plan(self):
+        """
+        Return the RemapPlan (lookup table) of the pipeline
+
+        :return: RemapPlan
+        """
+        u = numpy.arange(self.target_width, dtype=numpy.int64)[:, None]
+        v = numpy.arange(self.target_height, dtype=numpy.int64)[None, :]
+        index = (self.t.x0 + self.t.xu * u + self.t.xv * v) * self.height + \
+                (self.t.y0 + self.t.yu * u + self.t.yv * v)
+        return RemapPlan(self.width, self.height, self.depth, repr(self), index)
+
+    cpdef np.ndarray[np.uint8_t, ndim=1] apply(self, unsigned char [::1] source, unsigned char [::1] target,
+                                               int num_threads=0, schedule=None, int chunksize=-1,
+                                               Py_ssize_t src_pitch=0, Py_ssize_t dst_pitch=0):
+        """
+        Run the pipeline, single pass from the source buffer to the target buffer
+
+        :param source     : 1d contiguous buffer, length width * height * depth
+        :param target     : 1d contiguous buffer, length target_width * target_height * depth
+        :param num_threads: integer; number of OpenMP threads for this call, 0 = module setting
+        :param schedule   : string; 'static', 'dynamic', 'guided' or None for the module setting
+        :param chunksize  : integer; chunk size for this call, 0 = OpenMP default, -1 = module setting
+        :param src_pitch  : integer; bytes between two rows (height pixels) of a padded source, 
+        0 for packed rows
+        :param dst_pitch  : integer; bytes between two rows (target_height pixels) of a padded 
+        target, 0 for packed rows
+        :return           : numpy.ndarray; the target buffer
+        """
+        if src_pitch or dst_pitch:
+            src_pitch = pitch_c(src_pitch, <Py_ssize_t>self.height * self.depth, self.width,
+                                source.shape[0], False)
+            dst_pitch = pitch_c(dst_pitch, <Py_ssize_t>self.target_height * self.depth, self.target_width,
+                                target.shape[0], True)
+        else:
+            if source.shape[0] != <Py_ssize_t>self.width * self.height * self.depth:
+                raise ValueError('Argument source must have length width * height * depth')
+            if target.shape[0] != <Py_ssize_t>self.target_width * self.target_height * self.depth:
+                raise ValueError('Argument target must have length target_width * target_height * depth')
+            src_pitch = <Py_ssize_t>self.height * self.depth
+            dst_pitch = <Py_ssize_t>self.target_height * self.depth
+        cdef parallel_t par
+        parallel_c(&par, num_threads, schedule, chunksize)
+        cdef:
+            Py_ssize_t nbytes = (<Py_ssize_t>self.width * self.height +
+                                 <Py_ssize_t>self.target_width * self.target_height) * self.depth
+            double start = stats_begin_c()
+        with nogil:
+            affine_remap_c(&source[0], &target[0], src_pitch, dst_pitch, self.depth, self.target_width,
+                           self.target_height, &self.t, tile_size_c(self.depth), &par)
+        stats_end_c(STATS_PIPELINE, nbytes, team_c(&par, nbytes), start)
+        return numpy.asarray(target)
+
+
+# FLIP VERTICALLY A FILE BACKED BUFFER (NUMPY.MEMMAP) BY BANDS
+cpdef Py_ssize_t vfb_stream(source, target, int width, int height, int depth,
+                            Py_ssize_t budget=64 * 1024 * 1024, int start=0, callback=None,
+                            int num_threads=0, schedule=None, int chunksize=-1,
+                            Py_ssize_t src_pitch=0, Py_ssize_t dst_pitch=0):
+    """
+    Vertically flipped buffer for buffers larger than the memory (e.g numpy.memmap)
+
+    Same result as vfb_rgb / vfb_rgba / vfb / vfb_generic, the transpose is processed 
+    by bands of rows of the target model (height, width), each band using at most 
+    budget bytes of memory:
+    1) the band is read from the source, one contiguous chunk per source row, 
+       in increasing file offsets
+    2) the band is transposed (cache blocked, OPENMP) into the target rows, a 
+       contiguous region of the target file
+    The target is flushed after every band (numpy.memmap), a band reported done by 
+    the callback is on disk. The GIL is released while a band is processed.
+
+    Re-read cost: every band reads width slices of rows * depth values spread over the
+    whole source. A file backed source is paged in by pages (4KB) and readahead, when a
+    slice is smaller than a page the next bands fetch the same pages again and the source
+    is read about 4096 / (rows * bytes per pixel) times. A budget of at least
+    width * 4096 bytes (slices of a page or more) reads the source once.
+
+    Long runs can be interrupted and resumed, the function returns the first target 
+    row not processed (height when the transpose is complete):
+    row = vfb_stream(source, target, w, h, 4, callback=lambda done, total: not stop_requested)
+    vfb_stream(source, target, w, h, 4, start=row)
+
+    e.g
+    source = numpy.memmap('map.raw', dtype=numpy.uint8, mode='r', shape=(w * h * 4,))
+    target = numpy.memmap('map_t.raw', dtype=numpy.uint8, mode='w+', shape=(w * h * 4,))
+    vfb_stream(source, target, w, h, 4, budget=256 * 1024 * 1024)
+
+    :param source     : 1d contiguous buffer (numpy.memmap, numpy.ndarray, any buffer of any
+    data type), length width * height * depth values
+    :param target     : 1d contiguous writable buffer, same length and data type as the source
+    :param width      : integer; source width
+    :param height     : integer; source height
+    :param depth      : integer; values per pixel (e.g 1, 3, 4)
+    :param budget     : integer; memory used for a band in bytes (a band holds at least one row)
+    :param start      : integer; first target row to process (resume), 0 for the whole buffer
+    :param callback   : callable(rows_done, height) called after every band, returning False
+    stops the transpose (any other value continues). None for no callback
+    :param num_threads: integer; number of OpenMP threads for this call, 0 = module setting
+    :param schedule   : string; 'static', 'dynamic', 'guided' or None for the module setting
+    :param chunksize  : integer; chunk size for this call, 0 = OpenMP default, -1 = module setting
+    :param src_pitch  : integer; bytes between two rows (height pixels) of a padded source, 0 for packed rows
+    :param dst_pitch  : integer; bytes between two rows (width pixels) of a padded target, 0 for packed rows
+    :return           : integer; first target row not processed, height when complete
+    """
+    if width <= 0:
+        raise ValueError('Argument width cannot be <=0')
+    if height <= 0:
+        raise ValueError('Argument height cannot be <=0')
+    if depth <= 0:
+        raise ValueError('Argument depth cannot be <=0')
+    if budget <= 0:
+        raise ValueError('Argument budget cannot be <=0')
+    if not (0 <= start <= height):
+        raise ValueError('Argument start must be in range [0, height]')
+
+    src_array = numpy.asarray(source)
+    dst_array = numpy.asarray(target)
+    if src_array.dtype != dst_array.dtype:
+        raise ValueError('Arguments source and target must have the same data type')
+    cdef int pixel_size = depth * src_array.itemsize
+    if src_pitch or dst_pitch:
+        src_pitch = pitch_c(src_pitch, <Py_ssize_t>height * pixel_size, width, src_array.nbytes, False)
+        dst_pitch = pitch_c(dst_pitch, <Py_ssize_t>width * pixel_size, height, dst_array.nbytes, True)
+    else:
+        if not (src_array.size == dst_array.size == <Py_ssize_t>width * height * depth):
+            raise ValueError('Arguments source and target must have length width * height * depth')
+        src_pitch, dst_pitch = <Py_ssize_t>height * pixel_size, <Py_ssize_t>width * pixel_size
+
+    cdef:
+        const unsigned char [::1] src = src_array.reshape(-1).view(numpy.uint8)
+        unsigned char [::1] dst = dst_array.reshape(-1).view(numpy.uint8)
+        Py_ssize_t row_bytes = <Py_ssize_t>width * pixel_size
+        int band = <int>min(max(budget // row_bytes, 1), height)
+        unsigned char [::1] buffer = numpy.empty(<Py_ssize_t>band * row_bytes, numpy.uint8)
+        int y0 = start, rows, x
+        parallel_t par
+
+    parallel_c(&par, num_threads, schedule, chunksize)
+    flush = getattr(target, 'flush', None)
+    cdef double t0 = stats_begin_c()
+
+    while y0 < height:
+        rows = band if y0 + band < height else height - y0
+        with nogil:
+            # Source rows x, pixels [y0, y0 + rows) --> band model (width, rows), sequential reads
+            for x in range(width):
+                memcpy(&buffer[<Py_ssize_t>x * rows * pixel_size],
+                       &src[x * src_pitch + <Py_ssize_t>y0 * pixel_size],
+                       <Py_ssize_t>rows * pixel_size)
+            # Band model (width, rows) --> target rows [y0, y0 + rows)
+            transpose_tiled_c(&buffer[0], &dst[y0 * dst_pitch], width, rows,
+                              pixel_size, tile_size_c(pixel_size), &par, 0, dst_pitch)
+        y0 = y0 + rows
+        if flush is not None:
+            flush()
+        if callback is not None and callback(y0, height) is False:
+            break
+    stats_end_c(STATS_VFB_STREAM, <Py_ssize_t>(y0 - start) * row_bytes * 2,
+                team_c(&par, <Py_ssize_t>band * row_bytes), t0)
+    return y0
+
+
+# FLIP VERTICALLY A STACK OF FRAMES
+cpdef vfb_batch(frames, out=None, int width=0, int height=0, int depth=0,
+                int num_threads=0, schedule=None, int chunksize=-1,
+                Py_ssize_t src_pitch=0, Py_ssize_t dst_pitch=0):
+    """
+    Vertically flipped buffers of a stack of frames in a single call
+
+    Same as vfb_rgb / vfb_rgba / vfb / vfb_generic called for every frame, for many small
+    frames (sprites, video thumbnails). The arguments are checked once, the GIL is released
+    once and a single OpenMP team shares the work of the whole batch (frames and rows of
+    tiles), so the threads are busy with small frames as well as with a few large ones.
+
+    frames shape (N, width, height, depth), the output has the shape (N, height, width, depth)
+    frames shape (N, width * height * depth), width, height and depth must be given, the 
+    output has the same shape as the input
+    frames shape (N, L) with padded rows (src_pitch / dst_pitch), each row of the stack holds
+    a padded frame, the output has the shape (N, height * dst_pitch / itemsize) when allocated
+
+    e.g
+    frames = numpy.stack([sprite_buffer1, sprite_buffer2, ...])   # (N, 64 * 64 * 4)
+    out = vfb_batch(frames, width=64, height=64, depth=4)
+
+    :param frames     : numpy.ndarray C contiguous, any data type, shape (N, width, height, depth)
+    or (N, width * height * depth)
+    :param out        : numpy.ndarray C contiguous, same data type and size as frames, None to 
+    allocate the output
+    :param width      : integer; frames width (2d stack only)
+    :param height     : integer; frames height (2d stack only)
+    :param depth      : integer; values per pixel (2d stack only)
+    :param num_threads: integer; number of OpenMP threads for this call, 0 = module setting
+    :param schedule   : string; 'static', 'dynamic', 'guided' or None for the module setting
+    :param chunksize  : integer; chunk size for this call, 0 = OpenMP default, -1 = module setting
+    :param src_pitch  : integer; bytes between two rows (height pixels) of a padded frame, 
+    0 for packed rows (2d stack only)
+    :param dst_pitch  : integer; bytes between two rows (width pixels) of a padded output frame, 
+    0 for packed rows (2d stack only)
+    :return           : numpy.ndarray; the transposed frames (out)
+    """
+    if not (isinstance(frames, numpy.ndarray) and frames.flags.c_contiguous):
+        raise ValueError('Argument frames must be a C contiguous numpy.ndarray')
+    cdef bint padded = src_pitch != 0 or dst_pitch != 0
+    if frames.ndim == 4:
+        if padded:
+            raise ValueError('Arguments src_pitch and dst_pitch require a stack of shape (N, L)')
+        width, height, depth = frames.shape[1], frames.shape[2], frames.shape[3]
+        shape = (frames.shape[0], height, width, depth)
+    else:
+        if frames.ndim != 2:
+            raise ValueError('Argument frames must have the shape (N, w, h, d) or (N, w * h * d)')
+        if width <= 0 or height <= 0 or depth <= 0:
+            raise ValueError('Arguments width, height and depth are required for a stack of shape (N, w * h * d)')
+        if not padded and frames.shape[1] != <Py_ssize_t>width * height * depth:
+            raise ValueError('Argument frames must have the shape (N, width * height * depth)')
+        shape = frames.shape
+        if dst_pitch:
+            shape = (frames.shape[0], -(-height * dst_pitch // frames.itemsize))
+    if out is None:
+        out = numpy.empty(shape, dtype=frames.dtype)
+    if not (isinstance(out, numpy.ndarray) and out.flags.c_contiguous and out.flags.writeable):
+        raise ValueError('Argument out must be a writable C contiguous numpy.ndarray')
+    if out.dtype != frames.dtype:
+        raise ValueError('Argument out must have the data type of frames')
+    if not padded and out.size != frames.size:
+        raise ValueError('Argument out must have the size of frames')
+
+    cdef:
+        Py_ssize_t n = frames.shape[0]
+        int pixel_size = depth * frames.itemsize
+        Py_ssize_t src_frame = 0, dst_frame = 0
+        const unsigned char [::1] src = frames.reshape(-1).view(numpy.uint8)
+        unsigned char [::1] dst = out.reshape(-1).view(numpy.uint8)
+        parallel_t par
+
+    if padded:
+        if not (out.ndim == 2 and out.shape[0] == n):
+            raise ValueError('Argument out must have the shape (N, L)')
+        src_frame, dst_frame = frames.shape[1] * frames.itemsize, out.shape[1] * out.itemsize
+        src_pitch = pitch_c(src_pitch, <Py_ssize_t>height * pixel_size, width, src_frame, False)
+        dst_pitch = pitch_c(dst_pitch, <Py_ssize_t>width * pixel_size, height, dst_frame, True)
+    parallel_c(&par, num_threads, schedule, chunksize)
+    cdef:
+        Py_ssize_t nbytes = n * width * height * pixel_size * 2
+        double start = stats_begin_c()
+    if n > 0 and width > 0 and height > 0:
+        with nogil:
+            transpose_batch_c(&src[0], &dst[0], n, width, height, pixel_size,
+                              tile_size_c(pixel_size), &par, src_pitch, dst_pitch, src_frame, dst_frame)
+    stats_end_c(STATS_VFB_BATCH, nbytes, team_c(&par, nbytes // 2), start)
+    return out
+
+
+# HALF-FLOAT (FLOAT16) CONVERSIONS, (SOURCE, TARGET) DATA TYPES --> CONVERSION
+# numpy.uint16 arrays are read / written as the raw bits of float16 values
+cdef dict HALF_KINDS = {
+    ('float16', 'float32'): M_HALF_TO_FLOAT,
+    ('float32', 'float16'): M_FLOAT_TO_HALF,
+    ('float16', 'uint8'): M_HALF_TO_UBYTE,
+    ('uint8', 'float16'): M_UBYTE_TO_HALF,
+}
+# Bytes per value of the source and of the target of a conversion
+cdef int HALF_SRC_SIZE[4]
+cdef int HALF_DST_SIZE[4]
+HALF_SRC_SIZE[:] = [2, 4, 2, 1]
+HALF_DST_SIZE[:] = [4, 2, 1, 2]
+
+
+cdef inline str half_dtype(object dtype):
+    return 'float16' if dtype == numpy.uint16 else numpy.dtype(dtype).name
+
+
+cdef object convert_half(source, target, str dtype, int num_threads, schedule, int chunksize, int function):
+    # Element wise conversion of a C contiguous array, target None allocates an array of type dtype.
+    # function: STATS_* entry of the caller (see enable_stats)
+    src = numpy.asarray(source)
+    if not src.flags.c_contiguous:
+        raise ValueError('Argument source must be C contiguous')
+    if target is None:
+        target = numpy.empty(src.shape, dtype)
+    if not (isinstance(target, numpy.ndarray) and target.flags.c_contiguous and target.flags.writeable):
+        raise ValueError('Argument target must be a writable C contiguous numpy.ndarray')
+    if half_dtype(target.dtype) != dtype:
+        raise ValueError('Argument target must have the data type %s' % dtype)
+    if target.size != src.size:
+        raise ValueError('Arguments source and target must have the same size')
+    key = (half_dtype(src.dtype), dtype)
+    if key not in HALF_KINDS:
+        raise ValueError('Unsupported conversion %s --> %s' % key)
+    cdef:
+        int kind = HALF_KINDS[key]
+        Py_ssize_t n = src.size
+        const unsigned char [::1] s = src.reshape(-1).view(numpy.uint8)
+        unsigned char [::1] d = target.reshape(-1).view(numpy.uint8)
+        parallel_t par
+    parallel_c(&par, num_threads, schedule, chunksize)
+    cdef:
+        Py_ssize_t nbytes = n * (HALF_SRC_SIZE[kind] + HALF_DST_SIZE[kind])
+        double start = stats_begin_c()
+    if n > 0:
+        with nogil:
+            convert_half_c(&s[0], &d[0], n, kind, &par)
+    stats_end_c(function, nbytes, team_c(&par, nbytes), start)
+    return target
+
+
+cpdef half_to_float(source, target=None, int num_threads=0, schedule=None, int chunksize=-1):
+    """
+    Convert half-float values (numpy.float16 or their raw bits numpy.uint16) to numpy.float32
+
+    Table driven conversion (nogil, prange), inf, nan and subnormal values included.
+
+    e.g
+    hdr = numpy.empty(w * h * 4, numpy.float16)
+    pixels = half_to_float(hdr)
+
+    :param source     : numpy.ndarray C contiguous, numpy.float16 or numpy.uint16, any shape
+    :param target     : numpy.ndarray C contiguous numpy.float32, same size, None to allocate
+    :param num_threads: integer; number of OpenMP threads for this call, 0 = module setting
+    :param schedule   : string; 'static', 'dynamic', 'guided' or None for the module setting
+    :param chunksize  : integer; chunk size for this call, 0 = OpenMP default, -1 = module setting
+    :return           : numpy.ndarray; the target (same shape as source when allocated)
+    """
+    return convert_half(source, target, 'float32', num_threads, schedule, chunksize, STATS_HALF_TO_FLOAT)
+
+
+cpdef float_to_half(source, target=None, int num_threads=0, schedule=None, int chunksize=-1):
+    """
+    Convert numpy.float32 values to half-float values (numpy.float16)
+
+    Round to nearest even, same values as source.astype(numpy.float16) (nogil, prange).
+    Values above 65504 become inf.
+
+    :param source     : numpy.ndarray C contiguous numpy.float32, any shape
+    :param target     : numpy.ndarray C contiguous, numpy.float16 or numpy.uint16, same size,
+    None to allocate (numpy.float16)
+    :param num_threads: integer; number of OpenMP threads for this call, 0 = module setting
+    :param schedule   : string; 'static', 'dynamic', 'guided' or None for the module setting
+    :param chunksize  : integer; chunk size for this call, 0 = OpenMP default, -1 = module setting
+    :return           : numpy.ndarray; the target (same shape as source when allocated)
+    """
+    return convert_half(source, target, 'float16', num_threads, schedule, chunksize, STATS_FLOAT_TO_HALF)
+
+
+cpdef half_to_uint8(source, target=None, int num_threads=0, schedule=None, int chunksize=-1):
+    """
+    Convert normalized half-float values [0.0, 1.0] to numpy.uint8 [0, 255]
+
+    value = round(h * 255), values outside [0.0, 1.0] are clamped and nan becomes 0 (nogil, prange).
+
+    :param source     : numpy.ndarray C contiguous, numpy.float16 or numpy.uint16, any shape
+    :param target     : numpy.ndarray C contiguous numpy.uint8, same size, None to allocate
+    :param num_threads: integer; number of OpenMP threads for this call, 0 = module setting
+    :param schedule   : string; 'static', 'dynamic', 'guided' or None for the module setting
+    :param chunksize  : integer; chunk size for this call, 0 = OpenMP default, -1 = module setting
+    :return           : numpy.ndarray; the target (same shape as source when allocated)
+    """
+    return convert_half(source, target, 'uint8', num_threads, schedule, chunksize, STATS_HALF_TO_UINT8)
+
+
+cpdef uint8_to_half(source, target=None, int num_threads=0, schedule=None, int chunksize=-1):
+    """
+    Convert numpy.uint8 values [0, 255] to normalized half-float values [0.0, 1.0]
+
+    256 entries table (nogil, prange), half_to_uint8(uint8_to_half(a)) is a.
+
+    :param source     : numpy.ndarray C contiguous numpy.uint8, any shape
+    :param target     : numpy.ndarray C contiguous, numpy.float16 or numpy.uint16, same size,
+    None to allocate (numpy.float16)
+    :param num_threads: integer; number of OpenMP threads for this call, 0 = module setting
+    :param schedule   : string; 'static', 'dynamic', 'guided' or None for the module setting
+    :param chunksize  : integer; chunk size for this call, 0 = OpenMP default, -1 = module setting
+    :return           : numpy.ndarray; the target (same shape as source when allocated)
+    """
+    return convert_half(source, target, 'float16', num_threads, schedule, chunksize, STATS_UINT8_TO_HALF)
+
+
+# ROTATE / MIRROR / TRANSPOSE A HALF-FLOAT BUFFER FUSED WITH THE CONVERSION
+cpdef transform_half(source, target, int width, int height, int depth,
+                     str operation='transpose', tuple rect=None, int num_threads=0, schedule=None,
+                     int chunksize=-1, Py_ssize_t src_pitch=0, Py_ssize_t dst_pitch=0):
+    """
+    transform() of a half-float buffer converted in the same pass
+
+    The source and target data types select the conversion
+    float16 --> float32  widen (e.g HDR render target --> float32 pixels)
+    float16 --> uint8    normalized [0.0, 1.0] --> [0, 255], clamped
+    float32 --> float16  narrow, round to nearest even
+    uint8   --> float16  [0, 255] --> [0.0, 1.0]
+    float16 --> float16  no conversion (same as transform with 2 bytes per value)
+    numpy.uint16 arrays hold the raw bits of float16 values.
+    Each value is read and written once, the buffer is flipped and widened in a single
+    pass instead of transform + astype (nogil, prange).
+
+    e.g
+    hdr = numpy.empty(w * h * 4, numpy.float16)
+    pixels = numpy.empty(w * h * 4, numpy.float32)
+    transform_half(hdr, pixels, w, h, 4)            # same as vfb_generic + astype(numpy.float32)
+    transform_half(hdr, rgba, w, h, 4, 'rot90')     # rgba numpy.uint8, tone mapped [0, 1] values
+
+    :param source     : numpy.ndarray C contiguous, model (width, height, depth), 
+    length width * height * depth values
+    :param target     : numpy.ndarray C contiguous, length w * h * depth values of the result
+    :param width      : integer; source width
+    :param height     : integer; source height
+    :param depth      : integer; values per pixel (e.g 1, 3, 4)
+    :param operation  : string; see transform()
+    :param rect       : tuple (x, y, w, h); source rectangle or None for the whole buffer
+    :param num_threads: integer; number of OpenMP threads for this call, 0 = module setting
+    :param schedule   : string; 'static', 'dynamic', 'guided' or None for the module setting
+    :param chunksize  : integer; chunk size for this call, 0 = OpenMP default, -1 = module setting
+    :param src_pitch  : integer; bytes between two rows (height pixels) of a padded source, 0 for packed rows
+    :param dst_pitch  : integer; bytes between two rows of a padded target, 0 for packed rows
+    :return           : numpy.ndarray; the target
+    """
+    if width <= 0:
+        raise ValueError('Argument width cannot be <=0')
+    if height <= 0:
+        raise ValueError('Argument height cannot be <=0')
+    if depth <= 0:
+        raise ValueError('Argument depth cannot be <=0')
+    if not (isinstance(source, numpy.ndarray) and source.flags.c_contiguous):
+        raise ValueError('Argument source must be a C contiguous numpy.ndarray')
+    if not (isinstance(target, numpy.ndarray) and target.flags.c_contiguous and target.flags.writeable):
+        raise ValueError('Argument target must be a writable C contiguous numpy.ndarray')
+    key = (half_dtype(source.dtype), half_dtype(target.dtype))
+    if not (key in HALF_KINDS or key == ('float16', 'float16')):
+        raise ValueError('Unsupported conversion %s --> %s' % key)
+    cdef:
+        int kind = HALF_KINDS.get(key, -1)
+        int s_pixel = depth * (HALF_SRC_SIZE[kind] if kind >= 0 else 2)
+        int d_pixel = depth * (HALF_DST_SIZE[kind] if kind >= 0 else 2)
+        const unsigned char [::1] s = source.reshape(-1).view(numpy.uint8)
+        unsigned char [::1] d = target.reshape(-1).view(numpy.uint8)
+        affine_t t
+        int tw, th
+        parallel_t par
+    affine_c(&t, operation, width, height, rect, &tw, &th)
+    if src_pitch or dst_pitch:
+        src_pitch = pitch_c(src_pitch, <Py_ssize_t>height * s_pixel, width, s.shape[0], False)
+        dst_pitch = pitch_c(dst_pitch, <Py_ssize_t>th * d_pixel, tw, d.shape[0], True)
+    else:
+        if source.size != <Py_ssize_t>width * height * depth:
+            raise ValueError('Argument source must have length width * height * depth')
+        if target.size != <Py_ssize_t>tw * th * depth:
+            raise ValueError('Argument target must have length %s' % (<Py_ssize_t>tw * th * depth))
+        src_pitch, dst_pitch = <Py_ssize_t>height * s_pixel, <Py_ssize_t>th * d_pixel
+    parallel_c(&par, num_threads, schedule, chunksize)
+    cdef:
+        Py_ssize_t nbytes = <Py_ssize_t>width * height * s_pixel + <Py_ssize_t>tw * th * d_pixel
+        double start = stats_begin_c()
+    with nogil:
+        if kind < 0:
+            affine_remap_c(&s[0], &d[0], src_pitch, dst_pitch, s_pixel, tw, th, &t,
+                           tile_size_c(s_pixel), &par)
+        else:
+            affine_half_c(&s[0], &d[0], src_pitch, dst_pitch, depth, kind, tw, th, &t,
+                          tile_size_c(max(s_pixel, d_pixel)), &par)
+    stats_end_c(STATS_TRANSFORM_HALF, nbytes, team_c(&par, nbytes), start)
+    return target
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.nonecheck(False)
+@cython.cdivision(True)
+cdef inline xyz to3d_c(unsigned int index, unsigned int width, unsigned short int depth)noexcept nogil:
+    # Branch free, width and depth must be > 0 (checked once by the caller, see check_index_c)
+    cdef:
+        xyz v
+        unsigned int ix = index // depth
+
+    v.y = <int>(ix / width)
+    v.x = <int>(ix % width)
+    v.z = <int>(index % depth)
+    return v
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.nonecheck(False)
+@cython.cdivision(True)
+cdef inline unsigned int to1d_c(unsigned int x, unsigned int y,
+                       unsigned int z,  unsigned int width, unsigned short int depth)noexcept nogil:
+
+    return <unsigned int>(y * width * depth + x * depth + z)
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.nonecheck(False)
+@cython.cdivision(True)
+cdef inline unsigned int vmap_buffer_c(unsigned int index,
+                              unsigned int width, unsigned int height, unsigned short int depth)noexcept nogil:
+    # Branch free, width and depth must be > 0 (checked once by the caller, see check_index_c)
+    cdef:
+        unsigned int ix
+        unsigned int x, y, z
+
+    ix = index // depth
+    y = <unsigned int>(ix / width)
+    x = ix % width
+    z = index % depth
+    return <unsigned int>(x * height * depth) + (depth * y) + z
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.nonecheck(False)
+@cython.cdivision(True)
+cdef inline xyz64 to3d64_c(uint64_t index, uint64_t width, unsigned short int depth)noexcept nogil:
+    # 64-bit version of to3d_c, width and depth must be > 0 (checked once by the caller)
+    cdef:
+        xyz64 v
+        uint64_t ix = index // depth
+
+    v.y = ix // width
+    v.x = ix % width
+    v.z = index % depth
+    return v
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.nonecheck(False)
+@cython.cdivision(True)
+cdef inline uint64_t to1d64_c(uint64_t x, uint64_t y, uint64_t z,
+                              uint64_t width, unsigned short int depth)noexcept nogil:
+
+    return y * width * depth + x * depth + z
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.nonecheck(False)
+@cython.cdivision(True)
+cdef inline uint64_t vmap_buffer64_c(uint64_t index, uint64_t width, uint64_t height,
+                                     unsigned short int depth)noexcept nogil:
+    # 64-bit version of vmap_buffer_c, width and depth must be > 0 (checked once by the caller)
+    cdef uint64_t ix = index // depth
+    return (ix % width) * height * depth + depth * (ix // width) + index % depth
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.nonecheck(False)
+@cython.cdivision(True)
+cdef inline int tile_size_c(int depth)noexcept nogil:
+    # Tile size (pixels) for a given depth. In auto mode (TILE_SIZE = 0) this is the
+    # largest power of two such that a source tile and a target tile fit in TILE_BUDGET
+    cdef int tile
+
+    if TILE_SIZE > 0:
+        return TILE_SIZE
+
+    if depth < 1:
+        depth = 1
+    tile = MAX_TILE_SIZE
+    while tile > MIN_TILE_SIZE and 2 * tile * tile * depth > TILE_BUDGET:
+        tile = tile >> 1
+    return tile
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.nonecheck(False)
+@cython.cdivision(True)
+cdef inline int parallel_threads_c(const parallel_t * par, Py_ssize_t nbytes)noexcept nogil:
+    # Number of threads for a kernel processing nbytes bytes, the schedule is applied to
+    # the calling thread (omp_set_schedule) for the next prange loop (schedule='runtime').
+    # par = NULL for the module settings (set_num_threads, set_schedule).
+    m_omp_set_schedule(SCHEDULE if par == NULL else par.schedule,
+                       CHUNKSIZE if par == NULL else par.chunksize)
+    return team_c(par, nbytes)
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.nonecheck(False)
+@cython.cdivision(True)
+cdef inline int team_c(const parallel_t * par, Py_ssize_t nbytes)noexcept nogil:
+    # Team size of a kernel processing nbytes bytes (see parallel_threads_c)
+    cdef int threads = NUM_THREADS if par == NULL else par.num_threads
+    if nbytes < SERIAL_THRESHOLD:
+        return 1
+    return threads if threads > 0 else m_omp_max_threads()
+
+
+cdef inline double stats_begin_c()noexcept nogil:
+    # Start time of an instrumented call, 0 when the calls are not recorded
+    if M_STATS and STATS_ENABLED:
+        return m_clock()
+    return 0.0
+
+
+@cython.cdivision(True)
+cdef inline int stats_end_c(int function, Py_ssize_t nbytes, int threads, double start) except -1:
+    # Record a call started at start (stats_begin_c), nothing when start is 0
+    cdef:
+        double seconds
+        long long us
+        int bucket = 0
+        stats_t * s
+    if not M_STATS or start == 0.0:
+        return 0
+    seconds = m_clock() - start
+    s = &STATS[function]
+    s.calls += 1
+    s.nbytes += nbytes
+    s.seconds += seconds
+    if threads > s.threads:
+        s.threads = threads
+    us = <long long>(seconds * 1e6)
+    while us > 1 and bucket < STATS_BUCKETS - 1:
+        us >>= 1
+        bucket += 1
+    s.histogram[bucket] += 1
+    if STATS_CALLBACK is not None:
+        STATS_CALLBACK(STATS_NAMES[function], nbytes, seconds, threads)
+    return 0
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.nonecheck(False)
+@cython.cdivision(True)
+cdef inline int copy_pixels_c(unsigned char * target, const unsigned char * source,
+                              int n, Py_ssize_t step, int pixel_size)noexcept nogil:
+    # Copy n pixels of pixel_size bytes, the source pixels are step bytes apart and
+    # the target pixels are contiguous. Common pixel sizes are copied with a fixed
+    # size memcpy (single load/store), the others byte by byte.
+    cdef int x, k
+
+    if pixel_size == 1:
+        for x in range(n):
+            target[x] = source[0]
+            source = source + step
+    elif pixel_size == 4:
+        for x in range(n):
+            memcpy(target, source, 4)
+            target = target + 4
+            source = source + step
+    elif pixel_size == 3:
+        for x in range(n):
+            memcpy(target, source, 3)
+            target = target + 3
+            source = source + step
+    elif pixel_size == 2:
+        for x in range(n):
+            memcpy(target, source, 2)
+            target = target + 2
+            source = source + step
+    elif pixel_size == 8:
+        for x in range(n):
+            memcpy(target, source, 8)
+            target = target + 8
+            source = source + step
+    elif pixel_size == 6:
+        for x in range(n):
+            memcpy(target, source, 6)
+            target = target + 6
+            source = source + step
+    elif pixel_size == 12:
+        for x in range(n):
+            memcpy(target, source, 12)
+            target = target + 12
+            source = source + step
+    elif pixel_size == 16:
+        for x in range(n):
+            memcpy(target, source, 16)
+            target = target + 16
+            source = source + step
+    else:
+        for x in range(n):
+            for k in range(pixel_size):
+                target[k] = source[k]
+            target = target + pixel_size
+            source = source + step
+    return 0
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.nonecheck(False)
+@cython.cdivision(True)
+cdef inline void transpose_tiled_c(const unsigned char * source, unsigned char * target,
+                                   int width, int height, int depth, int tile,
+                                   const parallel_t * par=NULL,
+                                   Py_ssize_t src_pitch=0, Py_ssize_t dst_pitch=0)noexcept nogil:
+    # Cache blocked transpose, source model (width, height, depth) --> target model
+    # (height, width, depth), depth being the pixel size in bytes. Both buffers are
+    # walked tile by tile (tile x tile pixels) so the source and target rows of a tile
+    # stay in cache. Rows of tiles are shared between threads.
+    # src_pitch / dst_pitch are the bytes between two rows (padded rows), 0 for packed rows.
+    # 32-bit pixels are transposed with SSE2 / AVX2 blocks (see mapsimd.c)
+    cdef:
+        int by, y_tiles
+        int threads = parallel_threads_c(par, <Py_ssize_t>height * depth * width)
+
+    if src_pitch == 0:
+        src_pitch = <Py_ssize_t>height * depth
+    if dst_pitch == 0:
+        dst_pitch = <Py_ssize_t>width * depth
+    y_tiles = (height + tile - 1) // tile
+
+    for by in prange(y_tiles, schedule='runtime', num_threads=threads):
+        transpose_tile_row_c(source, target, width, height, depth, tile, by, src_pitch, dst_pitch)
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.nonecheck(False)
+@cython.cdivision(True)
+cdef inline void transpose_tile_row_c(const unsigned char * source, unsigned char * target,
+                                      int width, int height, int depth, int tile, int by,
+                                      Py_ssize_t src_pitch, Py_ssize_t dst_pitch)noexcept nogil:
+    # Row of tiles by of the cache blocked transpose (see transpose_tiled_c), serial.
+    # src_pitch / dst_pitch: bytes between two source rows (x) / two target rows (y)
+    cdef:
+        int bx, x_tiles, ty, tx, y, y_end, x_end
+        bint simd = depth == 4 and SIMD_LEVEL > M_SIMD_SCALAR and \
+            (src_pitch & 3) == 0 and (dst_pitch & 3) == 0
+
+    x_tiles = (width + tile - 1) // tile
+    ty = by * tile
+    y_end = ty + tile if ty + tile < height else height
+    for bx in range(x_tiles):
+        tx = bx * tile
+        x_end = tx + tile if tx + tile < width else width
+        if simd:
+            m_transpose32_tile(<const uint32_t *>(source + tx * src_pitch + ty * 4),
+                               <uint32_t *>(target + ty * dst_pitch + tx * 4),
+                               src_pitch >> 2, dst_pitch >> 2, x_end - tx, y_end - ty, SIMD_LEVEL)
+            continue
+        for y in range(ty, y_end):
+            copy_pixels_c(target + y * dst_pitch + <Py_ssize_t>tx * depth,
+                          source + tx * src_pitch + <Py_ssize_t>y * depth,
+                          x_end - tx, src_pitch, depth)
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.nonecheck(False)
+@cython.cdivision(True)
+cdef inline void transpose_batch_c(const unsigned char * source, unsigned char * target, Py_ssize_t n,
+                                   int width, int height, int depth, int tile,
+                                   const parallel_t * par=NULL,
+                                   Py_ssize_t src_pitch=0, Py_ssize_t dst_pitch=0,
+                                   Py_ssize_t src_frame=0, Py_ssize_t dst_frame=0)noexcept nogil:
+    # Transpose n frames of the model (width, height, depth) stored one after the other.
+    # The work units (frame, row of tiles) of the whole batch are shared by a single
+    # OpenMP team: small frames are spread over the threads, large frames are split.
+    # Pitches (bytes between rows) and frame strides (bytes between frames), 0 for packed.
+    cdef:
+        Py_ssize_t i, f, frame = <Py_ssize_t>width * height * depth
+        int y_tiles = (height + tile - 1) // tile
+        int threads = parallel_threads_c(par, frame * n)
+
+    if src_pitch == 0:
+        src_pitch = <Py_ssize_t>height * depth
+    if dst_pitch == 0:
+        dst_pitch = <Py_ssize_t>width * depth
+    if src_frame == 0:
+        src_frame = frame
+    if dst_frame == 0:
+        dst_frame = frame
+
+    for i in prange(n * y_tiles, schedule='runtime', num_threads=threads):
+        f = i // y_tiles
+        transpose_tile_row_c(source + f * src_frame, target + f * dst_frame, width, height, depth, tile,
+                             <int>(i - f * y_tiles), src_pitch, dst_pitch)
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.nonecheck(False)
+@cython.cdivision(True)
+cdef inline unsigned char [:] vfb_rgb_c(unsigned char [:] source, unsigned char [:] target,
+                                   int width, int height, const parallel_t * par=NULL,
+                                   Py_ssize_t src_pitch=0, Py_ssize_t dst_pitch=0)noexcept nogil:
+    # src_pitch / dst_pitch: bytes between rows of padded contiguous buffers, 0 for packed rows
+    cdef:
+        int i, j, k, threads
+        Py_ssize_t index, v, row = <Py_ssize_t>height * 3
+        unsigned char [:] flipped_array = target
+
+    if source.strides[0] == 1 and target.strides[0] == 1:
+        transpose_tiled_c(&source[0], &target[0], width, height, 3, tile_size_c(3), par,
+                          src_pitch, dst_pitch)
+        return flipped_array
+
+    # Strided buffers (e.g buffer[::2]), element by element, 64-bit offsets
+    threads = parallel_threads_c(par, <Py_ssize_t>width * height * 3)
+    for i in prange(height, schedule='runtime', num_threads=threads):
+        for j in range(0, width):
+            index = j * row + <Py_ssize_t>i * 3
+            v = (<Py_ssize_t>i * width + j) * 3
+            for k in range(3):
+                flipped_array[v + k] =  <unsigned char>source[index + k]
+
+    return flipped_array
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.nonecheck(False)
+@cython.cdivision(True)
+cdef inline unsigned char [:] vfb_rgba_c(unsigned char [:] source, unsigned char [:] target,
+                                   int width, int height, const parallel_t * par=NULL,
+                                   Py_ssize_t src_pitch=0, Py_ssize_t dst_pitch=0)noexcept nogil:
+
+
+    cdef:
+        int i, j, k, threads
+        Py_ssize_t index, v, row = <Py_ssize_t>height * 4
+        unsigned char [:] flipped_array = target
+
+    if source.strides[0] == 1 and target.strides[0] == 1:
+        transpose_tiled_c(&source[0], &target[0], width, height, 4, tile_size_c(4), par,
+                          src_pitch, dst_pitch)
+        return flipped_array
+
+    # Strided buffers (e.g buffer[::2]), element by element, 64-bit offsets
+    threads = parallel_threads_c(par, <Py_ssize_t>width * height * 4)
+    for i in prange(height, schedule='runtime', num_threads=threads):
+        for j in range(0, width):
+            index = j * row + <Py_ssize_t>i * 4
+            v = (<Py_ssize_t>i * width + j) * 4
+            for k in range(4):
+                flipped_array[v + k] =  <unsigned char>source[index + k]
+
+    return flipped_array
+
+
+@cython.boundscheck(False)
 @cython.wraparound(False)
 @cython.nonecheck(False)
 @cython.cdivision(True)
 cdef inline unsigned char [::1] vfb_c(unsigned char [:] source,
-                               unsigned char [::1] target, int width, int height)nogil:
+                               unsigned char [::1] target, int width, int height,
+                               const parallel_t * par=NULL,
+                               Py_ssize_t src_pitch=0, Py_ssize_t dst_pitch=0)noexcept nogil:
     cdef:
-        int i, j
+        int i, j, threads
         unsigned char [::1] flipped_array = target
 
-    for i in prange(0, height):
+    if source.strides[0] == 1:
+        transpose_tiled_c(&source[0], &target[0], width, height, 1, tile_size_c(1), par,
+                          src_pitch, dst_pitch)
+        return flipped_array
+
+    # Strided source buffer (e.g buffer[::2]), element by element, 64-bit offsets
+    threads = parallel_threads_c(par, <Py_ssize_t>width * height)
+    for i in prange(0, height, schedule='runtime', num_threads=threads):
         for j in range(0, width):
-            flipped_array[j + (i * width)] =  <unsigned char>source[i + (height * j)]
+            flipped_array[<Py_ssize_t>i * width + j] =  <unsigned char>source[<Py_ssize_t>j * height + i]
     return flipped_array
 
 
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.nonecheck(False)
+@cython.cdivision(True)
+cdef inline pixel_t [::1] vfb_generic_c(pixel_t [::1] source, pixel_t [::1] target,
+                                        int width, int height, int depth,
+                                        const parallel_t * par=NULL,
+                                        Py_ssize_t src_pitch=0, Py_ssize_t dst_pitch=0)noexcept nogil:
+    # One specialization per data type, the pixel (depth x sizeof(pixel_t) bytes) is
+    # moved as a whole by the tiled engine. Pitches in bytes, 0 for packed rows
+    cdef int pixel_size = depth * <int>sizeof(pixel_t)
+
+    transpose_tiled_c(<const unsigned char *>&source[0], <unsigned char *>&target[0],
+                      width, height, pixel_size, tile_size_c(pixel_size), par, src_pitch, dst_pitch)
+    return target
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.nonecheck(False)
+@cython.cdivision(True)
+cdef inline index_t [:, ::1] to3d_array_c(index_t [:] index, index_t [:, ::1] out,
+                                          uint64_t width, unsigned short int depth)noexcept nogil:
+    cdef:
+        Py_ssize_t i
+        Py_ssize_t n = index.shape[0]
+        int threads = parallel_threads_c(NULL, n * 4 * sizeof(index_t))
+        xyz v
+        xyz64 w
+
+    for i in prange(n, schedule='runtime', num_threads=threads):
+        if index_t is uint32_t:
+            v = to3d_c(index[i], <unsigned int>width, depth)
+            out[i, 0] = v.x
+            out[i, 1] = v.y
+            out[i, 2] = v.z
+        else:
+            w = to3d64_c(index[i], width, depth)
+            out[i, 0] = w.x
+            out[i, 1] = w.y
+            out[i, 2] = w.z
+    return out
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.nonecheck(False)
+@cython.cdivision(True)
+cdef inline index_t [:] to1d_array_c(index_t [:] x, index_t [:] y, index_t [:] z,
+                                     index_t [:] out, uint64_t width,
+                                     unsigned short int depth)noexcept nogil:
+    cdef:
+        Py_ssize_t i
+        Py_ssize_t n = out.shape[0]
+        int threads = parallel_threads_c(NULL, n * 4 * sizeof(index_t))
+
+    for i in prange(n, schedule='runtime', num_threads=threads):
+        if index_t is uint32_t:
+            out[i] = to1d_c(x[i], y[i], z[i], <unsigned int>width, depth)
+        else:
+            out[i] = to1d64_c(x[i], y[i], z[i], width, depth)
+    return out
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.nonecheck(False)
+@cython.cdivision(True)
+cdef inline index_t [:] vmap_buffer_array_c(index_t [:] index, index_t [:] out,
+                                            uint64_t width, uint64_t height,
+                                            unsigned short int depth)noexcept nogil:
+    cdef:
+        Py_ssize_t i
+        Py_ssize_t n = out.shape[0]
+        int threads = parallel_threads_c(NULL, n * 2 * sizeof(index_t))
+
+    for i in prange(n, schedule='runtime', num_threads=threads):
+        if index_t is uint32_t:
+            out[i] = vmap_buffer_c(index[i], <unsigned int>width, <unsigned int>height, depth)
+        else:
+            out[i] = vmap_buffer64_c(index[i], width, height, depth)
+    return out
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.nonecheck(False)
+@cython.cdivision(True)
+cdef inline void transpose_square_inplace_c(unsigned char * buffer, int n, int depth, int tile)noexcept nogil:
+    # Inplace transpose of a square buffer (n x n pixels), pixel (x, y) is swapped with
+    # pixel (y, x). The upper triangle is processed tile by tile, each tile (by, bx) being
+    # swapped with its mirror tile (bx, by). Rows of tiles are shared between threads.
+    cdef:
+        int by, bx, tiles, y, x, y_end, x_end, x_start, k
+        Py_ssize_t row = <Py_ssize_t>n * depth
+        unsigned char * a
+        unsigned char * b
+        unsigned char c
+        unsigned int v
+        int threads = parallel_threads_c(NULL, row * n)
+
+    tiles = (n + tile - 1) // tile
+
+    # Dynamic schedule whatever the settings, the rows of tiles get shorter
+    for by in prange(tiles, schedule='dynamic', num_threads=threads):
+        y_end = by * tile + tile if by * tile + tile < n else n
+        for bx in range(by, tiles):
+            x_end = bx * tile + tile if bx * tile + tile < n else n
+            for y in range(by * tile, y_end):
+                # Diagonal tiles, only the pixels above the diagonal
+                x_start = y + 1 if bx == by else bx * tile
+                a = buffer + y * row + <Py_ssize_t>x_start * depth
+                b = buffer + <Py_ssize_t>x_start * row + <Py_ssize_t>y * depth
+                if depth == 4:
+                    for x in range(x_start, x_end):
+                        memcpy(&v, a, 4)
+                        memcpy(a, b, 4)
+                        memcpy(b, &v, 4)
+                        a = a + 4
+                        b = b + row
+                else:
+                    for x in range(x_start, x_end):
+                        for k in range(depth):
+                            c = a[k]
+                            a[k] = b[k]
+                            b[k] = c
+                        a = a + depth
+                        b = b + row
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.nonecheck(False)
+@cython.cdivision(True)
+cdef inline int transpose_cycle_inplace_c(unsigned char * buffer, int width, int height, int depth)noexcept nogil:
+    # Inplace transpose of a non-square buffer by following the cycles of the permutation.
+    # The pixel stored at position p = y * width + x of the target model comes from the
+    # position x * height + y of the source model. Each cycle is walked once with a single
+    # pixel held aside; the bitset (one bit per pixel) marks the positions already written.
+    # Return 0 on success, -1 if the memory cannot be allocated.
+    cdef:
+        Py_ssize_t n = <Py_ssize_t>width * height
+        Py_ssize_t start, p, q
+        unsigned char * visited = <unsigned char *>calloc((n >> 3) + 1, sizeof(unsigned char))
+        unsigned char * pixel = <unsigned char *>malloc(depth)
+
+    if visited == NULL or pixel == NULL:
+        free(visited)
+        free(pixel)
+        return -1
+
+    # First and last pixels never move
+    for start in range(1, n - 1):
+        if visited[start >> 3] & (1 << (start & 7)):
+            continue
+        memcpy(pixel, buffer + start * depth, depth)
+        p = start
+        while True:
+            visited[p >> 3] |= <unsigned char>(1 << (p & 7))
+            q = (p % width) * height + p // width
+            if q == start:
+                memcpy(buffer + p * depth, pixel, depth)
+                break
+            memcpy(buffer + p * depth, buffer + q * depth, depth)
+            p = q
+
+    free(visited)
+    free(pixel)
+    return 0
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.nonecheck(False)
+@cython.cdivision(True)
+cdef inline int transpose_inplace_c(unsigned char * buffer, int width, int height, int depth)noexcept nogil:
+    # Inplace transpose, model (width, height, depth) --> model (height, width, depth)
+    # Return 0 on success, -1 if the memory cannot be allocated.
+    if width == 1 or height == 1:
+        return 0
+    if width == height:
+        transpose_square_inplace_c(buffer, width, depth, tile_size_c(depth))
+        return 0
+    return transpose_cycle_inplace_c(buffer, width, height, depth)
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.nonecheck(False)
+@cython.cdivision(True)
+cdef inline void split_channels_c(const unsigned char * source, Py_ssize_t step,
+                                  unsigned char * red, unsigned char * green, unsigned char * blue,
+                                  unsigned char * alpha, Py_ssize_t n, const parallel_t * par=NULL)noexcept nogil:
+    # Interleaved pixels --> planar channels, n pixels. The source values are step bytes
+    # apart (1 for a contiguous buffer), alpha = NULL for RGB pixels.
+    cdef:
+        Py_ssize_t i
+        int depth = 3 if alpha == NULL else 4
+        Py_ssize_t pixel = step * depth
+        const unsigned char * p
+        int threads = parallel_threads_c(par, n * depth * 2)
+
+    if alpha == NULL and step == 1:
+        # Contiguous RGB, constant offsets
+        for i in prange(n, schedule='runtime', num_threads=threads):
+            p = source + i * 3
+            red[i]   = p[0]
+            green[i] = p[1]
+            blue[i]  = p[2]
+    elif alpha == NULL:
+        for i in prange(n, schedule='runtime', num_threads=threads):
+            p = source + i * pixel
+            red[i]   = p[0]
+            green[i] = p[step]
+            blue[i]  = p[2 * step]
+    elif step == 1:
+        for i in prange(n, schedule='runtime', num_threads=threads):
+            p = source + i * 4
+            red[i]   = p[0]
+            green[i] = p[1]
+            blue[i]  = p[2]
+            alpha[i] = p[3]
+    else:
+        for i in prange(n, schedule='runtime', num_threads=threads):
+            p = source + i * pixel
+            red[i]   = p[0]
+            green[i] = p[step]
+            blue[i]  = p[2 * step]
+            alpha[i] = p[3 * step]
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.nonecheck(False)
+@cython.cdivision(True)
+cdef inline void merge_channels_c(unsigned char * target, Py_ssize_t step,
+                                  const unsigned char * red, const unsigned char * green,
+                                  const unsigned char * blue, const unsigned char * alpha,
+                                  Py_ssize_t n, const parallel_t * par=NULL)noexcept nogil:
+    # Planar channels --> interleaved pixels, n pixels. The target values are step bytes
+    # apart (1 for a contiguous buffer), alpha = NULL for RGB pixels.
+    cdef:
+        Py_ssize_t i
+        int depth = 3 if alpha == NULL else 4
+        Py_ssize_t pixel = step * depth
+        unsigned char * p
+        int threads = parallel_threads_c(par, n * depth * 2)
+
+    if alpha == NULL and step == 1:
+        # Contiguous RGB, constant offsets
+        for i in prange(n, schedule='runtime', num_threads=threads):
+            p = target + i * 3
+            p[0] = red[i]
+            p[1] = green[i]
+            p[2] = blue[i]
+    elif alpha == NULL:
+        for i in prange(n, schedule='runtime', num_threads=threads):
+            p = target + i * pixel
+            p[0]        = red[i]
+            p[step]     = green[i]
+            p[2 * step] = blue[i]
+    elif step == 1:
+        for i in prange(n, schedule='runtime', num_threads=threads):
+            p = target + i * 4
+            p[0] = red[i]
+            p[1] = green[i]
+            p[2] = blue[i]
+            p[3] = alpha[i]
+    else:
+        for i in prange(n, schedule='runtime', num_threads=threads):
+            p = target + i * pixel
+            p[0]        = red[i]
+            p[step]     = green[i]
+            p[2 * step] = blue[i]
+            p[3 * step] = alpha[i]
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.nonecheck(False)
+@cython.cdivision(True)
+cdef inline void transpose_gray_c(const unsigned char * source, unsigned char * target,
+                                  int width, int height, int depth, int out_depth,
+                                  int wr, int wg, int wb, int tile, Py_ssize_t src_pitch,
+                                  Py_ssize_t dst_pitch, const parallel_t * par=NULL)noexcept nogil:
+    # Cache blocked transpose fused with the luma conversion, source model (width, height, depth)
+    # --> target model (height, width, out_depth). out_depth = 1 writes a compact plane,
+    # out_depth = depth writes the gray value in R, G, B and copies the alpha channel.
+    # Weights are fixed point 16.16 (wr + wg + wb = 65536).
+    # src_pitch / dst_pitch: bytes between two source rows (x) / two target rows (y)
+    cdef:
+        int by, bx, y_tiles, x_tiles, ty, tx, x, y, y_end, x_end
+        Py_ssize_t src_step = src_pitch
+        const unsigned char * p
+        unsigned char * q
+        unsigned char gray
+        int threads = parallel_threads_c(par, <Py_ssize_t>width * height * (depth + out_depth))
+
+    y_tiles = (height + tile - 1) // tile
+    x_tiles = (width + tile - 1) // tile
+
+    for by in prange(y_tiles, schedule='runtime', num_threads=threads):
+        ty = by * tile
+        y_end = ty + tile if ty + tile < height else height
+        for bx in range(x_tiles):
+            tx = bx * tile
+            x_end = tx + tile if tx + tile < width else width
+            for y in range(ty, y_end):
+                p = source + tx * src_pitch + <Py_ssize_t>y * depth
+                q = target + y * dst_pitch + <Py_ssize_t>tx * out_depth
+                for x in range(tx, x_end):
+                    gray = <unsigned char>((wr * p[0] + wg * p[1] + wb * p[2] + 32768) >> 16)
+                    q[0] = gray
+                    if out_depth > 1:
+                        q[1] = gray
+                        q[2] = gray
+                        if out_depth == 4:
+                            q[3] = p[3]
+                    p = p + src_step
+                    q = q + out_depth
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.nonecheck(False)
+@cython.cdivision(True)
+cdef inline void gather_pixels_c(const unsigned char * source, unsigned char * target,
+                                 const unsigned int * index, int width, int height, int pixel_size,
+                                 int tile, const parallel_t * par=NULL, int src_height=0,
+                                 Py_ssize_t src_pitch=0, Py_ssize_t dst_pitch=0)noexcept nogil:
+    # target pixel i <-- source pixel index[i] (remap plans), target model (width, height)
+    # of pixel_size bytes pixels. The target is walked tile by tile like the transpose engine,
+    # the source pixels read by a tile of a transpose or a rotation stay in cache.
+    # Padded rows: source rows of src_height pixels src_pitch bytes apart, target rows
+    # dst_pitch bytes apart (0 for packed rows)
+    cdef:
+        int bx, by, x_tiles, y_tiles, tx, ty, x, y, x_end, y_end, k
+        Py_ssize_t i, j
+        bint padded = src_pitch != 0 or dst_pitch != 0
+        unsigned char * q
+        int threads = parallel_threads_c(par, <Py_ssize_t>width * height * pixel_size * 2)
+
+    if src_pitch == 0:
+        src_pitch = <Py_ssize_t>src_height * pixel_size
+    if dst_pitch == 0:
+        dst_pitch = <Py_ssize_t>height * pixel_size
+    x_tiles = (width + tile - 1) // tile
+    y_tiles = (height + tile - 1) // tile
+
+    for bx in prange(x_tiles, schedule='runtime', num_threads=threads):
+        tx = bx * tile
+        x_end = tx + tile if tx + tile < width else width
+        for by in range(y_tiles):
+            ty = by * tile
+            y_end = ty + tile if ty + tile < height else height
+            for x in range(tx, x_end):
+                i = <Py_ssize_t>x * height + ty
+                if padded:
+                    q = target + x * dst_pitch + <Py_ssize_t>ty * pixel_size
+                    for y in range(ty, y_end):
+                        j = index[i]
+                        memcpy(q, source + (j // src_height) * src_pitch + (j % src_height) * pixel_size,
+                               pixel_size)
+                        q = q + pixel_size
+                        i = i + 1
+                elif pixel_size == 4:
+                    for y in range(ty, y_end):
+                        memcpy(target + i * 4, source + <Py_ssize_t>index[i] * 4, 4)
+                        i = i + 1
+                elif pixel_size == 3:
+                    for y in range(ty, y_end):
+                        memcpy(target + i * 3, source + <Py_ssize_t>index[i] * 3, 3)
+                        i = i + 1
+                elif pixel_size == 1:
+                    for y in range(ty, y_end):
+                        target[i] = source[index[i]]
+                        i = i + 1
+                else:
+                    for y in range(ty, y_end):
+                        for k in range(pixel_size):
+                            target[i * pixel_size + k] = source[<Py_ssize_t>index[i] * pixel_size + k]
+                        i = i + 1
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.nonecheck(False)
+@cython.cdivision(True)
+cdef inline void affine_remap_c(const unsigned char * source, unsigned char * target,
+                                Py_ssize_t src_pitch, Py_ssize_t dst_pitch, int depth, int width_t,
+                                int height_t, const affine_t * t, int tile, const parallel_t * par=NULL)noexcept nogil:
+    # Target model (width_t, height_t, depth) <-- source model (., height, depth) through the
+    # index transform t, target pixel (u, v) <-- source pixel (x0 + xu.u + xv.v, y0 + yu.u + yv.v).
+    # src_pitch / dst_pitch are the bytes between two rows (height * depth, height_t * depth
+    # for packed buffers).
+    # The target is walked tile by tile, along v the source pointer moves by a constant step.
+    cdef:
+        int bu, bv, u_tiles, v_tiles, tu, tv, u, u_end, v_end
+        Py_ssize_t step = t.xv * src_pitch + <Py_ssize_t>t.yv * depth
+        const unsigned char * p
+        int threads = parallel_threads_c(par, <Py_ssize_t>width_t * height_t * depth * 2)
+
+    u_tiles = (width_t + tile - 1) // tile
+    v_tiles = (height_t + tile - 1) // tile
+
+    for bu in prange(u_tiles, schedule='runtime', num_threads=threads):
+        tu = bu * tile
+        u_end = tu + tile if tu + tile < width_t else width_t
+        for bv in range(v_tiles):
+            tv = bv * tile
+            v_end = tv + tile if tv + tile < height_t else height_t
+            for u in range(tu, u_end):
+                p = source + (<Py_ssize_t>t.x0 + t.xu * u + t.xv * tv) * src_pitch + \
+                    (<Py_ssize_t>t.y0 + t.yu * u + t.yv * tv) * depth
+                copy_pixels_c(target + u * dst_pitch + <Py_ssize_t>tv * depth, p, v_end - tv, step, depth)
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.nonecheck(False)
+@cython.cdivision(True)
+cdef inline void affine_remap_strided_c(const unsigned char * source, unsigned char * target,
+                                        const Py_ssize_t * s_strides, const Py_ssize_t * t_strides,
+                                        int depth, int width_t, int height_t,
+                                        const affine_t * t, int tile, const parallel_t * par=NULL)noexcept nogil:
+    # affine_remap_c for strided models, source and target point to the pixel (0, 0) and
+    # s_strides / t_strides are the byte strides (x, y, channel) of the models, any sign.
+    cdef:
+        int bu, bv, u_tiles, v_tiles, tu, tv, u, v, k, u_end, v_end
+        Py_ssize_t sx = s_strides[0], sy = s_strides[1], sc = s_strides[2]
+        Py_ssize_t tx = t_strides[0], ty = t_strides[1], tc = t_strides[2]
+        Py_ssize_t step = t.xv * sx + t.yv * sy
+        bint packed = sc == 1 and tc == 1
+        const unsigned char * p
+        unsigned char * q
+        int threads = parallel_threads_c(par, <Py_ssize_t>width_t * height_t * depth * 2)
+
+    u_tiles = (width_t + tile - 1) // tile
+    v_tiles = (height_t + tile - 1) // tile
+
+    for bu in prange(u_tiles, schedule='runtime', num_threads=threads):
+        tu = bu * tile
+        u_end = tu + tile if tu + tile < width_t else width_t
+        for bv in range(v_tiles):
+            tv = bv * tile
+            v_end = tv + tile if tv + tile < height_t else height_t
+            for u in range(tu, u_end):
+                p = source + (t.x0 + t.xu * u + t.xv * tv) * sx + (t.y0 + t.yu * u + t.yv * tv) * sy
+                q = target + u * tx + tv * ty
+                if packed and depth == 4:
+                    for v in range(v_end - tv):
+                        memcpy(q, p, 4)
+                        p = p + step
+                        q = q + ty
+                elif packed and depth == 3:
+                    for v in range(v_end - tv):
+                        memcpy(q, p, 3)
+                        p = p + step
+                        q = q + ty
+                else:
+                    for v in range(v_end - tv):
+                        for k in range(depth):
+                            q[k * tc] = p[k * sc]
+                        p = p + step
+                        q = q + ty
+
+
+cdef inline void compose_affine_c(affine_t * t, const affine_t * o)noexcept nogil:
+    # t <-- t(o), the transform o (new target --> current target) is applied first
+    cdef int x0 = t.x0 + t.xu * o.x0 + t.xv * o.y0
+    cdef int y0 = t.y0 + t.yu * o.x0 + t.yv * o.y0
+    cdef int xu = t.xu * o.xu + t.xv * o.yu, xv = t.xu * o.xv + t.xv * o.yv
+    cdef int yu = t.yu * o.xu + t.yv * o.yu, yv = t.yu * o.xv + t.yv * o.yv
+    t.x0, t.xu, t.xv, t.y0, t.yu, t.yv = x0, xu, xv, y0, yu, yv
+
+
+# Values converted per block by convert_half_c
+cdef int HALF_BLOCK = 4096
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.nonecheck(False)
+@cython.cdivision(True)
+cdef inline void convert_half_c(const unsigned char * source, unsigned char * target, Py_ssize_t n,
+                                int kind, const parallel_t * par=NULL)noexcept nogil:
+    # n values converted (maphalf.c kind), the blocks of HALF_BLOCK values are shared between threads
+    cdef:
+        Py_ssize_t b, start
+        Py_ssize_t blocks = (n + HALF_BLOCK - 1) // HALF_BLOCK
+        int s_size = HALF_SRC_SIZE[kind], d_size = HALF_DST_SIZE[kind]
+        int threads = parallel_threads_c(par, n * (s_size + d_size))
+
+    for b in prange(blocks, schedule='runtime', num_threads=threads):
+        start = b * HALF_BLOCK
+        m_half_convert(source + start * s_size, target + start * d_size,
+                       <int>(n - start if n - start < HALF_BLOCK else HALF_BLOCK), 1, s_size, kind)
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.nonecheck(False)
+@cython.cdivision(True)
+cdef inline void affine_half_c(const unsigned char * source, unsigned char * target,
+                               Py_ssize_t src_pitch, Py_ssize_t dst_pitch, int depth, int kind, int width_t,
+                               int height_t, const affine_t * t, int tile, const parallel_t * par=NULL)noexcept nogil:
+    # affine_remap_c fused with a half-float conversion (maphalf.c kind), source pixels of
+    # depth * HALF_SRC_SIZE[kind] bytes --> target pixels of depth * HALF_DST_SIZE[kind] bytes.
+    # The conversion is selected once per run of pixels (m_half_convert).
+    cdef:
+        int bu, bv, u_tiles, v_tiles, tu, tv, u, u_end, v_end
+        int s_pixel = depth * HALF_SRC_SIZE[kind], d_pixel = depth * HALF_DST_SIZE[kind]
+        Py_ssize_t step = t.xv * src_pitch + <Py_ssize_t>t.yv * s_pixel
+        const unsigned char * p
+        int threads = parallel_threads_c(par, <Py_ssize_t>width_t * height_t * (s_pixel + d_pixel))
+
+    u_tiles = (width_t + tile - 1) // tile
+    v_tiles = (height_t + tile - 1) // tile
+
+    for bu in prange(u_tiles, schedule='runtime', num_threads=threads):
+        tu = bu * tile
+        u_end = tu + tile if tu + tile < width_t else width_t
+        for bv in range(v_tiles):
+            tv = bv * tile
+            v_end = tv + tile if tv + tile < height_t else height_t
+            for u in range(tu, u_end):
+                p = source + (<Py_ssize_t>t.x0 + t.xu * u + t.xv * tv) * src_pitch + \
+                    (<Py_ssize_t>t.y0 + t.yu * u + t.yv * tv) * s_pixel
+                m_half_convert(p, target + u * dst_pitch + <Py_ssize_t>tv * d_pixel, v_end - tv, depth, step, kind)
@@ -0,0 +1,180 @@
+#include <stdint.h>
+#include <stddef.h>
+
+
+/*
+
+//////////////////////////////////////////////////////
+   SIMD kernels used by the transpose engine (mapping.pyx)
+
+   Pixels of 32-bit (RGBA, BGRA, float32, uint32, uint16 x 2) are transposed
+   by blocks of 4x4 (SSE2) or 8x8 (AVX2) pixels with 32-bit lane moves.
+   The instruction set is selected at runtime with m_simd_level(), the
+   scalar version is used on other architectures.
+
+   src points to the pixel (x, y) of the source model (width, height) and
+   dst to the pixel (y, x) of the target model (height, width), src_step
+   is the source height and dst_step the target width (in pixels).
+
+*/
+
+#define M_SIMD_SCALAR 0
+#define M_SIMD_SSE2   1
+#define M_SIMD_AVX2   2
+
+#if defined(__x86_64__) || defined(_M_X64) || defined(__i386__) || defined(_M_IX86)
+#define M_SIMD_X86
+#include <emmintrin.h>
+#include <immintrin.h>
+#if defined(_MSC_VER)
+#include <intrin.h>
+#define M_TARGET_AVX2
+#else
+#define M_TARGET_AVX2 __attribute__((target("avx2")))
+#endif
+#endif
+
+
+static int m_simd_detected = -1;
+
+
+/* Return the best instruction set available on this CPU
+   M_SIMD_AVX2, M_SIMD_SSE2 or M_SIMD_SCALAR */
+static int m_simd_level(void)
+{
+#if defined(M_SIMD_X86)
+   if (m_simd_detected < 0) {
+#if defined(_MSC_VER)
+      int info[4];
+      int avx = 0;
+      __cpuid(info, 1);
+      /* AVX and OSXSAVE, the OS must also save the YMM registers */
+      if ((info[2] & (1 << 27)) && (info[2] & (1 << 28)))
+         avx = ((_xgetbv(0) & 6) == 6);
+      __cpuidex(info, 7, 0);
+      m_simd_detected = (avx && (info[1] & (1 << 5))) ? M_SIMD_AVX2 : M_SIMD_SSE2;
+#else
+      __builtin_cpu_init();
+      m_simd_detected = __builtin_cpu_supports("avx2") ? M_SIMD_AVX2 : M_SIMD_SSE2;
+#endif
+   }
+   return m_simd_detected;
+#else
+   return M_SIMD_SCALAR;
+#endif
+}
+
+
+#if defined(M_SIMD_X86)
+static inline void m_transpose32_4x4_sse2(const uint32_t *src, uint32_t *dst,
+                                          ptrdiff_t src_step, ptrdiff_t dst_step)
+{
+   __m128i r0, r1, r2, r3, t0, t1, t2, t3;
+
+   r0 = _mm_loadu_si128((const __m128i *)(src));
+   r1 = _mm_loadu_si128((const __m128i *)(src + src_step));
+   r2 = _mm_loadu_si128((const __m128i *)(src + 2 * src_step));
+   r3 = _mm_loadu_si128((const __m128i *)(src + 3 * src_step));
+
+   t0 = _mm_unpacklo_epi32(r0, r1);
+   t1 = _mm_unpacklo_epi32(r2, r3);
+   t2 = _mm_unpackhi_epi32(r0, r1);
+   t3 = _mm_unpackhi_epi32(r2, r3);
+
+   _mm_storeu_si128((__m128i *)(dst),                _mm_unpacklo_epi64(t0, t1));
+   _mm_storeu_si128((__m128i *)(dst + dst_step),     _mm_unpackhi_epi64(t0, t1));
+   _mm_storeu_si128((__m128i *)(dst + 2 * dst_step), _mm_unpacklo_epi64(t2, t3));
+   _mm_storeu_si128((__m128i *)(dst + 3 * dst_step), _mm_unpackhi_epi64(t2, t3));
+}
+
+
+M_TARGET_AVX2 static inline void m_transpose32_8x8_avx2(const uint32_t *src, uint32_t *dst,
+                                                       ptrdiff_t src_step, ptrdiff_t dst_step)
+{
+   __m256i r0, r1, r2, r3, r4, r5, r6, r7;
+   __m256i t0, t1, t2, t3, t4, t5, t6, t7;
+
+   r0 = _mm256_loadu_si256((const __m256i *)(src));
+   r1 = _mm256_loadu_si256((const __m256i *)(src + src_step));
+   r2 = _mm256_loadu_si256((const __m256i *)(src + 2 * src_step));
+   r3 = _mm256_loadu_si256((const __m256i *)(src + 3 * src_step));
+   r4 = _mm256_loadu_si256((const __m256i *)(src + 4 * src_step));
+   r5 = _mm256_loadu_si256((const __m256i *)(src + 5 * src_step));
+   r6 = _mm256_loadu_si256((const __m256i *)(src + 6 * src_step));
+   r7 = _mm256_loadu_si256((const __m256i *)(src + 7 * src_step));
+
+   /* 2x2 blocks of 32-bit values */
+   t0 = _mm256_unpacklo_epi32(r0, r1);
+   t1 = _mm256_unpackhi_epi32(r0, r1);
+   t2 = _mm256_unpacklo_epi32(r2, r3);
+   t3 = _mm256_unpackhi_epi32(r2, r3);
+   t4 = _mm256_unpacklo_epi32(r4, r5);
+   t5 = _mm256_unpackhi_epi32(r4, r5);
+   t6 = _mm256_unpacklo_epi32(r6, r7);
+   t7 = _mm256_unpackhi_epi32(r6, r7);
+
+   /* 4x4 blocks inside each 128-bit lane */
+   r0 = _mm256_unpacklo_epi64(t0, t2);
+   r1 = _mm256_unpackhi_epi64(t0, t2);
+   r2 = _mm256_unpacklo_epi64(t1, t3);
+   r3 = _mm256_unpackhi_epi64(t1, t3);
+   r4 = _mm256_unpacklo_epi64(t4, t6);
+   r5 = _mm256_unpackhi_epi64(t4, t6);
+   r6 = _mm256_unpacklo_epi64(t5, t7);
+   r7 = _mm256_unpackhi_epi64(t5, t7);
+
+   /* Swap the 128-bit lanes */
+   _mm256_storeu_si256((__m256i *)(dst),                _mm256_permute2x128_si256(r0, r4, 0x20));
+   _mm256_storeu_si256((__m256i *)(dst + dst_step),     _mm256_permute2x128_si256(r1, r5, 0x20));
+   _mm256_storeu_si256((__m256i *)(dst + 2 * dst_step), _mm256_permute2x128_si256(r2, r6, 0x20));
+   _mm256_storeu_si256((__m256i *)(dst + 3 * dst_step), _mm256_permute2x128_si256(r3, r7, 0x20));
+   _mm256_storeu_si256((__m256i *)(dst + 4 * dst_step), _mm256_permute2x128_si256(r0, r4, 0x31));
+   _mm256_storeu_si256((__m256i *)(dst + 5 * dst_step), _mm256_permute2x128_si256(r1, r5, 0x31));
+   _mm256_storeu_si256((__m256i *)(dst + 6 * dst_step), _mm256_permute2x128_si256(r2, r6, 0x31));
+   _mm256_storeu_si256((__m256i *)(dst + 7 * dst_step), _mm256_permute2x128_si256(r3, r7, 0x31));
+}
+
+
+M_TARGET_AVX2 static void m_transpose32_blocks_avx2(const uint32_t *src, uint32_t *dst,
+                                                   ptrdiff_t src_step, ptrdiff_t dst_step, int nx, int ny)
+{
+   int i, j;
+   for (j = 0; j < ny; j += 8)
+      for (i = 0; i < nx; i += 8)
+         m_transpose32_8x8_avx2(src + i * src_step + j, dst + j * dst_step + i, src_step, dst_step);
+}
+#endif
+
+
+/* Transpose a tile of nx (source rows) x ny (source columns) 32-bit pixels.
+   The tile is processed by blocks of 8x8 (AVX2) or 4x4 (SSE2) pixels,
+   the edges are copied pixel by pixel */
+static void m_transpose32_tile(const uint32_t *src, uint32_t *dst,
+                               ptrdiff_t src_step, ptrdiff_t dst_step, int nx, int ny, int level)
+{
+   int i, j, block, nxa = 0, nya = 0;
+
+#if defined(M_SIMD_X86)
+   if (level > M_SIMD_SCALAR) {
+      block = (level >= M_SIMD_AVX2) ? 8 : 4;
+      nxa = nx - nx % block;
+      nya = ny - ny % block;
+      if (block == 8) {
+         m_transpose32_blocks_avx2(src, dst, src_step, dst_step, nxa, nya);
+      }
+      else {
+         for (j = 0; j < nya; j += 4)
+            for (i = 0; i < nxa; i += 4)
+               m_transpose32_4x4_sse2(src + i * src_step + j, dst + j * dst_step + i, src_step, dst_step);
+      }
+   }
+#endif
+
+   /* Right edge of the blocks, then bottom rows */
+   for (j = 0; j < nya; j++)
+      for (i = nxa; i < nx; i++)
+         dst[j * dst_step + i] = src[i * src_step + j];
+   for (j = nya; j < ny; j++)
+      for (i = 0; i < nx; i++)
+         dst[j * dst_step + i] = src[i * src_step + j];
+}
@@ -33,10 +33,56 @@ import setuptools
 from Cython.Build import cythonize
 from setuptools import setup, Extension
 
+import os
+import sys
+import platform
 import warnings
 warnings.filterwarnings("ignore", category=DeprecationWarning)
 warnings.filterwarnings("ignore", category=FutureWarning)
 
+
+def compiler_options():
+    """
+    Return the compile and link arguments of the C extensions for this platform
+
+    MSVC   : /openmp, /O2 /Qpar /fp:fast
+    GCC    : -fopenmp, -O3 -march=native (Linux, MinGW)
+    Clang  : -Xpreprocessor -fopenmp -lomp on macOS (libomp must be installed, e.g brew install libomp)
+
+    Environment variables
+    INDEXMAPPING_OPENMP=0 : build without OpenMP (the prange loops run on a single thread)
+    INDEXMAPPING_MARCH    : -march value (default native), use a generic value (e.g x86-64-v2)
+                            to build wheels running on other CPUs or an empty string to omit the flag
+    INDEXMAPPING_STATS=1  : compile the instrumentation in (see mapping.enable_stats), the
+                            counters are compiled out by default
+
+    :return: tuple (extra_compile_args, extra_link_args)
+    """
+    openmp = os.environ.get("INDEXMAPPING_OPENMP", "1") != "0"
+    march = os.environ.get("INDEXMAPPING_MARCH", "native")
+    stats = os.environ.get("INDEXMAPPING_STATS", "0") == "1"
+
+    if sys.platform == "win32" and "GCC" not in platform.python_compiler():
+        compile_args = ["/Qpar", "/fp:fast", "/O2", "/Oy", "/Ot"] + (["/DM_STATS=1"] if stats else [])
+        return compile_args + (["/openmp"] if openmp else []), []
+
+    compile_args = ["-O3", "-Wno-unused-function"] + (["-DM_STATS=1"] if stats else [])
+    # -march=native is not supported by clang on Apple silicon (use -mcpu)
+    if march and platform.machine() not in ("arm64", "aarch64"):
+        compile_args.append("-march=%s" % march)
+    link_args = []
+    if openmp:
+        if sys.platform == "darwin":
+            compile_args += ["-Xpreprocessor", "-fopenmp"]
+            link_args += ["-lomp"]
+        else:
+            compile_args += ["-fopenmp"]
+            link_args += ["-fopenmp"]
+    return compile_args, link_args
+
+
+EXTRA_COMPILE_ARGS, EXTRA_LINK_ARGS = compiler_options()
+
 with open("README.md", "r", encoding="utf-8") as fh:
     long_description = fh.read()
 
@@ -52,9 +98,9 @@ setuptools.setup(
     packages                     =setuptools.find_packages(),
     ext_modules                  =cythonize([
         Extension("IndexMapping.mapping", ["mapping.pyx"],
-                  extra_compile_args=["/Qpar", "/fp:fast", "/O2", "/Oy", "/Ot"], language="c"),
+                  extra_compile_args=EXTRA_COMPILE_ARGS, extra_link_args=EXTRA_LINK_ARGS, language="c"),
         Extension("IndexMapping.mapcfunctions", ["mapcfunctions.pyx"],
-                  extra_compile_args=["/Qpar", "/fp:fast", "/O2", "/Oy", "/Ot"], language="c")]),
+                  extra_compile_args=EXTRA_COMPILE_ARGS, extra_link_args=EXTRA_LINK_ARGS, language="c")]),
     include_dirs=[numpy.get_include()],
     define_macros=[("NPY_NO_DEPRECATED_API", "NPY_1_7_API_VERSION")],
     license                      ='MIT',
@@ -70,6 +116,8 @@ setuptools.setup(
         'Intended Audience :: Developers',
         'Topic :: Software Development :: Build Tools',
         'Operating System :: Microsoft :: Windows',
+        'Operating System :: POSIX :: Linux',
+        'Operating System :: MacOS',
         'Programming Language :: Python',
         'Programming Language :: Cython',
         'Programming Language :: C',
@@ -91,7 +139,7 @@ setuptools.setup(
 
     install_requires=[
         'setuptools>=49.2.1',
-        'Cython>=0.28'
+        'Cython>=0.29.31'
     ],
     python_requires         ='>=3.0',
     platforms               =['any'],
@@ -101,6 +149,7 @@ setuptools.setup(
                   '__init__.py',
                   'pyproject.toml',
                   'setup_mapping.py',
+                  'aio.py',
                   'mapcfunctions.pyx',
                   'mapping.pxd',
                   'mapping.pyx',
@@ -108,6 +157,8 @@ setuptools.setup(
                   'README.md',
                   'requirements.txt',
                   'mapc.c',
+                  'mapsimd.c',
+                  'maphalf.c',
                   'setup.cfg'
 
                   ]),
@@ -116,7 +167,7 @@ setuptools.setup(
                   'test/__init__.py',
                   'test/test_mapping.py',
                   'test/test_split.py',
-                  'test/profiling.py'
+                  'test/benchmark.py'
                  ]),
 
                 ('./lib/site-packages/IndexMapping/Assets',
@@ -4,11 +4,58 @@ from distutils.extension import Extension
 from Cython.Build import cythonize
 from Cython.Distutils import build_ext
 import numpy
+import os
+import sys
+import platform
+
+
+# Same options as setup.py
+def compiler_options():
+    """
+    Return the compile and link arguments of the C extensions for this platform
+
+    MSVC   : /openmp, /O2 /Qpar /fp:fast
+    GCC    : -fopenmp, -O3 -march=native (Linux, MinGW)
+    Clang  : -Xpreprocessor -fopenmp -lomp on macOS (libomp must be installed, e.g brew install libomp)
+
+    Environment variables
+    INDEXMAPPING_OPENMP=0 : build without OpenMP (the prange loops run on a single thread)
+    INDEXMAPPING_MARCH    : -march value (default native), use a generic value (e.g x86-64-v2)
+                            to build wheels running on other CPUs or an empty string to omit the flag
+    INDEXMAPPING_STATS=1  : compile the instrumentation in (see mapping.enable_stats), the
+                            counters are compiled out by default
+
+    :return: tuple (extra_compile_args, extra_link_args)
+    """
+    openmp = os.environ.get("INDEXMAPPING_OPENMP", "1") != "0"
+    march = os.environ.get("INDEXMAPPING_MARCH", "native")
+    stats = os.environ.get("INDEXMAPPING_STATS", "0") == "1"
+
+    if sys.platform == "win32" and "GCC" not in platform.python_compiler():
+        compile_args = ["/Qpar", "/fp:fast", "/O2", "/Oy", "/Ot"] + (["/DM_STATS=1"] if stats else [])
+        return compile_args + (["/openmp"] if openmp else []), []
+
+    compile_args = ["-O3", "-Wno-unused-function"] + (["-DM_STATS=1"] if stats else [])
+    # -march=native is not supported by clang on Apple silicon (use -mcpu)
+    if march and platform.machine() not in ("arm64", "aarch64"):
+        compile_args.append("-march=%s" % march)
+    link_args = []
+    if openmp:
+        if sys.platform == "darwin":
+            compile_args += ["-Xpreprocessor", "-fopenmp"]
+            link_args += ["-lomp"]
+        else:
+            compile_args += ["-fopenmp"]
+            link_args += ["-fopenmp"]
+    return compile_args, link_args
+
+
+EXTRA_COMPILE_ARGS, EXTRA_LINK_ARGS = compiler_options()
 
 setup(
     ext_modules=cythonize(Extension(
-            "*", ['*.pyx'], extra_compile_args=["/Qpar", "/fp:fast", "/O2", "/Oy", "/Ot"], language="c",
-            define_macros=[("NPY_NO_DEPRECATED_API", "NPY_1_7_API_VERSION")]
+            "*", ['*.pyx'], extra_compile_args=EXTRA_COMPILE_ARGS, extra_link_args=EXTRA_LINK_ARGS,
+            language="c", define_macros=[("NPY_NO_DEPRECATED_API", "NPY_1_7_API_VERSION")]
         )
     ),
     include_dirs=[numpy.get_include()],
@@ -16,3 +63,4 @@ setup(
     )
 
 
+
@@ -0,0 +1,565 @@
+"""
+MIT License
+
+Copyright (c) 2019 Yoann Berenguer
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+"""
+"""
+Benchmark suite for IndexMapping.mapping and IndexMapping.mapcfunctions
+
+Sweep image sizes, depths, data types, thread counts and in/out-of-place modes,
+report median / p99 latency, throughput (GB/s, bytes read + written), thread
+speedup and scaling efficiency, write the results in a JSON file and compare them against a
+saved baseline (exit code 1 when a case is slower than the tolerance).
+
+e.g
+python -m IndexMapping.test.benchmark --quick
+python -m IndexMapping.test.benchmark --threads 1,2,4 --json current.json
+python -m IndexMapping.test.benchmark --json new.json --baseline current.json --tolerance 0.10
+
+Each thread count runs in its own process (OMP_NUM_THREADS is read once by OpenMP).
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from timeit import default_timer
+
+# NUMPY IS REQUIRED
+try:
+    import numpy
+except ImportError:
+    raise ImportError("\n<numpy> library is missing on your system."
+          "\nTry: \n   C:\\pip install numpy on a window command prompt.")
+
+# PYGAME IS OPTIONAL (surface cases), its banner would corrupt the JSON output of the workers
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+try:
+    import pygame
+    from pygame.surfarray import array3d, make_surface
+except ImportError:
+    pygame = None
+
+import IndexMapping
+from IndexMapping import mapping, mapcfunctions
+
+SIZES = (256, 512, 1024, 2048, 4096)
+QUICK_SIZES = (256, 1024)
+SCALAR_CALLS = 100000
+
+
+class Case(object):
+    """
+    One benchmark case, a function called on buffers of a given geometry
+
+    :param name  : string; function name (e.g vfb_rgb)
+    :param mode  : string; 'out' (source --> target), 'inplace' or 'scalar' (per call)
+    :param size  : integer; image width and height (0 for the scalar functions)
+    :param depth : integer; values per pixel
+    :param dtype : string; numpy data type of the buffers
+    :param setup : callable returning (function, nbytes), function being called without arguments
+    and nbytes the number of bytes read + written per call
+    """
+
+    def __init__(self, name, mode, size, depth, dtype, setup):
+        self.name = name
+        self.mode = mode
+        self.size = size
+        self.depth = depth
+        self.dtype = dtype
+        self.setup = setup
+
+    def key(self):
+        return "%s|%s|%s|%s|%s" % (self.name, self.mode, self.size, self.depth, self.dtype)
+
+
+def _random(length, dtype):
+    if numpy.dtype(dtype).kind == 'f':
+        return numpy.random.random(length).astype(dtype)
+    return numpy.random.randint(0, 256, length).astype(dtype)
+
+
+def _transpose_case(name, func, size, depth, inplace=False):
+    def setup():
+        source = _random(size * size * depth, numpy.uint8)
+        if inplace:
+            return (lambda: func(source, size, size)), 2 * source.nbytes
+        target = numpy.empty_like(source)
+        return (lambda: func(source, target, size, size)), source.nbytes + target.nbytes
+    return Case(name, 'inplace' if inplace else 'out', size, depth, 'uint8', setup)
+
+
+def _pitch_case(size, depth):
+    # Rows padded to a 64 bytes multiple plus one cache line, transposed in place of the padding
+    def setup():
+        pitch = (size * depth + 63) // 64 * 64 + 64
+        source = _random(size * pitch, numpy.uint8)
+        target = numpy.empty_like(source)
+        return (lambda: mapping.vfb_generic(source, target, size, size, depth, src_pitch=pitch,
+                                            dst_pitch=pitch)), 2 * size * size * depth
+    return Case('vfb_pitch', 'out', size, depth, 'uint8', setup)
+
+
+def _generic_case(size, depth, dtype):
+    def setup():
+        source = _random(size * size * depth, dtype)
+        target = numpy.empty_like(source)
+        return (lambda: mapping.vfb_generic(source, target, size, size, depth)), \
+            source.nbytes + target.nbytes
+    return Case('vfb_generic', 'out', size, depth, dtype, setup)
+
+
+def _index_case(name, size, depth):
+    def setup():
+        n = size * size * depth
+        index = numpy.arange(n, dtype=numpy.uint32)
+        if name == 'to3d_array':
+            out = numpy.empty((n, 3), dtype=numpy.uint32)
+            return (lambda: mapping.to3d_array(index, size, depth, out)), index.nbytes + out.nbytes
+        out = numpy.empty(n, dtype=numpy.uint32)
+        if name == 'to1d_array':
+            xyz_ = mapping.to3d_array(index, size, depth)
+            x, y, z = [numpy.ascontiguousarray(xyz_[:, i]) for i in range(3)]
+            return (lambda: mapping.to1d_array(x, y, z, size, depth, out)), 3 * index.nbytes + out.nbytes
+        return (lambda: mapping.vmap_buffer_array(index, size, size, depth, out)), index.nbytes + out.nbytes
+    return Case(name, 'out', size, depth, 'uint32', setup)
+
+
+def _channels_case(name, size, depth):
+    func = getattr(mapping, name)
+
+    def setup():
+        pixels = _random(size * size * depth, numpy.uint8)
+        planes = [numpy.empty(size * size, numpy.uint8) for _ in range(depth)]
+        if name.startswith('split'):
+            return (lambda: func(pixels, *planes)), 2 * pixels.nbytes
+        return (lambda: func(*planes, pixels)), 2 * pixels.nbytes
+    return Case(name, 'out', size, depth, 'uint8', setup)
+
+
+def _gray_case(size, depth, interleaved):
+    def setup():
+        source = _random(size * size * depth, numpy.uint8)
+        target = numpy.empty(size * size * (depth if interleaved else 1), numpy.uint8)
+        return (lambda: mapping.vfb_gray(source, target, size, size, depth, 'bt601', interleaved)), \
+            source.nbytes + target.nbytes
+    return Case('vfb_gray', 'out', size, depth, 'uint8' if interleaved else 'plane', setup)
+
+
+def _backend_case(name, size, depth, backend):
+    # Same inputs with the prange kernels ('cython') and the OpenMP kernels of mapc.c ('c')
+    def setup():
+        source = _random(size * size * depth, numpy.uint8)
+        if name == 'split':
+            planes = [numpy.empty(size * size, numpy.uint8) for _ in range(depth)]
+            func = mapping.split_rgb if depth == 3 else mapping.split_rgba
+            call, nbytes = (lambda: func(source, *planes)), 2 * source.nbytes
+        elif name == 'gray':
+            target = numpy.empty(size * size, numpy.uint8)
+            call, nbytes = (lambda: mapping.vfb_gray(source, target, size, size, depth, 'bt601')), \
+                source.nbytes + target.nbytes
+        else:
+            target = numpy.empty_like(source)
+            func = {1: mapping.vfb, 3: mapping.vfb_rgb, 4: mapping.vfb_rgba}[depth]
+            call, nbytes = (lambda: func(source, target, size, size)), 2 * source.nbytes
+
+        def run():
+            mapping.set_backend(backend)
+            try:
+                call()
+            finally:
+                mapping.set_backend('cython')
+        return run, nbytes
+    return Case('%s_%s' % (name, backend), 'backend', size, depth, 'uint8', setup)
+
+
+def _stats_case(size, enabled):
+    # vfb_rgb with the instrumentation off / on (same timings unless built with INDEXMAPPING_STATS=1)
+    def setup():
+        source = _random(size * size * 3, numpy.uint8)
+        target = numpy.empty_like(source)
+
+        def run():
+            mapping.enable_stats(enabled)
+            try:
+                mapping.vfb_rgb(source, target, size, size)
+            finally:
+                mapping.enable_stats(False)
+        return run, 2 * source.nbytes
+    return Case('stats_%s' % ('on' if enabled else 'off'), 'stats', size, 3, 'uint8', setup)
+
+
+def _remap_case(size, depth):
+    def setup():
+        source = _random(size * size * depth, numpy.uint8)
+        target = numpy.empty_like(source)
+        plan = mapping.get_plan(size, size, depth)
+        return (lambda: plan.apply(source, target)), source.nbytes + target.nbytes + plan.nbytes
+    return Case('remap_plan', 'out', size, depth, 'uint8', setup)
+
+
+def _transform_case(size, depth, operation):
+    def setup():
+        source = _random(size * size * depth, numpy.uint8)
+        target = numpy.empty_like(source)
+        return (lambda: mapping.transform(source, target, size, size, depth, operation)), \
+            source.nbytes + target.nbytes
+    return Case('transform_' + operation, 'out', size, depth, 'uint8', setup)
+
+
+def _pipeline_case(size, depth):
+    def setup():
+        pipe = mapping.Pipeline(size, size, depth).transpose().crop(0, 0, size // 2, size).rotate(1).hmirror()
+        source = _random(size * size * depth, numpy.uint8)
+        target = numpy.empty(pipe.target_width * pipe.target_height * depth, numpy.uint8)
+        return (lambda: pipe.apply(source, target)), 2 * target.nbytes
+    return Case('pipeline', 'out', size, depth, 'uint8', setup)
+
+
+def _stream_case(size, depth):
+    # In memory buffers, measures the cost of the bands (1MB budget) against vfb_rgba
+    def setup():
+        source = _random(size * size * depth, numpy.uint8)
+        target = numpy.empty_like(source)
+        return (lambda: mapping.vfb_stream(source, target, size, size, depth, budget=1 << 20)), \
+            source.nbytes + target.nbytes
+    return Case('vfb_stream', 'out', size, depth, 'uint8', setup)
+
+
+def _half_case(size, depth, fused):
+    # fused: True, transform_half float16 --> float32. False, vfb_generic + astype (reference)
+    def setup():
+        source = _random(size * size * depth, numpy.float16)
+        target = numpy.empty(source.size, numpy.float32)
+        if fused:
+            return (lambda: mapping.transform_half(source, target, size, size, depth)), \
+                source.nbytes + target.nbytes
+        flipped = numpy.empty_like(source)
+
+        def two_passes():
+            mapping.vfb_generic(source.view(numpy.uint16), flipped.view(numpy.uint16), size, size, depth)
+            target[:] = flipped
+        return two_passes, source.nbytes + target.nbytes
+    return Case('transform_half' if fused else 'half_two_passes', 'out', size, depth, 'float16', setup)
+
+
+def _batch_case(size, depth, batch):
+    # batch: True, one vfb_batch call. False, one vfb_generic call per frame (reference)
+    frames_count = 256
+
+    def setup():
+        frames = _random(frames_count * size * size * depth, numpy.uint8).reshape(frames_count, -1)
+        out = numpy.empty_like(frames)
+        if batch:
+            return (lambda: mapping.vfb_batch(frames, out, size, size, depth)), 2 * frames.nbytes
+
+        def loop():
+            for i in range(frames_count):
+                mapping.vfb_generic(frames[i], out[i], size, size, depth)
+        return loop, 2 * frames.nbytes
+    return Case('vfb_batch' if batch else 'vfb_generic_loop', 'batch', size, depth, 'uint8', setup)
+
+
+def _surface_case(size, zero_copy):
+    # zero_copy: True, transform_view between two surfaces. False, array3d + flatten +
+    # vfb_rgb + make_surface (reference, the copies of the README example)
+    def setup():
+        source = pygame.Surface((size, size), 0, 24)
+        target = pygame.Surface((size, size), 0, 24)
+        if zero_copy:
+            return (lambda: mapping.transform_view(source, target)), 2 * size * size * 3
+
+        def copies():
+            buffer = array3d(source).flatten()
+            out = mapping.vfb_rgb(buffer, numpy.empty_like(buffer), size, size)
+            return make_surface(out.reshape(size, size, 3))
+        return copies, 2 * size * size * 3
+    return Case('transform_view' if zero_copy else 'surface_copies', 'surface', size, 3, 'uint8', setup)
+
+
+def _scalar_case(name, call):
+    return Case(name, 'scalar', 0, 3, 'uint32', lambda: (call, 0))
+
+
+def _mapc_case(name, size):
+    func = getattr(mapcfunctions, name)
+
+    def setup():
+        source = _random(size * size * 3, numpy.uint8)
+        nbytes = (4 if name == 'rgb_inplace' else 2) * source.nbytes
+        return (lambda: func(source, size, size)), nbytes
+    return Case(name, 'inplace', size, 3, 'uint8', setup)
+
+
+def build_cases(sizes):
+    """
+    Return the list of benchmark cases (every public function of mapping and mapcfunctions)
+
+    :param sizes: tuple; image sizes (width = height)
+    :return     : list of Case
+    """
+    cases = [
+        _scalar_case('to1d', lambda: mapping.to1d(5, 6, 3, 800, 3)),
+        _scalar_case('to3d', lambda: mapping.to3d(2800, 800, 3)),
+        _scalar_case('vmap_buffer', lambda: mapping.vmap_buffer(10, 64, 64, 3)),
+        _batch_case(64, 4, True),
+        _batch_case(64, 4, False),
+    ]
+    for size in sizes:
+        cases += [
+            _transpose_case('vfb', mapping.vfb, size, 1),
+            _transpose_case('vfb_rgb', mapping.vfb_rgb, size, 3),
+            _transpose_case('vfb_rgba', mapping.vfb_rgba, size, 4),
+            _transpose_case('vfb_inplace', mapping.vfb_inplace, size, 1, inplace=True),
+            _transpose_case('vfb_rgb_inplace', mapping.vfb_rgb_inplace, size, 3, inplace=True),
+            _transpose_case('vfb_rgba_inplace', mapping.vfb_rgba_inplace, size, 4, inplace=True),
+        ]
+        for dtype in ('uint16', 'float32'):
+            for depth in (1, 4):
+                cases.append(_generic_case(size, depth, dtype))
+        for depth in (3, 4):
+            cases.append(_pitch_case(size, depth))
+        for name in ('to3d_array', 'to1d_array', 'vmap_buffer_array'):
+            cases.append(_index_case(name, size, 3))
+        for name in ('split_rgb', 'merge_rgb'):
+            cases.append(_channels_case(name, size, 3))
+        for name in ('split_rgba', 'merge_rgba'):
+            cases.append(_channels_case(name, size, 4))
+        for depth in (3, 4):
+            cases += [_gray_case(size, depth, False), _gray_case(size, depth, True)]
+            cases.append(_remap_case(size, depth))
+        for operation in ('rot90', 'rot180', 'hmirror', 'vmirror'):
+            cases.append(_transform_case(size, 4, operation))
+        cases.append(_pipeline_case(size, 4))
+        cases.append(_stream_case(size, 4))
+        cases += [_half_case(size, 4, True), _half_case(size, 4, False)]
+        for name, depth in (('flip', 1), ('flip', 3), ('flip', 4), ('split', 3), ('split', 4),
+                            ('gray', 3), ('gray', 4)):
+            cases += [_backend_case(name, size, depth, 'cython'), _backend_case(name, size, depth, 'c')]
+        cases += [_stats_case(size, False), _stats_case(size, True)]
+        if pygame is not None:
+            cases += [_surface_case(size, True), _surface_case(size, False)]
+        for name in ('testing_pure_c', 'test_c_inplace', 'rgb_inplace'):
+            cases.append(_mapc_case(name, size))
+    return cases
+
+
+def measure(func, repeat, min_time=2e-3):
+    """
+    Time a function, return the latency (seconds per call) of every sample
+
+    The number of calls per sample is calibrated so one sample lasts at least min_time
+
+    :param func    : callable without arguments
+    :param repeat  : integer; number of samples
+    :param min_time: float; minimum duration of a sample in seconds
+    :return        : numpy.ndarray of latencies (seconds per call)
+    """
+    number = 1
+    while True:
+        t0 = default_timer()
+        for _ in range(number):
+            func()
+        elapsed = default_timer() - t0
+        if elapsed >= min_time or number >= 1 << 20:
+            break
+        number *= 2
+
+    samples = numpy.empty(repeat, dtype=numpy.float64)
+    for r in range(repeat):
+        t0 = default_timer()
+        for _ in range(number):
+            func()
+        samples[r] = (default_timer() - t0) / number
+    return samples
+
+
+def run_cases(cases, repeat, threads, pattern=None):
+    """
+    Run the benchmark cases in the current process
+
+    :param cases  : list of Case
+    :param repeat : integer; number of samples per case
+    :param threads: integer; thread count of this process (recorded in the results)
+    :param pattern: string; only the cases whose name contains pattern are run (None for all)
+    :return       : list of dict (one per case)
+    """
+    results = []
+    for case in cases:
+        if pattern and pattern not in case.name:
+            continue
+        func, nbytes = case.setup()
+        if case.mode == 'scalar':
+            # Per call latency of the python entry point, no buffer
+            samples = numpy.array(
+                [measure(func, 1, min_time=SCALAR_CALLS * 1e-7)[0] for _ in range(repeat)])
+        else:
+            samples = measure(func, repeat)
+        median = float(numpy.median(samples))
+        results.append({
+            'name': case.name, 'mode': case.mode, 'size': case.size, 'depth': case.depth,
+            'dtype': case.dtype, 'threads': threads, 'key': case.key(),
+            'median_s': median,
+            'p99_s': float(numpy.percentile(samples, 99)),
+            'gbps': nbytes / median / 1e9 if nbytes else None,
+        })
+    return results
+
+
+def add_scaling(results):
+    """
+    Add the speedup t(1 thread) / t(n threads) and the thread scaling efficiency
+    speedup / n to every result
+    """
+    single = {r['key']: r['median_s'] for r in results if r['threads'] == 1}
+    for r in results:
+        t1 = single.get(r['key'])
+        r['speedup'] = t1 / r['median_s'] if t1 else None
+        r['efficiency'] = r['speedup'] / r['threads'] if t1 else None
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """
+    Compare the results against a baseline, return the list of regressions
+
+    A case regresses when its median latency is more than (1 + tolerance) times
+    the baseline median latency (same function, geometry, data type and thread count)
+
+    :param results  : list of dict
+    :param baseline : list of dict (results of a previous run)
+    :param tolerance: float; e.g 0.10 for 10%
+    :return         : list of tuple (result, baseline median, ratio)
+    """
+    reference = {(r['key'], r['threads']): r['median_s'] for r in baseline}
+    regressions = []
+    for r in results:
+        base = reference.get((r['key'], r['threads']))
+        if base is None:
+            continue
+        ratio = r['median_s'] / base
+        r['baseline_ratio'] = ratio
+        if ratio > 1.0 + tolerance:
+            regressions.append((r, base, ratio))
+    return regressions
+
+
+def print_results(results):
+    print("%-18s %-8s %5s %2s %-8s %3s %12s %12s %8s %7s %6s %7s" % (
+        "function", "mode", "size", "d", "dtype", "thr", "median(us)", "p99(us)", "GB/s", "speedup", "eff",
+        "vs base"))
+    for r in results:
+        print("%-18s %-8s %5s %2s %-8s %3s %12.2f %12.2f %8s %7s %6s %7s" % (
+            r['name'], r['mode'], r['size'], r['depth'], r['dtype'], r['threads'],
+            r['median_s'] * 1e6, r['p99_s'] * 1e6,
+            "%.2f" % r['gbps'] if r['gbps'] else "-",
+            "%.2fx" % r['speedup'] if r.get('speedup') else "-",
+            "%.2f" % r['efficiency'] if r.get('efficiency') else "-",
+            "%.2fx" % r['baseline_ratio'] if r.get('baseline_ratio') else "-"))
+
+
+def _worker(args, threads):
+    # Run the cases for one thread count in a child process and return its results
+    env = dict(os.environ, OMP_NUM_THREADS=str(threads))
+    command = [sys.executable, '-m', 'IndexMapping.test.benchmark', '--worker',
+               '--sizes', ','.join(str(s) for s in args.sizes), '--repeat', str(args.repeat)]
+    if args.filter:
+        command += ['--filter', args.filter]
+    output = subprocess.check_output(command, env=env)
+    return json.loads(output.decode('utf-8'))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="IndexMapping benchmark suite")
+    parser.add_argument('--sizes', type=lambda s: tuple(int(v) for v in s.split(',')), default=SIZES,
+                        help="image sizes (width = height), e.g 256,1024")
+    parser.add_argument('--threads', type=lambda s: tuple(int(v) for v in s.split(',')), default=None,
+                        help="thread counts, e.g 1,2,4 (default 1 and the number of CPUs)")
+    parser.add_argument('--repeat', type=int, default=30, help="samples per case")
+    parser.add_argument('--filter', default=None, help="only run the functions containing this string")
+    parser.add_argument('--quick', action='store_true', help="small sweep (256, 1024), 10 samples")
+    parser.add_argument('--json', default=None, help="write the results to this file")
+    parser.add_argument('--baseline', default=None, help="JSON file of a previous run to compare with")
+    parser.add_argument('--tolerance', type=float, default=0.10, help="allowed slowdown against the baseline")
+    parser.add_argument('--worker', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.quick:
+        args.sizes, args.repeat = QUICK_SIZES, 10
+
+    if args.worker:
+        threads = int(os.environ.get('OMP_NUM_THREADS', 0)) or os.cpu_count()
+        results = run_cases(build_cases(args.sizes), args.repeat, threads, args.filter)
+        sys.stdout.write(json.dumps(results))
+        return 0
+
+    info = mapping.build_info()
+    print("IndexMapping %s, %s, OpenMP %s, %s CPUs" % (
+        info['version'], info['compiler'], info['openmp_version'] or "disabled", os.cpu_count()))
+    if not info['openmp']:
+        print("WARNING: compiled without OpenMP, the kernels run on a single thread (see setup.py)")
+
+    if args.threads is None:
+        args.threads = tuple(sorted({1, os.cpu_count() or 1}))
+
+    results = []
+    for threads in args.threads:
+        results += _worker(args, threads)
+    add_scaling(results)
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline, 'r') as f:
+            regressions = compare(results, json.load(f)['results'], args.tolerance)
+
+    print_results(results)
+
+    if args.json:
+        report = {
+            'meta': {
+                'date': time.strftime('%Y-%m-%d %H:%M:%S'),
+                'version': mapping.__version__,
+                'path': IndexMapping.__path__[0],
+                'python': platform.python_version(),
+                'numpy': numpy.__version__,
+                'platform': platform.platform(),
+                'processor': platform.processor(),
+                'cpu_count': os.cpu_count(),
+                'repeat': args.repeat,
+                'build': info,
+            },
+            'results': results,
+        }
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=1)
+
+    for r, base, ratio in regressions:
+        print("REGRESSION %s (%s threads) median %.4fms baseline %.4fms (%.2fx)" % (
+            r['key'], r['threads'], r['median_s'] * 1e3, base * 1e3, ratio))
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
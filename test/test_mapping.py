@@ -31,6 +31,7 @@ except ImportError:
     raise ImportError("\n<numpy> library is missing on your system."
           "\nTry: \n   C:\\pip install numpy on a window command prompt.")
 
+import tempfile
 import timeit
 import unittest
 
@@ -45,12 +46,26 @@ except ImportError:
     raise ImportError("\n<Pygame> library is missing on your system."
           "\nTry: \n   C:\\pip install pygame on a window command prompt.")
 
+import asyncio
 import os
+import subprocess
+import sys
+import threading
 import IndexMapping
-from IndexMapping.mapping import to1d, to3d, vfb_rgb, vfb_rgba, vfb, vmap_buffer
+from IndexMapping import aio, mapcfunctions
+from IndexMapping.mapcfunctions import rgb_inplace, pooled_image, image_pool_info, clear_image_pool, PooledBuffer
+from IndexMapping.mapping import to1d, to3d, vfb_rgb, vfb_rgba, vfb, vmap_buffer, \
+    to1d_array, to3d_array, vmap_buffer_array, set_tile_size, get_tile_size, tune_tile_size, \
+    vfb_rgb_inplace, vfb_rgba_inplace, vfb_inplace, vfb_generic, set_simd_level, get_simd_level, \
+    set_num_threads, get_num_threads, set_schedule, get_schedule, set_serial_threshold, \
+    get_serial_threshold, parallel_settings, build_info, split_rgb, split_rgba, merge_rgb, merge_rgba, \
+    vfb_gray, RemapPlan, get_plan, set_plan_cache_size, clear_plan_cache, plan_cache_info, remap, \
+    transform, Pipeline, vfb_stream, vfb_batch, pixels_view, transform_view, to3d64, to1d64, vmap_buffer64, \
+    half_to_float, float_to_half, half_to_uint8, uint8_to_half, transform_half, set_backend, get_backend, \
+    enable_stats, get_stats, reset_stats
 
 PROJECT_PATH = IndexMapping.__path__
-os.chdir(PROJECT_PATH[0] + "\\test")
+os.chdir(os.path.join(PROJECT_PATH[0], "test"))
 
 class Test_to1d(unittest.TestCase):
 
@@ -73,8 +88,11 @@ class Test_to1d(unittest.TestCase):
         self.assertRaises(OverflowError, to1d, 5, 6, 4294967295 + 1, 4294967295, 65535)
         self.assertRaises(OverflowError, to1d, 5, 4294967295 + 1, 4294967295, 4294967295, 65535)
         self.assertRaises(OverflowError, to1d, 4294967295 + 1, 4294967295, 4294967295, 4294967295, 65535)
-        t = to1d(4294967295, 4294967295, 4294967295, 4294967295, 65535)
-        self.assertLess(t, 4294967295+1)
+        # Index values above 4294967295 raise instead of wrapping (see to1d64)
+        self.assertRaises(OverflowError, to1d, 4294967295, 4294967295, 4294967295, 4294967295, 65535)
+        self.assertRaises(OverflowError, to1d, 1, 70000, 2, 70000, 3)
+        self.assertEqual(to1d(1431655764, 0, 3, 1, 3), 4294967295)
+        self.assertRaises(OverflowError, to1d, 1431655765, 0, 1, 1, 3)
         x, y, z = 4294967295, 4294967295, 4294967295
         depth = 65535
         width = 4294967295
@@ -238,9 +256,9 @@ class Test_vfb_rgb(unittest.TestCase):
         source_buffer = numpy.empty(27, numpy.uint8)
         target_buffer = numpy.empty(27, numpy.uint8)
         for i in range(27):
-            source_buffer[i] = i
+            source_buffer[i] = i % 256
         for i in range(27):
-            target_buffer[i] = i
+            target_buffer[i] = i % 256
 
         flipped_buffer = vfb_rgb(source_buffer, target_buffer, 3, 3)
 
@@ -253,9 +271,9 @@ class Test_vfb_rgb(unittest.TestCase):
         source_buffer = numpy.empty(32 * 32 * 3, numpy.uint8)
         target_buffer = numpy.empty(32 * 32 * 3, numpy.uint8)
         for i in range(32 * 32 * 3):
-            source_buffer[i] = i
+            source_buffer[i] = i % 256
         for i in range(32 * 32 * 3):
-            target_buffer[i] = i
+            target_buffer[i] = i % 256
 
         flipped_buffer = vfb_rgb(source_buffer, target_buffer, 32, 32)
 
@@ -266,8 +284,8 @@ class Test_vfb_rgb(unittest.TestCase):
         self.assertIsInstance(flipped_buffer, numpy.ndarray)
         self.assertTrue(flipped_buffer.dtype, numpy.uint8)
 
-        self.assertRaises(AssertionError, vfb_rgb, source_buffer, target_buffer, -32, 32)
-        self.assertRaises(AssertionError, vfb_rgb, source_buffer, target_buffer, 32, -32)
+        self.assertRaises(ValueError, vfb_rgb, source_buffer, target_buffer, -32, 32)
+        self.assertRaises(ValueError, vfb_rgb, source_buffer, target_buffer, 32, -32)
         self.assertRaises(TypeError, vfb_rgb, [r for r in range(100)], target_buffer, 4294967295, 4294967295)
         self.assertRaises(TypeError, vfb_rgb, source_buffer, [r for r in range(100)], 4294967295, 4294967295)
         self.assertRaises(ValueError, vfb_rgb, numpy.empty((10, 10), numpy.uint8), target_buffer, 4294967295, 4294967295)
@@ -315,9 +333,9 @@ class Test_vmap_buffer(unittest.TestCase):
         source_buffer = numpy.empty(27, numpy.uint8)
         target_buffer = numpy.empty(27, numpy.uint8)
         for i in range(27):
-            source_buffer[i] = i
+            source_buffer[i] = i % 256
         for i in range(27):
-            target_buffer[i] = i
+            target_buffer[i] = i % 256
 
         flipped_buffer = vfb_rgb(source_buffer, target_buffer, 3, 3)
 
@@ -330,15 +348,15 @@ class Test_vmap_buffer(unittest.TestCase):
         source_buffer = numpy.empty(64 * 64 * 3, numpy.uint8)
         target_buffer = numpy.empty(64 * 64 * 3, numpy.uint8)
         for i in range(64 * 64 * 3):
-            source_buffer[i] = i
+            source_buffer[i] = i % 256
         for i in range(64 * 64 * 3):
-            target_buffer[i] = i
+            target_buffer[i] = i % 256
 
         flipped_buffer = vfb_rgb(source_buffer, target_buffer, 64, 64)
 
         src_array_flat = numpy.empty(64 * 64 * 3, numpy.uint8)
         for i in range(64 * 64 * 3):
-            src_array_flat[i] = vmap_buffer(i, 64, 64, 3)
+            src_array_flat[i] = vmap_buffer(i, 64, 64, 3) % 256
 
         self.assertTrue(numpy.array_equal(src_array_flat, flipped_buffer))
 
@@ -404,14 +422,17 @@ class Test_vfb_rgba(unittest.TestCase):
         w, h = background.get_size()
         self.assertEqual(background.get_bitsize(), 32)
         self.assertEqual(background.get_bytesize(), 4)
-        source_buffer = numpy.empty(27, numpy.uint8)
-        target_buffer = numpy.empty(27, numpy.uint8)
+        source_buffer = numpy.empty(36, numpy.uint8)
+        target_buffer = numpy.empty(36, numpy.uint8)
 
         value = vfb_rgba(source_buffer, target_buffer, 3, 3)
         self.assertIsInstance(value, numpy.ndarray)
+        # Buffer length must be width * height * 4 (no read out of bounds)
+        self.assertRaises(ValueError, vfb_rgba, source_buffer[:27], target_buffer[:27], 3, 3)
+        self.assertRaises(ValueError, vfb_rgba, source_buffer, target_buffer[:27], 3, 3)
 
-        self.assertRaises(AssertionError, vfb_rgba, source_buffer, target_buffer, -32, 32)
-        self.assertRaises(AssertionError, vfb_rgba, source_buffer, target_buffer, 32, -32)
+        self.assertRaises(ValueError, vfb_rgba, source_buffer, target_buffer, -32, 32)
+        self.assertRaises(ValueError, vfb_rgba, source_buffer, target_buffer, 32, -32)
         self.assertRaises(TypeError, vfb_rgba, [r for r in range(100)], target_buffer, 4294967295, 4294967295)
         self.assertRaises(TypeError, vfb_rgba, source_buffer, [r for r in range(100)], 4294967295, 4294967295)
         self.assertRaises(ValueError, vfb_rgba, numpy.empty((10, 10), numpy.uint8), target_buffer, 4294967295,
@@ -487,6 +508,1131 @@ class Test_display_vfb_rgba(unittest.TestCase):
                 break
 
 
+class Test_to3d_array(unittest.TestCase):
+
+    def runTest(self) -> None:
+        w, h, depth = 64, 48, 3
+        index = numpy.arange(w * h * depth, dtype=numpy.uint32)
+
+        xyz_ = to3d_array(index, w, depth)
+        self.assertIsInstance(xyz_, numpy.ndarray)
+        self.assertEqual(xyz_.shape, (w * h * depth, 3))
+        for r in range(0, w * h * depth, 7):
+            self.assertEqual(tuple(xyz_[r]), to3d(r, w, depth))
+
+        # Caller supplied buffer
+        out = numpy.empty((w * h * depth, 3), dtype=numpy.uint32)
+        to3d_array(index, w, depth, out)
+        self.assertTrue(numpy.array_equal(out, xyz_))
+
+        self.assertRaises(ValueError, to3d_array, index, 0, depth)
+        self.assertRaises(ValueError, to3d_array, index, w, 0)
+        self.assertRaises(ValueError, to3d_array, index, w, depth, numpy.empty((10, 3), numpy.uint32))
+        self.assertRaises(ValueError, to3d_array, index.astype(numpy.int64), w, depth)
+
+
+class Test_to1d_array(unittest.TestCase):
+
+    def runTest(self) -> None:
+        w, h, depth = 64, 48, 3
+        index = numpy.arange(w * h * depth, dtype=numpy.uint32)
+        xyz_ = to3d_array(index, w, depth)
+        x = numpy.ascontiguousarray(xyz_[:, 0])
+        y = numpy.ascontiguousarray(xyz_[:, 1])
+        z = numpy.ascontiguousarray(xyz_[:, 2])
+
+        index_ = to1d_array(x, y, z, w, depth)
+        self.assertIsInstance(index_, numpy.ndarray)
+        self.assertTrue(numpy.array_equal(index_, index))
+        self.assertEqual(index_[100], to1d(x[100], y[100], z[100], w, depth))
+
+        # Strided views and caller supplied buffer
+        out = numpy.empty(w * h * depth, dtype=numpy.uint32)
+        to1d_array(xyz_[:, 0], xyz_[:, 1], xyz_[:, 2], w, depth, out)
+        self.assertTrue(numpy.array_equal(out, index))
+
+        self.assertRaises(ValueError, to1d_array, x[:10], y, z, w, depth)
+        self.assertRaises(ValueError, to1d_array, x, y, z, w, depth, out[:10])
+
+
+class Test_vmap_buffer_array(unittest.TestCase):
+
+    def runTest(self) -> None:
+        w, h, depth = 64, 32, 3
+        source_buffer = numpy.arange(w * h * depth, dtype=numpy.uint32).astype(numpy.uint8)
+        target_buffer = numpy.empty(w * h * depth, numpy.uint8)
+        flipped_buffer = vfb_rgb(source_buffer, target_buffer, w, h)
+
+        index = vmap_buffer_array(numpy.arange(w * h * depth, dtype=numpy.uint32), w, h, depth)
+        self.assertIsInstance(index, numpy.ndarray)
+        for r in range(0, w * h * depth, 5):
+            self.assertEqual(index[r], vmap_buffer(r, w, h, depth))
+        self.assertTrue(numpy.array_equal(source_buffer[index], flipped_buffer))
+
+        out = numpy.empty(w * h * depth, dtype=numpy.uint32)
+        vmap_buffer_array(numpy.arange(w * h * depth, dtype=numpy.uint32), w, h, depth, out)
+        self.assertTrue(numpy.array_equal(out, index))
+
+        self.assertRaises(ValueError, vmap_buffer_array, out, 0, h, depth)
+        self.assertRaises(ValueError, vmap_buffer_array, out, w, h, 0)
+        self.assertRaises(ValueError, vmap_buffer_array, out, w, h, depth, out[:10])
+
+
+class Test_tile_size(unittest.TestCase):
+
+    def runTest(self) -> None:
+        # Auto mode, tile size depends on the depth
+        set_tile_size(0)
+        self.assertIsInstance(get_tile_size(3), int)
+        self.assertGreaterEqual(get_tile_size(1), get_tile_size(4))
+
+        # Every tile size must produce the same output, including partial tiles
+        w, h = 67, 45
+        for tile in (1, 3, 8, 16, 32, 64, 128, 0):
+            set_tile_size(tile)
+            if tile > 0:
+                self.assertEqual(get_tile_size(3), tile)
+            for depth, func in ((3, vfb_rgb), (4, vfb_rgba), (1, vfb)):
+                source_buffer = numpy.random.randint(0, 256, w * h * depth).astype(numpy.uint8)
+                target_buffer = numpy.empty(w * h * depth, numpy.uint8)
+                flipped_buffer = numpy.asarray(func(source_buffer, target_buffer, w, h))
+                src_array_flat = source_buffer.reshape(w, h, depth).transpose(1, 0, 2).flatten()
+                self.assertTrue(numpy.array_equal(src_array_flat, flipped_buffer))
+
+        tile = tune_tile_size(128, 128, 4, (8, 16), 1)
+        self.assertIn(tile, (8, 16))
+        self.assertEqual(get_tile_size(4), tile)
+        set_tile_size(0)
+
+        self.assertRaises(AssertionError, set_tile_size, -1)
+        self.assertRaises(AssertionError, get_tile_size, 0)
+        self.assertRaises(AssertionError, tune_tile_size, 128, 128, 4, (0, 16))
+
+
+class Test_vfb_inplace(unittest.TestCase):
+
+    def runTest(self) -> None:
+        # Square (blockwise swaps) and non-square (cycle-following) buffers
+        for w, h in ((3, 3), (67, 67), (128, 128), (3, 2), (100, 37), (37, 100), (1, 7), (7, 1), (1, 1)):
+            for depth, func, func_inplace in ((3, vfb_rgb, vfb_rgb_inplace),
+                                              (4, vfb_rgba, vfb_rgba_inplace),
+                                              (1, vfb, vfb_inplace)):
+                source_buffer = numpy.random.randint(0, 256, w * h * depth).astype(numpy.uint8)
+                target_buffer = numpy.empty(w * h * depth, numpy.uint8)
+                flipped_buffer = numpy.asarray(func(source_buffer, target_buffer, w, h))
+
+                flipped_inplace = numpy.asarray(func_inplace(source_buffer, w, h))
+                self.assertTrue(numpy.array_equal(flipped_inplace, flipped_buffer))
+                # The source buffer itself is modified
+                self.assertTrue(numpy.array_equal(source_buffer, flipped_buffer))
+
+        source_buffer = numpy.empty(32 * 32 * 3, numpy.uint8)
+        self.assertIsInstance(vfb_rgb_inplace(source_buffer, 32, 32), numpy.ndarray)
+        self.assertRaises(ValueError, vfb_rgb_inplace, source_buffer, -32, 32)
+        self.assertRaises(ValueError, vfb_rgb_inplace, source_buffer, 32, -32)
+        self.assertRaises(ValueError, vfb_rgb_inplace, source_buffer, 32, 16)
+        self.assertRaises(ValueError, vfb_rgba_inplace, source_buffer, 32, 32)
+        self.assertRaises(ValueError, vfb_inplace, source_buffer, 32, 32)
+        self.assertRaises(ValueError, vfb_rgb_inplace, source_buffer[::2], 16, 32)
+
+
+class Test_vfb_generic(unittest.TestCase):
+
+    def runTest(self) -> None:
+        w, h = 67, 45
+        for dtype in (numpy.uint8, numpy.uint16, numpy.uint32, numpy.float32, numpy.float64):
+            for depth in (1, 2, 3, 4, 5):
+                source_buffer = (numpy.random.random(w * h * depth) * 255).astype(dtype)
+                target_buffer = numpy.empty(w * h * depth, dtype)
+                flipped_buffer = vfb_generic(source_buffer, target_buffer, w, h, depth)
+                self.assertIsInstance(flipped_buffer, numpy.ndarray)
+                self.assertEqual(flipped_buffer.dtype, dtype)
+                src_array_flat = source_buffer.reshape(w, h, depth).transpose(1, 0, 2).flatten()
+                self.assertTrue(numpy.array_equal(src_array_flat, flipped_buffer))
+
+        # Same output than the RGB / RGBA / alpha versions
+        for depth, func in ((3, vfb_rgb), (4, vfb_rgba), (1, vfb)):
+            source_buffer = numpy.random.randint(0, 256, w * h * depth).astype(numpy.uint8)
+            self.assertTrue(numpy.array_equal(
+                vfb_generic(source_buffer, numpy.empty(w * h * depth, numpy.uint8), w, h, depth),
+                numpy.asarray(func(source_buffer, numpy.empty(w * h * depth, numpy.uint8), w, h))))
+
+        # float16 through its uint16 view
+        source_buffer = numpy.random.random(w * h * 4).astype(numpy.float16)
+        target_buffer = numpy.empty(w * h * 4, numpy.float16)
+        vfb_generic(source_buffer.view(numpy.uint16), target_buffer.view(numpy.uint16), w, h, 4)
+        self.assertTrue(numpy.array_equal(
+            source_buffer.reshape(w, h, 4).transpose(1, 0, 2).flatten(), target_buffer))
+
+        source_buffer = numpy.zeros(w * h * 2, numpy.float32)
+        target_buffer = numpy.zeros(w * h * 2, numpy.float32)
+        self.assertRaises(ValueError, vfb_generic, source_buffer, target_buffer, -w, h, 2)
+        self.assertRaises(ValueError, vfb_generic, source_buffer, target_buffer, w, h, 0)
+        self.assertRaises(ValueError, vfb_generic, source_buffer, target_buffer, w, h, 3)
+        self.assertRaises(ValueError, vfb_generic, source_buffer, target_buffer[:10], w, h, 2)
+        self.assertRaises(ValueError, vfb_generic, source_buffer, target_buffer.astype(numpy.float64), w, h, 2)
+        self.assertRaises(TypeError, vfb_generic, source_buffer.astype(numpy.int8),
+                          target_buffer.astype(numpy.int8), w, h, 2)
+
+
+class Test_simd_level(unittest.TestCase):
+
+    def runTest(self) -> None:
+        default = set_simd_level()
+        self.assertIn(default, (0, 1))
+        self.assertEqual(get_simd_level(), default)
+
+        # Every instruction set must produce the same output (edges included)
+        for level in (0, 1, 2):
+            self.assertLessEqual(set_simd_level(level), level)
+            for w, h in ((8, 8), (9, 17), (67, 45), (256, 130)):
+                source_buffer = numpy.random.randint(0, 256, w * h * 4).astype(numpy.uint8)
+                target_buffer = numpy.empty(w * h * 4, numpy.uint8)
+                flipped_buffer = vfb_rgba(source_buffer, target_buffer, w, h)
+                src_array_flat = source_buffer.reshape(w, h, 4).transpose(1, 0, 2).flatten()
+                self.assertTrue(numpy.array_equal(src_array_flat, flipped_buffer))
+
+                source_buffer = numpy.random.random(w * h).astype(numpy.float32)
+                target_buffer = numpy.empty(w * h, numpy.float32)
+                flipped_buffer = vfb_generic(source_buffer, target_buffer, w, h, 1)
+                self.assertTrue(numpy.array_equal(source_buffer.reshape(w, h).T.flatten(), flipped_buffer))
+
+        set_simd_level()
+        self.assertRaises(AssertionError, set_simd_level, -2)
+
+
+class Test_parallel(unittest.TestCase):
+
+    def runTest(self) -> None:
+        self.assertGreaterEqual(get_num_threads(), 1)
+        self.assertEqual(get_schedule(), ('static', 0))
+
+        set_num_threads(2)
+        self.assertEqual(get_num_threads(), 2)
+        set_num_threads()
+        set_schedule('guided', 4)
+        self.assertEqual(get_schedule(), ('guided', 4))
+        set_schedule()
+
+        # Settings restored when leaving the block
+        with parallel_settings(num_threads=3, schedule='dynamic', chunksize=2):
+            self.assertEqual(get_num_threads(), 3)
+            self.assertEqual(get_schedule(), ('dynamic', 2))
+        self.assertEqual(get_schedule(), ('static', 0))
+
+        # Small buffers (serial) and large buffers (OpenMP team) must give the same output
+        for threshold in (0, 1 << 30):
+            set_serial_threshold(threshold)
+            self.assertEqual(get_serial_threshold(), threshold)
+            for schedule in ('static', 'dynamic', 'guided'):
+                w, h = 173, 91
+                source_buffer = numpy.random.randint(0, 256, w * h * 3).astype(numpy.uint8)
+                target_buffer = numpy.empty(w * h * 3, numpy.uint8)
+                flipped_buffer = vfb_rgb(source_buffer, target_buffer, w, h,
+                                         num_threads=4, schedule=schedule, chunksize=3)
+                src_array_flat = source_buffer.reshape(w, h, 3).transpose(1, 0, 2).flatten()
+                self.assertTrue(numpy.array_equal(src_array_flat, flipped_buffer))
+
+                # strided buffers
+                source_buffer = numpy.random.randint(0, 256, w * h * 8).astype(numpy.uint8)
+                target_buffer = numpy.empty(w * h * 4, numpy.uint8)
+                flipped_buffer = vfb_rgba(source_buffer[::2], target_buffer, w, h,
+                                          num_threads=4, schedule=schedule)
+                src_array_flat = source_buffer[::2].reshape(w, h, 4).transpose(1, 0, 2).flatten()
+                self.assertTrue(numpy.array_equal(src_array_flat, flipped_buffer))
+
+                source_buffer = numpy.random.random(w * h).astype(numpy.float32)
+                target_buffer = numpy.empty(w * h, numpy.float32)
+                flipped_buffer = vfb_generic(source_buffer, target_buffer, w, h, 1, num_threads=2,
+                                             schedule=schedule)
+                self.assertTrue(numpy.array_equal(source_buffer.reshape(w, h).T.flatten(), flipped_buffer))
+        set_serial_threshold()
+
+        source_buffer = numpy.zeros(16, numpy.uint8)
+        target_buffer = numpy.empty(16, numpy.uint8)
+        self.assertRaises(AssertionError, vfb, source_buffer, target_buffer, 4, 4, -1)
+        self.assertRaises(AssertionError, vfb, source_buffer, target_buffer, 4, 4, 0, 'auto')
+        self.assertRaises(AssertionError, set_num_threads, -1)
+        self.assertRaises(AssertionError, set_schedule, 'runtime')
+        self.assertRaises(AssertionError, set_serial_threshold, -1)
+
+
+class Test_build_info(unittest.TestCase):
+
+    def runTest(self) -> None:
+        info = build_info()
+        self.assertEqual(IndexMapping.build_info(), info)
+        self.assertEqual(info['openmp'], info['openmp_version'] > 0)
+        self.assertEqual(info['max_threads'], get_num_threads())
+        self.assertEqual(info['simd_level'], get_simd_level())
+        self.assertIn(info['simd_cpu'], (0, 1, 2))
+        self.assertEqual(info['version'], IndexMapping.mapping.__version__)
+        self.assertIsInstance(info['compiler'], str)
+        if not info['openmp']:
+            self.assertEqual(info['max_threads'], 1)
+
+
+class Test_split_merge(unittest.TestCase):
+
+    def runTest(self) -> None:
+        for n in (1, 17, 640 * 480):
+            for depth, split, merge in ((3, split_rgb, merge_rgb), (4, split_rgba, merge_rgba)):
+                source_buffer = numpy.random.randint(0, 256, n * depth).astype(numpy.uint8)
+                planes = [numpy.empty(n, numpy.uint8) for _ in range(depth)]
+                result = split(source_buffer, *planes)
+                for c in range(depth):
+                    self.assertTrue(numpy.shares_memory(result[c], planes[c]))
+                    self.assertTrue(numpy.array_equal(planes[c], source_buffer[c::depth]))
+
+                target_buffer = numpy.zeros(n * depth, numpy.uint8)
+                merged = merge(*planes, target_buffer, num_threads=2)
+                self.assertTrue(numpy.array_equal(merged, source_buffer))
+                self.assertTrue(numpy.shares_memory(merged, target_buffer))
+
+                # strided buffers
+                strided = numpy.random.randint(0, 256, n * depth * 2).astype(numpy.uint8)
+                split(strided[::2], *planes)
+                for c in range(depth):
+                    self.assertTrue(numpy.array_equal(planes[c], strided[::2][c::depth]))
+                target_buffer = numpy.zeros(n * depth * 2, numpy.uint8)
+                merge(*planes, target_buffer[::2])
+                self.assertTrue(numpy.array_equal(target_buffer[::2], strided[::2]))
+                self.assertFalse(target_buffer[1::2].any())
+
+        planes = [numpy.empty(10, numpy.uint8) for _ in range(3)]
+        self.assertRaises(ValueError, split_rgb, numpy.zeros(31, numpy.uint8), *planes)
+        self.assertRaises(ValueError, split_rgb, numpy.zeros(30, numpy.uint8),
+                          planes[0], planes[1], planes[2][:9])
+        self.assertRaises(ValueError, merge_rgb, *planes, numpy.zeros(40, numpy.uint8))
+
+
+class Test_vfb_gray(unittest.TestCase):
+
+    def runTest(self) -> None:
+        weights = {'average': (1 / 3.0, 1 / 3.0, 1 / 3.0),
+                   'bt601': (0.299, 0.587, 0.114),
+                   'bt709': (0.2126, 0.7152, 0.0722)}
+        for w, h in ((1, 1), (9, 17), (173, 91), (256, 256)):
+            for depth in (3, 4):
+                source_buffer = numpy.random.randint(0, 256, w * h * depth).astype(numpy.uint8)
+                transposed = source_buffer.reshape(w, h, depth).transpose(1, 0, 2).reshape(-1, depth)
+                for name, (r, g, b) in weights.items():
+                    expected = transposed[:, 0] * r + transposed[:, 1] * g + transposed[:, 2] * b
+                    plane = vfb_gray(source_buffer, numpy.empty(w * h, numpy.uint8), w, h, depth, name)
+                    # fixed point rounding, at most one level away from the float result
+                    self.assertLessEqual(numpy.abs(plane - expected).max(), 1.0)
+
+                    target_buffer = numpy.empty(w * h * depth, numpy.uint8)
+                    gray = vfb_gray(source_buffer, target_buffer, w, h, depth, name, interleaved=True,
+                                    num_threads=2).reshape(-1, depth)
+                    for c in range(3):
+                        self.assertTrue(numpy.array_equal(gray[:, c], plane))
+                    if depth == 4:
+                        self.assertTrue(numpy.array_equal(gray[:, 3], transposed[:, 3]))
+
+        white = numpy.full(16 * 3, 255, numpy.uint8)
+        for name in weights:
+            self.assertTrue((vfb_gray(white, numpy.empty(16, numpy.uint8), 4, 4, 3, name) == 255).all())
+
+        source_buffer = numpy.zeros(48, numpy.uint8)
+        self.assertRaises(ValueError, vfb_gray, source_buffer, numpy.empty(16, numpy.uint8), 4, 4, 2)
+        self.assertRaises(ValueError, vfb_gray, source_buffer, numpy.empty(16, numpy.uint8), 4, 4, 3, 'bt2020')
+        self.assertRaises(ValueError, vfb_gray, source_buffer, numpy.empty(48, numpy.uint8), 4, 4, 3)
+
+
+class Test_remap_plan(unittest.TestCase):
+
+    def runTest(self) -> None:
+        clear_plan_cache()
+        for w, h in ((1, 1), (9, 17), (173, 91)):
+            for depth in (1, 3, 4, 12):
+                source_buffer = numpy.random.randint(0, 256, w * h * depth).astype(numpy.uint8)
+                target_buffer = numpy.empty(w * h * depth, numpy.uint8)
+                expected = source_buffer.reshape(w, h, depth).transpose(1, 0, 2).flatten()
+                self.assertTrue(numpy.array_equal(
+                    remap(source_buffer, target_buffer, w, h, depth, num_threads=2), expected))
+                plan = get_plan(w, h, depth)
+                self.assertEqual((plan.target_width, plan.target_height), (h, w))
+                self.assertTrue(numpy.array_equal(plan.apply(source_buffer, target_buffer), expected))
+
+        info = plan_cache_info()
+        self.assertEqual(info['plans'], 12)
+        self.assertEqual(info['hits'], 12)
+        self.assertEqual(info['misses'], 12)
+
+        # Least recently used plans are dropped first
+        clear_plan_cache()
+        set_plan_cache_size(2 * 64 * 64 * 4)
+        a, b = get_plan(64, 64, 4), get_plan(64, 64, 3)
+        self.assertIs(get_plan(64, 64, 4), a)
+        get_plan(64, 64, 1)
+        info = plan_cache_info()
+        self.assertEqual((info['plans'], info['nbytes']), (2, 2 * 64 * 64 * 4))
+        self.assertIs(get_plan(64, 64, 4), a)
+        self.assertIsNot(get_plan(64, 64, 3), b)
+
+        # Plans larger than the budget are not cached
+        set_plan_cache_size(0)
+        get_plan(8, 8, 3)
+        self.assertEqual(plan_cache_info()['plans'], 0)
+        set_plan_cache_size()
+
+        self.assertRaises(ValueError, RemapPlan, 4, 4, 3, 'unknown')
+        self.assertRaises(ValueError, remap, numpy.zeros(47, numpy.uint8), numpy.zeros(48, numpy.uint8), 4, 4, 3)
+        self.assertRaises(AssertionError, set_plan_cache_size, -1)
+
+        # User lookup tables are checked against the source size
+        index = numpy.array([[3, 1], [2, 0]])
+        source_buffer = numpy.arange(12, dtype=numpy.uint8)
+        self.assertTrue(numpy.array_equal(
+            RemapPlan(2, 2, 3, index=index).apply(source_buffer, numpy.empty(12, numpy.uint8)),
+            source_buffer.reshape(4, 3)[index.flatten()].flatten()))
+        for bad in ([[0, 1], [2, 4]], [[0, -1], [2, 3]], [[0, 1], [2, 3000000000]], [[0, 1], [2, 2 ** 32]]):
+            self.assertRaises(ValueError, RemapPlan, 2, 2, 3, index=numpy.array(bad))
+        self.assertRaises(ValueError, RemapPlan, 2, 2, 3, index=numpy.array([[0, 1], [2, 3000000000]], numpy.uint32))
+
+
+class Test_transform(unittest.TestCase):
+
+    def runTest(self) -> None:
+        operations = {
+            'identity': lambda a: a,
+            'transpose': lambda a: a.transpose(1, 0, 2),
+            'antitranspose': lambda a: a[::-1, ::-1].transpose(1, 0, 2),
+            'rot90': lambda a: numpy.rot90(a, 1),
+            'rot180': lambda a: numpy.rot90(a, 2),
+            'rot270': lambda a: numpy.rot90(a, 3),
+            'hmirror': lambda a: a[::-1],
+            'vmirror': lambda a: a[:, ::-1]}
+        # Plan operations registered without leaking a module variable
+        self.assertFalse(hasattr(IndexMapping.mapping, '_name'))
+        for w, h in ((1, 1), (9, 17), (173, 91)):
+            for depth in (1, 3, 4, 12):
+                source_buffer = numpy.random.randint(0, 256, w * h * depth).astype(numpy.uint8)
+                array = source_buffer.reshape(w, h, depth)
+                for name, func in operations.items():
+                    target_buffer = numpy.empty(w * h * depth, numpy.uint8)
+                    expected = func(array).flatten()
+                    self.assertTrue(numpy.array_equal(
+                        transform(source_buffer, target_buffer, w, h, depth, name, num_threads=2), expected))
+                    self.assertTrue(numpy.array_equal(
+                        get_plan(w, h, depth, name).apply(source_buffer, target_buffer), expected))
+
+                    # fused crop
+                    x, y, cw, ch = w // 3, h // 4, w - w // 2, h - h // 3
+                    expected = func(array[x:x + cw, y:y + ch]).flatten()
+                    target_buffer = numpy.empty(cw * ch * depth, numpy.uint8)
+                    self.assertTrue(numpy.array_equal(
+                        transform(source_buffer, target_buffer, w, h, depth, name, (x, y, cw, ch)), expected))
+
+        source_buffer = numpy.zeros(48, numpy.uint8)
+        target_buffer = numpy.zeros(48, numpy.uint8)
+        self.assertRaises(ValueError, transform, source_buffer, target_buffer, 4, 4, 3, 'rot45')
+        self.assertRaises(ValueError, transform, source_buffer, target_buffer, 4, 4, 3, 'rot90', (1, 1, 4, 4))
+        self.assertRaises(ValueError, transform, source_buffer, target_buffer, 4, 4, 3, 'rot90', (0, 0, 2, 2))
+        self.assertRaises(ValueError, transform, source_buffer, target_buffer, 4, 4, 3, 'rot90', (0, 0, 0, 2))
+
+
+class Test_pipeline(unittest.TestCase):
+
+    def runTest(self) -> None:
+        w, h = 173, 91
+        for depth in (1, 3, 4):
+            source_buffer = numpy.random.randint(0, 256, w * h * depth).astype(numpy.uint8)
+            array = source_buffer.reshape(w, h, depth)
+
+            pipe = Pipeline(w, h, depth)
+            self.assertTrue(numpy.array_equal(
+                pipe.apply(source_buffer, numpy.empty_like(source_buffer)), source_buffer))
+            self.assertTrue(numpy.array_equal(
+                pipe.transpose().apply(source_buffer, numpy.empty_like(source_buffer)),
+                vfb_generic(source_buffer, numpy.empty_like(source_buffer), w, h, depth)))
+
+            # flip --> crop --> mirror --> rotate, single pass
+            base = pipe.transpose().crop(5, 7, 60, 40)
+            for k in range(-1, 5):
+                chained = base.hmirror().rotate(k).vmirror()
+                expected = numpy.rot90(array.transpose(1, 0, 2)[5:65, 7:47][::-1], k)[:, ::-1]
+                self.assertEqual((chained.target_width, chained.target_height), expected.shape[:2])
+                target_buffer = numpy.empty(expected.size, numpy.uint8)
+                self.assertTrue(numpy.array_equal(
+                    chained.apply(source_buffer, target_buffer, num_threads=2), expected.flatten()))
+                self.assertTrue(numpy.array_equal(
+                    chained.plan().apply(source_buffer, target_buffer), expected.flatten()))
+
+            # the steps cancel out
+            identity = pipe.rotate(1).rotate(1).hmirror().vmirror().transpose().transpose()
+            self.assertTrue(numpy.array_equal(
+                identity.apply(source_buffer, numpy.empty_like(source_buffer)), source_buffer))
+            self.assertEqual(len(identity.steps), 6)
+
+        self.assertRaises(ValueError, Pipeline(4, 4, 3).crop, 2, 2, 4, 4)
+        self.assertRaises(ValueError, Pipeline(4, 4, 3).then, 'rot45')
+        self.assertRaises(ValueError, Pipeline(4, 4, 3).crop(0, 0, 2, 2).apply,
+                          numpy.zeros(48, numpy.uint8), numpy.zeros(48, numpy.uint8))
+
+
+class Test_vfb_stream(unittest.TestCase):
+
+    def runTest(self) -> None:
+        w, h = 173, 91
+        with tempfile.TemporaryDirectory() as directory:
+            for depth, dtype in ((3, numpy.uint8), (4, numpy.uint8), (2, numpy.float32)):
+                n = w * h * depth
+                source_buffer = numpy.memmap(os.path.join(directory, 'source.raw'), dtype=dtype,
+                                             mode='w+', shape=(n,))
+                source_buffer[:] = numpy.random.randint(0, 256, n).astype(dtype)
+                source_buffer.flush()
+                source_buffer = numpy.memmap(os.path.join(directory, 'source.raw'), dtype=dtype,
+                                             mode='r', shape=(n,))
+                expected = numpy.asarray(source_buffer).reshape(w, h, depth).transpose(1, 0, 2).flatten()
+
+                target_buffer = numpy.memmap(os.path.join(directory, 'target.raw'), dtype=dtype,
+                                             mode='w+', shape=(n,))
+                self.assertEqual(vfb_stream(source_buffer, target_buffer, w, h, depth), h)
+                self.assertTrue(numpy.array_equal(target_buffer, expected))
+
+                # small budget, interrupted after the second band then resumed
+                target_buffer[:] = 0
+                progress = []
+
+                def stop(done, total):
+                    progress.append(done)
+                    return len(progress) < 2
+
+                budget = 10 * w * depth * source_buffer.itemsize
+                row = vfb_stream(source_buffer, target_buffer, w, h, depth, budget=budget, callback=stop)
+                self.assertEqual(row, 20)
+                self.assertEqual(progress, [10, 20])
+                self.assertFalse(target_buffer[row * w * depth:].any())
+                self.assertEqual(vfb_stream(source_buffer, target_buffer, w, h, depth, budget=budget,
+                                            start=row, num_threads=2), h)
+                self.assertTrue(numpy.array_equal(target_buffer, expected))
+                del source_buffer, target_buffer
+
+        source_buffer = numpy.zeros(48, numpy.uint8)
+        self.assertRaises(ValueError, vfb_stream, source_buffer, numpy.zeros(47, numpy.uint8), 4, 4, 3)
+        self.assertRaises(ValueError, vfb_stream, source_buffer, numpy.zeros(48, numpy.uint16), 4, 4, 3)
+        self.assertRaises(ValueError, vfb_stream, source_buffer, numpy.zeros(48, numpy.uint8), 4, 4, 3, 0)
+
+
+class Test_vfb_batch(unittest.TestCase):
+
+    def runTest(self) -> None:
+        for n, w, h in ((1, 1, 1), (7, 64, 64), (33, 9, 17), (2, 173, 91)):
+            for depth, dtype in ((1, numpy.uint8), (3, numpy.uint8), (4, numpy.uint8), (2, numpy.float32)):
+                frames = numpy.random.randint(0, 256, (n, w, h, depth)).astype(dtype)
+                expected = frames.transpose(0, 2, 1, 3)
+
+                out = vfb_batch(frames, num_threads=2)
+                self.assertEqual(out.shape, (n, h, w, depth))
+                self.assertTrue(numpy.array_equal(out, expected))
+
+                flat = frames.reshape(n, -1)
+                out = numpy.empty_like(flat)
+                self.assertIs(vfb_batch(flat, out, w, h, depth), out)
+                self.assertTrue(numpy.array_equal(out, expected.reshape(n, -1)))
+                if depth == 3:
+                    self.assertTrue(numpy.array_equal(
+                        out[-1], vfb_rgb(flat[-1], numpy.empty_like(flat[-1]), w, h)))
+
+        self.assertEqual(vfb_batch(numpy.zeros((0, 4, 4, 3), numpy.uint8)).shape, (0, 4, 4, 3))
+        frames = numpy.zeros((2, 48), numpy.uint8)
+        self.assertRaises(ValueError, vfb_batch, frames)
+        self.assertRaises(ValueError, vfb_batch, frames, None, 4, 4, 2)
+        self.assertRaises(ValueError, vfb_batch, frames, numpy.zeros((2, 48), numpy.uint16), 4, 4, 3)
+        self.assertRaises(ValueError, vfb_batch, numpy.zeros((2, 4, 4, 3), numpy.uint8)[:, ::2])
+
+
+class Test_transform_view(unittest.TestCase):
+
+    def runTest(self) -> None:
+        w, h = 37, 23
+        for bitsize, flags in ((8, 0), (24, 0), (32, 0), (32, SRCALPHA)):
+            source = Surface((w, h), flags, bitsize)
+            pixels = pixels_view(source)
+            self.assertEqual(pixels.shape, (w, h, source.get_bytesize()))
+            pixels[...] = numpy.random.randint(0, 256, pixels.shape)
+            model = numpy.ascontiguousarray(pixels)
+            for operation, size in (('transpose', (h, w)), ('rot90', (h, w)), ('vmirror', (w, h))):
+                target = Surface(size, flags, bitsize)
+                self.assertIs(transform_view(source, target, operation), target)
+                expected = numpy.empty(model.size, numpy.uint8)
+                transform(model.ravel(), expected, w, h, model.shape[2], operation)
+                self.assertTrue(numpy.array_equal(
+                    pixels_view(target), expected.reshape(size + (model.shape[2],))))
+
+        # BufferProxy with a negative channel stride and numpy slices
+        source = Surface((w, h), 0, 32)
+        array3d_view = numpy.asarray(source.get_view('3'))
+        array3d_view[...] = numpy.random.randint(0, 256, array3d_view.shape)
+        target = Surface((h, w), 0, 32)
+        transform_view(source.get_view('3'), target.get_view('3'))
+        self.assertTrue(numpy.array_equal(pixels3d(target), pixels3d(source).transpose(1, 0, 2)))
+
+        array = numpy.random.randint(0, 256, (40, 30, 4)).astype(numpy.uint8)
+        out = numpy.zeros((5, 10, 4), numpy.uint8)
+        transform_view(array[::2, ::3], out[:, ::-1], 'transpose', (3, 2, 10, 5))
+        self.assertTrue(numpy.array_equal(out[:, ::-1], array[::2, ::3][3:13, 2:7].transpose(1, 0, 2)))
+
+        self.assertRaises(ValueError, transform_view, array, numpy.zeros((30, 40, 3), numpy.uint8))
+        self.assertRaises(ValueError, transform_view, array, numpy.zeros((40, 30, 4), numpy.uint8))
+        self.assertRaises(ValueError, pixels_view, numpy.zeros(12, numpy.uint8))
+
+
+def padded(array, pitch):
+    # Copy of the 2d array (rows, row bytes) in a buffer of rows pitch bytes apart
+    buffer = numpy.zeros(array.shape[0] * pitch, numpy.uint8)
+    buffer.reshape(array.shape[0], pitch)[:, :array.shape[1]] = array
+    return buffer
+
+
+class Test_pitch(unittest.TestCase):
+
+    def runTest(self) -> None:
+        w, h = 37, 23
+        for depth, func in ((1, vfb), (3, vfb_rgb), (4, vfb_rgba)):
+            model = numpy.random.randint(0, 256, (w, h, depth)).astype(numpy.uint8)
+            expected = model.transpose(1, 0, 2)
+            src_pitch, dst_pitch = h * depth + 9, w * depth + 4
+            source = padded(model.reshape(w, -1), src_pitch)
+            target = numpy.zeros(h * dst_pitch, numpy.uint8)
+            func(source, target, w, h, src_pitch=src_pitch, dst_pitch=dst_pitch)
+            rows = target.reshape(h, dst_pitch)
+            self.assertTrue(numpy.array_equal(rows[:, :w * depth].reshape(h, w, depth), expected))
+            self.assertFalse(rows[:, w * depth:].any())
+
+            generic = numpy.zeros_like(target)
+            vfb_generic(source, generic, w, h, depth, src_pitch=src_pitch, dst_pitch=dst_pitch)
+            self.assertTrue(numpy.array_equal(generic, target))
+
+            stream = numpy.zeros_like(target)
+            vfb_stream(source, stream, w, h, depth, budget=256, src_pitch=src_pitch, dst_pitch=dst_pitch)
+            self.assertTrue(numpy.array_equal(stream, target))
+
+            out = vfb_batch(numpy.stack([source, source]), None, w, h, depth,
+                            src_pitch=src_pitch, dst_pitch=dst_pitch)
+            self.assertTrue(numpy.array_equal(out[1].reshape(h, dst_pitch)[:, :w * depth], rows[:, :w * depth]))
+
+            for operation in ('transpose', 'rot90', 'vmirror'):
+                packed = numpy.empty(w * h * depth, numpy.uint8)
+                transform(model.reshape(-1), packed, w, h, depth, operation)
+                tw, th = (w, h) if operation == 'vmirror' else (h, w)
+                pitch = th * depth + 3
+                out = numpy.zeros(tw * pitch, numpy.uint8)
+                transform(source, out, w, h, depth, operation, src_pitch=src_pitch, dst_pitch=pitch)
+                self.assertTrue(numpy.array_equal(out.reshape(tw, pitch)[:, :th * depth].reshape(-1), packed))
+                gathered = numpy.zeros_like(out)
+                remap(source, gathered, w, h, depth, operation, src_pitch=src_pitch, dst_pitch=pitch)
+                self.assertTrue(numpy.array_equal(gathered, out))
+
+            if depth > 1:
+                pipe = Pipeline(w, h, depth).rotate(1).hmirror()
+                out = numpy.zeros(pipe.target_width * (pipe.target_height * depth + 5), numpy.uint8)
+                pipe.apply(source, out, src_pitch=src_pitch, dst_pitch=pipe.target_height * depth + 5)
+                packed = pipe.apply(model.reshape(-1), numpy.empty(w * h * depth, numpy.uint8))
+                self.assertTrue(numpy.array_equal(
+                    out.reshape(pipe.target_width, -1)[:, :pipe.target_height * depth].reshape(-1), packed))
+
+                gray = numpy.zeros(h * (w + 3), numpy.uint8)
+                vfb_gray(source, gray, w, h, depth, src_pitch=src_pitch, dst_pitch=w + 3)
+                packed = vfb_gray(model.reshape(-1), numpy.empty(w * h, numpy.uint8), w, h, depth)
+                self.assertTrue(numpy.array_equal(gray.reshape(h, w + 3)[:, :w].reshape(-1), packed))
+
+        # 24-bit surfaces have padded rows (pitch), transposed without repacking
+        surface = Surface((w, h), 0, 24)
+        pixels3d(surface)[...] = numpy.random.randint(0, 256, (w, h, 3))
+        target = Surface((h, w), 0, 24)
+        self.assertGreater(surface.get_pitch(), w * 3)
+        vfb_rgb(surface.get_buffer(), target.get_buffer(), h, w,
+                src_pitch=surface.get_pitch(), dst_pitch=target.get_pitch())
+        self.assertTrue(numpy.array_equal(pixels3d(target), pixels3d(surface).transpose(1, 0, 2)))
+
+        source = numpy.zeros(w * h * 3, numpy.uint8)
+        self.assertRaises(ValueError, vfb_rgb, source, numpy.zeros_like(source), w, h, src_pitch=h * 3 - 1)
+        self.assertRaises(ValueError, vfb_rgb, source, numpy.zeros_like(source), w, h, src_pitch=h * 3 + 1)
+        self.assertRaises(ValueError, vfb_rgb, source[::2], numpy.zeros_like(source), w, h, dst_pitch=w * 3)
+        self.assertRaises(ValueError, vfb_batch, numpy.zeros((2, w, h, 3), numpy.uint8), src_pitch=h * 3)
+
+
+class Test_index64(unittest.TestCase):
+
+    def runTest(self) -> None:
+        # Same results as the 32-bit functions below 4294967295
+        for index in (0, 7, 2 ** 31 - 1, 2 ** 31, 2 ** 32 - 1):
+            self.assertEqual(to3d64(index, 65536, 4), to3d(index, 65536, 4))
+            self.assertEqual(vmap_buffer64(index, 65536, 16384, 4), vmap_buffer(index, 65536, 16384, 4))
+        self.assertEqual(to1d64(5, 6, 2, 800, 3), to1d(5, 6, 2, 800, 3))
+
+        # Beyond 4294967295 (buffer larger than 4GB)
+        w, h, depth = 70000, 40000, 4
+        for index in (2 ** 32, 2 ** 32 + 5, 2 ** 33 + 3, w * h * depth - 1):
+            x, y, z = to3d64(index, w, depth)
+            self.assertEqual(to1d64(x, y, z, w, depth), index)
+            self.assertEqual(vmap_buffer64(index, w, h, depth), (x * h + y) * depth + z)
+        self.assertEqual(to1d64(w - 1, h - 1, 3, w, depth), w * h * depth - 1)
+        self.assertRaises(ValueError, to3d64, 2 ** 40, 0, 4)
+        self.assertRaises(ValueError, vmap_buffer64, 2 ** 40, 10, 10, 0)
+        self.assertRaises(OverflowError, to3d64, 2 ** 64, 10, 4)
+
+        # uint64 arrays use the 64-bit kernels, uint32 arrays keep the 32-bit kernels
+        index = numpy.arange(0, 2 ** 32, 2 ** 20 + 1, dtype=numpy.uint32)
+        xyz32 = to3d_array(index, 65536, 4)
+        xyz_ = to3d_array(index.astype(numpy.uint64), 65536, 4)
+        self.assertEqual(xyz32.dtype, numpy.uint32)
+        self.assertEqual(xyz_.dtype, numpy.uint64)
+        self.assertTrue(numpy.array_equal(xyz32, xyz_))
+        self.assertTrue(numpy.array_equal(
+            vmap_buffer_array(index, 65536, 16384, 4),
+            vmap_buffer_array(index.astype(numpy.uint64), 65536, 16384, 4)))
+
+        index = numpy.array([2 ** 31, 2 ** 32, 2 ** 32 + 5, 2 ** 33 + 3, w * h * depth - 1], numpy.uint64)
+        xyz_ = to3d_array(index, w, depth)
+        self.assertEqual([tuple(v) for v in xyz_], [to3d64(int(i), w, depth) for i in index])
+        self.assertTrue(numpy.array_equal(to1d_array(xyz_[:, 0], xyz_[:, 1], xyz_[:, 2], w, depth), index))
+        out = numpy.empty_like(index)
+        vmap_buffer_array(index, w, h, depth, out)
+        self.assertEqual(list(out), [vmap_buffer64(int(i), w, h, depth) for i in index])
+
+        # uint32 arrays whose index values exceed 4294967295 are promoted, no wrap around
+        x1, y1, z1 = (numpy.array([v], numpy.uint32) for v in (1, 70000, 2))
+        wide = to1d_array(x1, y1, z1, 70000, 3)
+        self.assertEqual(wide.dtype, numpy.uint64)
+        self.assertEqual(int(wide[0]), 14700000005)
+        self.assertEqual(int(wide[0]), to1d64(1, 70000, 2, 70000, 3))
+        last = to1d_array(*(numpy.array([v], numpy.uint32) for v in (1431655764, 0, 3)), 1, 3)
+        self.assertEqual((last.dtype, int(last[0])), (numpy.uint32, 4294967295))
+        first = to1d_array(*(numpy.array([v], numpy.uint32) for v in (1431655765, 0, 1)), 1, 3)
+        self.assertEqual((first.dtype, int(first[0])), (numpy.uint64, 4294967296))
+        self.assertRaises(OverflowError, to1d_array, x1, y1, z1, 70000, 3, numpy.empty(1, numpy.uint32))
+
+        # uint32 index values of a buffer larger than 4GB are promoted
+        flipped = vmap_buffer_array(numpy.array([w * depth], numpy.uint32), w, h, depth)
+        self.assertEqual(flipped.dtype, numpy.uint64)
+        self.assertEqual(flipped[0], depth)
+        self.assertRaises(ValueError, to3d_array, index.astype(numpy.int64), w, depth)
+        self.assertRaises(ValueError, to3d_array, index, w, depth, numpy.empty((5, 3), numpy.uint32))
+
+
+class Test_half(unittest.TestCase):
+
+    def runTest(self) -> None:
+        # Every half value, inf, nan and subnormals included (same bits as numpy)
+        bits = numpy.arange(65536, dtype=numpy.uint16)
+        values = half_to_float(bits)
+        self.assertEqual(values.dtype, numpy.float32)
+        self.assertTrue(numpy.array_equal(values.view(numpy.uint32),
+                                          bits.view(numpy.float16).astype(numpy.float32).view(numpy.uint32)))
+
+        # Round to nearest even, overflow, subnormals
+        source = numpy.concatenate([
+            (numpy.random.randn(100000) * 1000).astype(numpy.float32),
+            (numpy.random.rand(10000) * 1e-4).astype(numpy.float32),
+            numpy.array([0.0, -0.0, 1e-8, 3e-8, 6e-8, 65504, 65519.99, 65520, 1e10, -1e10,
+                         numpy.inf, -numpy.inf, numpy.nan], numpy.float32)])
+        with numpy.errstate(over='ignore'):
+            expected = source.astype(numpy.float16)
+        half = float_to_half(source)
+        self.assertEqual(half.dtype, numpy.float16)
+        self.assertTrue(numpy.array_equal(half, expected, equal_nan=True))
+        out = numpy.empty(source.shape, numpy.uint16)
+        self.assertIs(float_to_half(source, out), out)
+        self.assertTrue(numpy.array_equal(out, half.view(numpy.uint16)))
+
+        # Normalized uint8
+        ubyte = numpy.arange(256, dtype=numpy.uint8).reshape(16, 16)
+        half = uint8_to_half(ubyte)
+        self.assertEqual(half.shape, (16, 16))
+        self.assertTrue(numpy.allclose(half, ubyte / 255.0, atol=1e-3))
+        self.assertTrue(numpy.array_equal(half_to_uint8(half), ubyte))
+        self.assertEqual(list(half_to_uint8(numpy.array([-1.0, 2.0, numpy.nan, 0.5], numpy.float16))),
+                         [0, 255, 0, 128])
+
+        # Fused with the transforms
+        w, h, depth = 37, 23, 4
+        source = numpy.random.rand(w * h * depth).astype(numpy.float16)
+        for operation in ('transpose', 'rot90', 'rot180', 'hmirror', 'vmirror', 'antitranspose'):
+            flipped = numpy.empty(w * h * depth * 2, numpy.uint8)
+            transform(source.view(numpy.uint8), flipped, w, h, depth * 2, operation)
+            flipped = flipped.view(numpy.float16)
+            out = transform_half(source, numpy.empty(w * h * depth, numpy.float32), w, h, depth, operation)
+            self.assertTrue(numpy.array_equal(out, flipped.astype(numpy.float32)))
+            out = transform_half(source, numpy.empty(w * h * depth, numpy.uint8), w, h, depth, operation)
+            self.assertTrue(numpy.array_equal(out, half_to_uint8(flipped)))
+            out = transform_half(source, numpy.empty(w * h * depth, numpy.float16), w, h, depth, operation)
+            self.assertTrue(numpy.array_equal(out, flipped))
+            narrow = transform_half(source.astype(numpy.float32), numpy.empty(w * h * depth, numpy.float16),
+                                    w, h, depth, operation)
+            self.assertTrue(numpy.array_equal(narrow, flipped))
+
+        ubyte = numpy.random.randint(0, 256, (w, h, 3)).astype(numpy.uint8)
+        out = transform_half(ubyte, numpy.empty((h, w, 3), numpy.uint16), w, h, 3)
+        self.assertTrue(numpy.array_equal(out, uint8_to_half(ubyte.transpose(1, 0, 2).copy()).view(numpy.uint16)))
+
+        out = numpy.zeros(10 * 7 * depth, numpy.float32)
+        transform_half(source, out, w, h, depth, 'transpose', (3, 2, 10, 7))
+        expected = source.reshape(w, h, depth)[3:13, 2:9].transpose(1, 0, 2).astype(numpy.float32)
+        self.assertTrue(numpy.array_equal(out, expected.reshape(-1)))
+
+        pitch = w * depth * 4 + 12
+        out = numpy.zeros(h * pitch // 4, numpy.float32)
+        transform_half(source, out, w, h, depth, dst_pitch=pitch)
+        expected = source.reshape(w, h, depth).transpose(1, 0, 2).astype(numpy.float32)
+        self.assertTrue(numpy.array_equal(out.reshape(h, -1)[:, :w * depth], expected.reshape(h, -1)))
+
+        self.assertRaises(ValueError, half_to_float, numpy.zeros(4, numpy.float32))
+        self.assertRaises(ValueError, half_to_float, numpy.zeros(4, numpy.float16), numpy.zeros(3, numpy.float32))
+        self.assertRaises(ValueError, transform_half, source.astype(numpy.float32),
+                          numpy.empty(w * h * depth, numpy.uint8), w, h, depth)
+        self.assertRaises(ValueError, transform_half, source, numpy.empty(w * h, numpy.float32), w, h, depth)
+
+
+class Test_validation(unittest.TestCase):
+
+    def runTest(self) -> None:
+        # Checked once per call, the C kernels are branch free
+        with self.assertRaisesRegex(ValueError, 'width'):
+            to3d(10, 0, 3)
+        with self.assertRaisesRegex(ValueError, 'depth'):
+            to3d(10, 800, 0)
+        with self.assertRaisesRegex(ValueError, 'width'):
+            vmap_buffer(10, 0, 64, 3)
+        with self.assertRaisesRegex(ValueError, 'depth'):
+            vmap_buffer(10, 64, 64, 0)
+
+        # Buffers shorter (or longer) than width * height * depth
+        w, h = 16, 8
+        for depth, func in ((1, vfb), (3, vfb_rgb), (4, vfb_rgba)):
+            source = numpy.zeros(w * h * depth, numpy.uint8)
+            func(source, numpy.empty_like(source), w, h)
+            self.assertRaises(ValueError, func, source[:-1], numpy.empty_like(source), w, h)
+            self.assertRaises(ValueError, func, source, numpy.empty(source.size - 1, numpy.uint8), w, h)
+            self.assertRaises(ValueError, func, source, numpy.empty_like(source), w, h + 1)
+
+        # The checks are not asserts, python -O raises instead of reading out of bounds
+        code = ("import numpy\n"
+                "from IndexMapping.mapping import *\n"
+                "a, b = numpy.zeros(12, numpy.uint8), numpy.zeros(12, numpy.uint8)\n"
+                "p = numpy.zeros(1, numpy.uint8)\n"
+                "for call in (lambda: vfb_rgb(numpy.zeros(10, numpy.uint8), numpy.zeros(10, numpy.uint8), 1000, 1000),\n"
+                "             lambda: vfb_rgb_inplace(numpy.zeros(10, numpy.uint8), 1000, 1000),\n"
+                "             lambda: vfb_gray(a, p, 4000, 4000),\n"
+                "             lambda: split_rgb(a, p, p, p),\n"
+                "             lambda: split_rgba(a, p, p, p, p),\n"
+                "             lambda: merge_rgb(p, p, p, a),\n"
+                "             lambda: merge_rgba(p, p, p, p, a),\n"
+                "             lambda: RemapPlan(2, 2, 3).apply(a, p),\n"
+                "             lambda: transform(a, p, 2, 2, 3),\n"
+                "             lambda: Pipeline(2, 2, 3).hmirror().apply(a, p),\n"
+                "             lambda: vfb_stream(a, p, 2, 2, 3),\n"
+                "             lambda: vfb_batch(numpy.zeros((2, 12), numpy.uint8), p, 2, 2, 3),\n"
+                "             lambda: half_to_float(numpy.zeros(12, numpy.float16), numpy.zeros(1, numpy.float32)),\n"
+                "             lambda: transform_half(numpy.zeros(12, numpy.float16), numpy.zeros(1, numpy.float16), 2, 2, 3),\n"
+                "             lambda: to3d_array(numpy.arange(4), 2, 3, numpy.zeros((1, 3), numpy.uint32)),\n"
+                "             lambda: vmap_buffer_array(numpy.arange(4), 2, 2, 3, out=numpy.zeros(1, numpy.uint32))):\n"
+                "    try:\n"
+                "        call()\n"
+                "    except ValueError:\n"
+                "        pass\n"
+                "    else:\n"
+                "        raise SystemExit(1)\n")
+        env = dict(os.environ, PYTHONPATH=os.pathsep.join(
+            [os.path.dirname(PROJECT_PATH[0])] + os.environ.get('PYTHONPATH', '').split(os.pathsep)))
+        self.assertEqual(subprocess.run([sys.executable, '-O', '-c', code], env=env).returncode, 0)
+
+
+class Test_backend(unittest.TestCase):
+
+    def runTest(self) -> None:
+        self.assertEqual(get_backend(), 'cython')
+        self.assertRaises(AssertionError, set_backend, 'fortran')
+        self.assertEqual(get_backend(), 'cython')
+
+        def run(backend, func, *args, **kwargs):
+            set_backend(backend)
+            try:
+                return [numpy.array(r, copy=True) for r in func(*args, **kwargs)] \
+                    if func in (split_rgb, split_rgba) else numpy.array(func(*args, **kwargs), copy=True)
+            finally:
+                set_backend('cython')
+
+        # Same buffers with both backends (team and serial path)
+        for w, h in ((1, 1), (9, 17), (173, 91), (300, 256)):
+            for threads in (1, 2):
+                for depth, func in ((1, vfb), (3, vfb_rgb), (4, vfb_rgba)):
+                    source_buffer = numpy.random.randint(0, 256, w * h * depth).astype(numpy.uint8)
+                    a, b = [run(backend, func, source_buffer, numpy.zeros_like(source_buffer), w, h,
+                                num_threads=threads) for backend in ('cython', 'c')]
+                    self.assertTrue(numpy.array_equal(a, b))
+                    if depth == 1:
+                        continue
+                    for weights in ('average', 'bt709'):
+                        for interleaved in (False, True):
+                            size = w * h * (depth if interleaved else 1)
+                            a, b = [run(backend, vfb_gray, source_buffer, numpy.zeros(size, numpy.uint8),
+                                        w, h, depth, weights, interleaved, num_threads=threads)
+                                    for backend in ('cython', 'c')]
+                            self.assertTrue(numpy.array_equal(a, b))
+                    split = split_rgb if depth == 3 else split_rgba
+                    a, b = [run(backend, split, source_buffer,
+                                *[numpy.zeros(w * h, numpy.uint8) for _ in range(depth)], num_threads=threads)
+                            for backend in ('cython', 'c')]
+                    for plane_a, plane_b in zip(a, b):
+                        self.assertTrue(numpy.array_equal(plane_a, plane_b))
+
+        # Padded or strided buffers fall back to the prange kernels
+        w, h = 5, 4
+        source_buffer = numpy.random.randint(0, 256, w * h * 6).astype(numpy.uint8)
+        expected = vfb_rgb(source_buffer[::2].copy(), numpy.empty(w * h * 3, numpy.uint8), w, h)
+        flipped = run('c', vfb_rgb, source_buffer[::2], numpy.empty(w * h * 3, numpy.uint8), w, h)
+        self.assertTrue(numpy.array_equal(flipped, expected))
+        planes = run('c', split_rgb, source_buffer[::2], *[numpy.empty(w * h, numpy.uint8) for _ in range(3)])
+        for c in range(3):
+            self.assertTrue(numpy.array_equal(planes[c], source_buffer[::2][c::3]))
+        self.assertEqual(get_backend(), 'cython')
+
+
+class Test_image_pool(unittest.TestCase):
+
+    def runTest(self) -> None:
+        clear_image_pool()
+        self.assertEqual(image_pool_info(), {'hits': 0, 'misses': 0, 'blocks': 0, 'nbytes': 0})
+        w, h = 40, 30
+        source_buffer = numpy.random.randint(1, 256, w * h * 3).astype(numpy.uint8)
+        expected = [plane.copy() for plane in rgb_inplace(source_buffer, w, h)]
+        # Three channels of exactly w * h * 3 bytes, back in the pool with the arrays
+        info = image_pool_info()
+        self.assertEqual((info['misses'], info['blocks'], info['nbytes']), (3, 3, 3 * w * h * 3))
+        for _ in range(10):
+            self.assertTrue(all(numpy.array_equal(plane, plane_expected) for plane, plane_expected
+                                in zip(rgb_inplace(source_buffer, w, h), expected)))
+        info = image_pool_info()
+        self.assertEqual((info['hits'], info['misses'], info['blocks']), (30, 3, 3))
+        planes = rgb_inplace(source_buffer, w, h)
+        self.assertEqual(image_pool_info()['blocks'], 0)
+        del planes
+        self.assertEqual(image_pool_info()['blocks'], 3)
+
+        with pooled_image(w, h, 3) as scratch:
+            self.assertEqual((scratch.dtype, scratch.shape), (numpy.uint8, (w * h * 3,)))
+            vfb_rgb(source_buffer, scratch, w, h)
+            self.assertEqual(image_pool_info()['blocks'], 2)
+        # The array keeps its block after the with block, no other call can reuse it
+        expected = scratch.copy()
+        view = scratch[::3]
+        del scratch
+        self.assertEqual(image_pool_info()['blocks'], 2)
+        with pooled_image(w, h, 3) as other:
+            other[:] = 0
+        del other
+        self.assertTrue(numpy.array_equal(view, expected[::3]))
+        del view
+        self.assertEqual(image_pool_info()['blocks'], 3)
+        self.assertEqual(image_pool_info()['hits'], 35)
+        # A smaller image reuses a block of its size class
+        with pooled_image(w, h - 1, 3) as scratch:
+            self.assertEqual(scratch.shape, (w * (h - 1) * 3,))
+        del scratch
+        self.assertEqual(image_pool_info()['hits'], 36)
+        # Size classes hold M_POOL_DEPTH (4) blocks, the others are freed
+        with pooled_image(w, h, 3) as a, pooled_image(w, h, 3) as b, pooled_image(w, h, 3) as c, \
+                pooled_image(w, h, 3) as d, pooled_image(w, h, 3) as e:
+            pass
+        del a, b, c, d, e
+        self.assertEqual(image_pool_info()['blocks'], 4)
+
+        self.assertRaises(ValueError, pooled_image(0, h, 3).__enter__)
+        clear_image_pool()
+        self.assertEqual(image_pool_info()['blocks'], 0)
+
+
+class Test_mapc_views(unittest.TestCase):
+
+    def runTest(self) -> None:
+        w, h = 40, 30
+        source_buffer = numpy.random.randint(0, 256, w * h * 3).astype(numpy.uint8)
+        # Black pixels, the bytes objects of the previous versions stopped at the first NUL
+        source_buffer[:w * 3] = 0
+
+        red, green, blue = rgb_inplace(source_buffer, w, h)
+        for plane in (red, green, blue):
+            self.assertIsInstance(plane, numpy.ndarray)
+            self.assertEqual((plane.dtype, plane.shape), (numpy.uint8, (w * h * 3,)))
+            self.assertIsInstance(plane.base.obj, PooledBuffer)
+        self.assertTrue(numpy.array_equal(red[0::3], source_buffer[0::3]))
+        self.assertTrue(numpy.array_equal(green[1::3], source_buffer[1::3]))
+        self.assertTrue(numpy.array_equal(blue[2::3], source_buffer[2::3]))
+        self.assertTrue((red[1::3] == 1).all() and (blue[0::3] == 1).all())
+        self.assertEqual(len(red.base.obj), w * h * 3)
+        self.assertEqual(red.base.obj.shape, (w, h, 3))
+
+        # In place kernels, views of the caller's buffer
+        target_buffer = source_buffer.copy()
+        gray = mapcfunctions.testing_pure_c(target_buffer, w, h)
+        self.assertTrue(numpy.shares_memory(gray, target_buffer))
+        self.assertEqual(gray.shape, (w * h * 3,))
+        expected = (source_buffer.reshape(-1, 3).astype(numpy.float64).sum(axis=1) / 3.0).astype(numpy.uint8)
+        for c in range(3):
+            self.assertTrue(numpy.array_equal(gray[c::3], expected))
+        self.assertTrue(numpy.shares_memory(mapcfunctions.test_c_inplace(target_buffer, w, h), target_buffer))
+
+        self.assertRaises(ValueError, rgb_inplace, source_buffer[:-3], w, h)
+        self.assertRaises(ValueError, mapcfunctions.testing_pure_c, source_buffer[::2], w // 2, h)
+        plane = numpy.empty(w * h, numpy.uint8)
+        self.assertRaises(ValueError, mapcfunctions.flip_buffer, source_buffer[:-3], target_buffer, w, h, 3)
+        self.assertRaises(ValueError, mapcfunctions.split_buffer, source_buffer, plane, plane, plane[:-1])
+        self.assertRaises(ValueError, mapcfunctions.gray_buffer, source_buffer, plane[:-1], w, h)
+
+
+class Test_stats(unittest.TestCase):
+
+    def runTest(self) -> None:
+        if not build_info()['stats']:
+            # Compiled out, the counters stay empty
+            self.assertFalse(enable_stats())
+            vfb_rgb(numpy.zeros(12, numpy.uint8), numpy.zeros(12, numpy.uint8), 2, 2)
+            self.assertEqual(get_stats(), {})
+            return
+
+        w, h = 64, 48
+        source = numpy.random.randint(0, 256, w * h * 4).astype(numpy.uint8)
+        target = numpy.empty_like(source)
+        reset_stats()
+        enable_stats(False)
+        vfb_rgba(source, target, w, h)
+        self.assertEqual(get_stats(), {})
+
+        self.assertTrue(enable_stats())
+        try:
+            for _ in range(3):
+                vfb_rgba(source, target, w, h)
+            split_rgb(source[:w * h * 3], *[numpy.empty(w * h, numpy.uint8) for _ in range(3)])
+            mapcfunctions.flip_buffer(source, target, w, h, 4)
+            stats = get_stats()
+            self.assertEqual(set(stats), {'vfb_rgba', 'split_rgb', 'mapcfunctions.flip_buffer'})
+            entry = stats['vfb_rgba']
+            self.assertEqual(entry['calls'], 3)
+            self.assertEqual(entry['nbytes'], 3 * 2 * source.nbytes)
+            self.assertEqual(sum(entry['histogram']), 3)
+            self.assertGreaterEqual(entry['threads'], 1)
+            self.assertGreater(entry['seconds'], 0.0)
+            self.assertEqual(stats['split_rgb']['nbytes'], 2 * w * h * 3)
+            self.assertEqual(stats['mapcfunctions.flip_buffer']['calls'], 1)
+
+            # Snapshot and reset
+            self.assertEqual(len(get_stats(reset=True)), 3)
+            self.assertEqual(get_stats(), {})
+
+            # Callback per call
+            calls = []
+            enable_stats(callback=lambda *args: calls.append(args))
+            vfb_rgba(source, target, w, h)
+            self.assertEqual(len(calls), 1)
+            name, nbytes, seconds, threads = calls[0]
+            self.assertEqual((name, nbytes), ('vfb_rgba', 2 * source.nbytes))
+            self.assertTrue(seconds >= 0.0 and threads >= 1)
+            self.assertRaises(AssertionError, enable_stats, True, 1)
+        finally:
+            enable_stats(False)
+            reset_stats()
+
+
+@unittest.skipUnless(os.environ.get('INDEXMAPPING_LARGE_TESTS'),
+                     'set INDEXMAPPING_LARGE_TESTS=1 to run (needs ~5GB of memory)')
+class Test_large_buffer(unittest.TestCase):
+
+    def runTest(self) -> None:
+        # 1 byte pixels, width * height > 2 ** 31
+        w, h = 65536, 32770
+        source = numpy.empty(w * h, numpy.uint8)
+        source.reshape(w, h)[...] = numpy.arange(h, dtype=numpy.uint8)
+        source.reshape(w, h)[:, -1] = numpy.arange(w, dtype=numpy.uint8)
+        target = numpy.empty_like(source)
+        vfb(source, target, w, h)
+        rows = target.reshape(h, w)
+        for y in (0, 1, h // 2, h - 2):
+            self.assertTrue((rows[y] == y % 256).all())
+        self.assertTrue(numpy.array_equal(rows[-1], numpy.arange(w, dtype=numpy.uint8)))
+
+
+class Test_aio(unittest.TestCase):
+
+    def runTest(self) -> None:
+        executor = aio.set_executor(max_workers=2, max_pending=3)
+        self.assertIs(aio.get_executor(), executor)
+        self.assertEqual(executor.max_pending, 3)
+        self.assertFalse(hasattr(aio, '_name'))
+        w, h = 64, 48
+        sources = [numpy.random.randint(0, 256, w * h * 3).astype(numpy.uint8) for _ in range(8)]
+
+        async def transpose_all():
+            jobs = [aio.vfb_rgb(s, numpy.empty_like(s), w, h) for s in sources]
+            return await asyncio.gather(*jobs)
+
+        for source, target in zip(sources, asyncio.run(transpose_all())):
+            self.assertTrue(numpy.array_equal(target, vfb_rgb(source, numpy.empty_like(source), w, h)))
+
+        # At most max_pending jobs in flight, more threads than slots
+        bounded = aio.BoundedExecutor(max_workers=4, max_pending=2)
+        lock, active, peak, done = threading.Lock(), [0], [0], []
+
+        def job(delay=0.01):
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            time.sleep(delay)
+            with lock:
+                active[0] -= 1
+            done.append(delay)
+
+        async def flood():
+            await asyncio.gather(*[bounded.run(job) for _ in range(12)])
+
+        asyncio.run(flood())
+        self.assertEqual(peak[0], 2)
+
+        # A cancelled running job keeps its slot until it is done, the cancelled
+        # call returns once the job stopped (no write after the caller resumes)
+        async def cancel_running():
+            running = [asyncio.ensure_future(bounded.run(job, 0.1)) for _ in range(2)]
+            await asyncio.sleep(0.03)
+            for task in running:
+                task.cancel()
+            others = [asyncio.ensure_future(bounded.run(job)) for _ in range(4)]
+            for task in running:
+                with self.assertRaises(asyncio.CancelledError):
+                    await task
+                self.assertIn(0.1, done)
+            await asyncio.gather(*others)
+
+        peak[0], done[:] = 0, []
+        asyncio.run(cancel_running())
+        self.assertEqual(peak[0], 2)
+        self.assertEqual(sorted(done), [0.01] * 4 + [0.1] * 2)
+        bounded.shutdown()
+
+        # A cancelled job waiting for a slot never runs
+        calls = []
+
+        async def cancel():
+            blockers = [asyncio.ensure_future(executor.run(time.sleep, 0.05)) for _ in range(3)]
+            waiting = asyncio.ensure_future(executor.run(calls.append, 1))
+            await asyncio.sleep(0.01)
+            waiting.cancel()
+            await asyncio.gather(*blockers)
+            with self.assertRaises(asyncio.CancelledError):
+                await waiting
+
+        asyncio.run(cancel())
+        self.assertEqual(calls, [])
+
+        async def bad_call():
+            await aio.vfb_rgb(sources[0], numpy.empty_like(sources[0]), 0, h)
+
+        self.assertRaises(ValueError, asyncio.run, bad_call())
+        aio.set_executor()
+
+
 def run_test():
     suite = unittest.TestSuite()
 
@@ -499,7 +1645,34 @@ def run_test():
                     Test_vmap_buffer(),
                     Test_display_vmap_buffer(),
                     Test_vfb_rgba(),
-                    Test_display_vfb_rgba()
+                    Test_display_vfb_rgba(),
+                    Test_to3d_array(),
+                    Test_to1d_array(),
+                    Test_vmap_buffer_array(),
+                    Test_tile_size(),
+                    Test_vfb_inplace(),
+                    Test_vfb_generic(),
+                    Test_simd_level(),
+                    Test_parallel(),
+                    Test_build_info(),
+                    Test_split_merge(),
+                    Test_vfb_gray(),
+                    Test_remap_plan(),
+                    Test_transform(),
+                    Test_pipeline(),
+                    Test_vfb_stream(),
+                    Test_vfb_batch(),
+                    Test_transform_view(),
+                    Test_pitch(),
+                    Test_aio(),
+                    Test_index64(),
+                    Test_validation(),
+                    Test_half(),
+                    Test_backend(),
+                    Test_image_pool(),
+                    Test_mapc_views(),
+                    Test_stats(),
+                    Test_large_buffer()
 
                     ])
 
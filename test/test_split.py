@@ -47,7 +47,7 @@ import IndexMapping
 from IndexMapping.mapcfunctions import testing_pure_c, test_c_inplace, rgb_inplace
 
 PROJECT_PATH = IndexMapping.__path__
-os.chdir(PROJECT_PATH[0] + "\\test")
+os.chdir(os.path.join(PROJECT_PATH[0], "test"))
 
 def run_test_split():
 
@@ -65,9 +65,9 @@ def run_test_split():
         pygame.event.pump()
         background_b = background_rgb.flatten()
         red, green, blue = rgb_inplace(background_b.astype(dtype=numpy.uint8), 800, 1024)
-        red_surface = make_surface(numpy.frombuffer(red, dtype=numpy.uint8).reshape(w, h, 3))
-        green_surface = make_surface(numpy.frombuffer(green, dtype=numpy.uint8).reshape(w, h, 3))
-        blue_surface = make_surface(numpy.frombuffer(blue, dtype=numpy.uint8).reshape(w, h, 3))
+        red_surface = make_surface(red.reshape(w, h, 3))
+        green_surface = make_surface(green.reshape(w, h, 3))
+        blue_surface = make_surface(blue.reshape(w, h, 3))
         screen.fill((0, 0, 0))
         screen.blit(red_surface, (0, 0))
         screen.blit(green_surface, (20, 20), special_flags=pygame.BLEND_RGB_ADD)